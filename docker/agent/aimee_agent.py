@@ -11,6 +11,7 @@ A voice AI agent using the LiveKit Agents framework that:
 PHASE 8 - THREE MODEL ARCHITECTURE:
 - LLM Model: ACTIVELY USED for Chat Completions (get_llm_model())
 - TTS Model: RESERVED for future GPT-4o-TTS integration (get_tts_model())
+- TTS Provider: OpenAI TTS, or self-hosted Sesame with OpenAI failover (get_tts_provider())
 - Realtime Model: RESERVED for future Realtime STS API (get_realtime_model())
 
 EXTERNALIZED PROMPTS:
@@ -29,10 +30,14 @@ SESSION HANDLING:
 """
 
 import asyncio
+import json
 import logging
 import os
+import sys
 import time
-from typing import Optional, Dict, Any
+import uuid
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Set, Tuple
 
 from livekit.agents import (
     Agent,
@@ -51,13 +56,23 @@ try:
 except ImportError:
     # If StopResponse is not available, we'll use a different approach
     StopResponse = None
-from livekit.plugins import openai, silero
-from aimee_model_config import get_llm_model, get_tts_model, get_realtime_model
-from prompt_loader import get_aimee_system_prompt
+from livekit.plugins import silero
+from aimee_model_config import get_llm_model, get_tts_model, get_tts_provider, get_realtime_model
+from prompt_loader import get_aimee_system_prompt, get_prompt_version, prompt_registry
 from backend_client import backend_client
-
-# Track active sessions per room to detect reconnections
-_active_sessions: Dict[str, Dict[str, Any]] = {}
+from provider_pool import ProviderPool
+from tts_cache import tts_cache
+from response_cache import response_cache
+from outbox import outbox
+from sesame_tts import sesame_pool
+from local_intents import LastReply, ReplyCapture, acknowledgement, match_intent
+from session_registry import SessionRegistry, SessionRecord, create_session_registry
+from turn_racing import RACE_MODE, DirectLLMStream, race_first_sentence
+from preemptive import PREEMPTIVE_MODE, PreemptiveRequester
+from marker_prefetch import ArrivalPrefetcher, LocationFix, Marker, LOCATION_TOPIC
+import turn_metrics
+from turn_metrics import TurnTimeline
+from session_recorder import SESSION_RECORDING, SessionRecorder, RecordingBackend
 
 # Configure logging
 logging.basicConfig(
@@ -102,111 +117,245 @@ def get_config():
     logger.info(f"  Agent Identity: {config['participant_identity']}")
     logger.info(f"  OpenAI LLM Model (ACTIVE): {config['openai_model']}")
     logger.info(f"  OpenAI TTS Model (RESERVED): {tts_model}")
+    logger.info(f"  TTS Provider (ACTIVE): {get_tts_provider()}")
     logger.info(f"  OpenAI Realtime Model (RESERVED): {realtime_model}")
     logger.info(f"  Backend Router Enabled: {config['use_backend_router']}")
+    if RACE_MODE and PREEMPTIVE_MODE:
+        logger.warning("  PREEMPTIVE_MODE is ignored while RACE_MODE is on")
 
     return config
 
+# Voice used for all synthesized speech (also part of the TTS cache key)
+TTS_VOICE = os.environ.get("TTS_VOICE", "alloy")
+
+# Job-lifetime tasks nothing awaits (the event loop only holds weak references)
+_background_tasks: Set[asyncio.Task] = set()
+
+# Maximum time to wait for the mobile participant's audio track before greeting
+AUDIO_TRACK_TIMEOUT = float(os.environ.get("AUDIO_TRACK_TIMEOUT", "10"))
+
+async def wait_for_audio_track(room: Optional[rtc.Room], timeout: float) -> bool:
+    """
+    Wait until a remote participant's audio track is subscribed.
+
+    Returns:
+        bool: True once an audio track is subscribed, False on timeout
+    """
+    if room is None:
+        return True
+
+    for participant in room.remote_participants.values():
+        for publication in participant.track_publications.values():
+            if publication.kind == rtc.TrackKind.KIND_AUDIO and publication.subscribed:
+                return True
+
+    subscribed = asyncio.Event()
+
+    def on_track_subscribed(track: rtc.Track, publication: rtc.RemoteTrackPublication, participant: rtc.RemoteParticipant):
+        if track.kind == rtc.TrackKind.KIND_AUDIO:
+            logger.info(f"Audio track subscribed from {participant.identity}")
+            subscribed.set()
+
+    room.on("track_subscribed", on_track_subscribed)
+    try:
+        await asyncio.wait_for(subscribed.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        room.off("track_subscribed", on_track_subscribed)
+
 # Create AImee agent class
 class AImeeAgent(Agent):
-    def __init__(self, use_backend_router=False, room_name: str = "", is_reconnection: bool = False):
+    def __init__(
+        self,
+        use_backend_router=False,
+        room_name: str = "",
+        is_reconnection: bool = False,
+        room: Optional[rtc.Room] = None,
+        backend=None,
+    ):
         super().__init__(
             instructions=get_aimee_instructions(),
         )
         self.use_backend_router = use_backend_router
         self.room_name = room_name
+        self.room = room
         self.is_reconnection = is_reconnection
         self._session_started = False
         self.transcript_session_id: Optional[str] = None
 
+        # Backend for this session (the shared client unless replaying), wrapped to record the session if enabled
+        self.recorder = SessionRecorder(room_name) if SESSION_RECORDING else None
+        backend = backend or backend_client
+        self.backend = RecordingBackend(backend, self.recorder) if self.recorder else backend
+
+        # Race mode opens its own backend stream per turn and would never claim a speculative one
+        self.preemptive = (
+            PreemptiveRequester(backend=self.backend)
+            if PREEMPTIVE_MODE and not RACE_MODE and use_backend_router else None
+        )
+        self._pending_turn: Optional[asyncio.Task] = None
+        # Speech that started while a reply was pending - not a barge-in until
+        # it passes the session's interruption thresholds or ends in a transcript
+        self._barge_in_at: Optional[float] = None
+        self._barge_in_timer: Optional[asyncio.TimerHandle] = None
+        self.timeline: Optional[TurnTimeline] = None
+        self.cancellations: Dict[str, int] = {
+            "interrupted_replies": 0,
+            "cancelled_before_playback": 0,
+            "streams_aborted": 0,
+            "turns_abandoned": 0,
+        }
+        self.arrivals = ArrivalPrefetcher(user_id="voice-user", warm_audio=self._warm_tts, backend=self.backend)
+        # Last reply, replayed locally for "repeat that"
+        self.last_reply = LastReply()
+        self.local_intents: Dict[str, int] = {}
+        # Tour context for response cache keys, from the app's location messages
+        self.current_route_id: Optional[str] = None
+        self.current_marker_id: Optional[str] = None
+        self.travel_mode = "drive"
+        self.prompt_version = get_prompt_version()
+        logger.info(f"AImee agent created for room '{room_name}' with prompt version {self.prompt_version}")
+
     async def on_enter(self):
-        """Called when agent becomes active"""
+        """
+        Called when agent becomes active
+
+        Session bring-up runs concurrently: greeting generation and the wait
+        for the mobile participant's audio track overlap, while the transcript
+        session start and the trip memory clear (on reconnection) go through
+        the outbox. The greeting plays as soon as both the text and the audio
+        track are ready.
+        """
         # Prevent duplicate greetings if on_enter is called multiple times
         if self._session_started:
             logger.info("AImee agent on_enter called but session already started - skipping greeting")
             return
         self._session_started = True
 
+        # Normally warm since job start; retries if that warmup failed
+        if self.use_backend_router:
+            self.backend.prewarm()
+
+        turn_metrics.session_started()
+        self._record("session", room=self.room_name, reconnection=self.is_reconnection, prompt_version=self.prompt_version)
+
+        # Session events feed the per-turn timeline; interim transcripts also
+        # drive preemptive requests and barge-in cancels an in-flight fetch
+        self.session.on("user_input_transcribed", self._on_user_input_transcribed)
+        self.session.on("user_state_changed", self._on_user_state_changed)
+        self.session.on("agent_state_changed", self._on_agent_state_changed)
+        self.session.on("metrics_collected", self._on_metrics_collected)
+
         if self.is_reconnection:
             logger.info("AImee agent entering session - RECONNECTION detected, sending welcome back message")
         else:
             logger.info("AImee agent entering session - NEW session, sending greeting")
 
-        # Start transcript session if backend router is enabled
-        if self.use_backend_router:
+        bringup_start = time.perf_counter()
+        timings: Dict[str, float] = {}
+
+        async def timed(step: str, coro):
+            start = time.perf_counter()
             try:
-                session_response = await backend_client.start_session(
-                    user_id="voice-user",
-                    is_reconnection=self.is_reconnection
-                )
-                if session_response.success:
-                    self.transcript_session_id = session_response.session_id
-                    logger.info(f"Transcript session started: {self.transcript_session_id}")
-                else:
-                    logger.warning(f"Failed to start transcript session: {session_response.error}")
-            except Exception as e:
-                logger.error(f"Error starting transcript session: {e}")
+                return await coro
+            finally:
+                timings[step] = (time.perf_counter() - start) * 1000
 
-            # If reconnection, clear trip memory
-            if self.is_reconnection:
-                try:
-                    logger.info("Sending trip memory clear signal due to reconnection")
-                    await backend_client.chat(
-                        user_id="voice-user",
-                        user_input="[SYSTEM: User reconnected - clear trip memory]",
-                        context={"mode": "voice", "source": "livekit", "systemMessage": True, "clearTrip": True},
-                        session_id=self.transcript_session_id
-                    )
-                except Exception as e:
-                    logger.error(f"Error clearing trip memory: {e}")
-
-        # Wait a moment for mobile app audio tracks to be fully established
-        # This prevents the greeting from being sent before mobile can receive it
-        await asyncio.sleep(2.0)
-
-        # Check if we should use backend routing for memory-aware greeting
+        # Wait for the mobile app's audio track so the greeting isn't sent before it can be heard
+        audio_task = asyncio.create_task(timed("audio_track", wait_for_audio_track(self.room, AUDIO_TRACK_TIMEOUT)))
+
+        greeting_task = None
         if self.use_backend_router:
-            # Use backend to check for existing user memory and provide appropriate greeting
-            try:
-                if self.is_reconnection:
-                    # User reconnected - acknowledge the reconnection and use their name if known
-                    # Trip memory has been cleared above
-                    system_message = "[SYSTEM: The user has just reconnected after briefly leaving. Welcome them back warmly. If you know their name, use it. Keep it brief - just acknowledge you're glad they're back and ask how you can help. Note: Trip memory has been cleared.]"
-                else:
-                    # New session - check for stored name
-                    system_message = "[SYSTEM: This is a new session. Check if the user has a stored name and greet accordingly. If no name is stored, ask for their name. If a name is stored, greet them by name.]"
-
-                backend_response = await backend_client.chat(
-                    user_id="voice-user",
-                    user_input=system_message,
-                    context={
-                        "mode": "voice",
-                        "source": "livekit",
-                        "session_start": True,
-                        "is_reconnection": self.is_reconnection
-                    },
-                    session_id=self.transcript_session_id
-                )
+            greeting_task = asyncio.create_task(self._generate_backend_greeting(timed))
 
-                if backend_response.success:
-                    logger.info(f"Backend memory-aware greeting successful via {backend_response.agent} agent")
-                    await self.session.say(backend_response.response, allow_interruptions=True, add_to_chat_ctx=True)
-                    return
-                else:
-                    logger.error(f"Backend greeting failed: {backend_response.error}")
-            except Exception as e:
-                logger.error(f"Backend greeting error: {e}")
+        greeting_text = await greeting_task if greeting_task else None
 
-        # Fallback: Always use main AImee system prompt for initial greeting
-        # This happens when backend routing is disabled or fails
-        if self.is_reconnection:
-            await self.session.generate_reply(
-                instructions="Welcome the user back briefly. They just reconnected after a brief interruption. Ask how you can help them."
-            )
+        if not await audio_task:
+            logger.warning(f"No subscribed audio track after {AUDIO_TRACK_TIMEOUT}s - greeting anyway")
+
+        timings["total"] = (time.perf_counter() - bringup_start) * 1000
+        logger.info("Session bring-up timings: " + ", ".join(f"{step}={ms:.0f}ms" for step, ms in timings.items()))
+
+        if greeting_text:
+            await self._say_cached(greeting_text)
         else:
-            await self.session.generate_reply(
-                instructions="Greet the user warmly and let them know you're AImee, their AI tour guide assistant, ready to help with location information and travel guidance. Ask what you should call them."
-            )
+            # Fallback: Always use main AImee system prompt for initial greeting
+            # This happens when backend routing is disabled or fails
+            if self.is_reconnection:
+                await self._generate_reply(
+                    instructions="Welcome the user back briefly. They just reconnected after a brief interruption. Ask how you can help them."
+                )
+            else:
+                await self._generate_reply(
+                    instructions="Greet the user warmly and let them know you're AImee, their AI tour guide assistant, ready to help with location information and travel guidance. Ask what you should call them."
+                )
+
+    def _start_transcript_session(self):
+        """
+        Start the backend transcript session for this agent session
+
+        The session id is chosen here so turns can reference it right away;
+        the backend learns about the session through the outbox.
+        """
+        timestamp = datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+        self.transcript_session_id = f"{timestamp}-{uuid.uuid4().hex[:6]}"
+
+        outbox.enqueue("session.start", {
+            "userId": "voice-user",
+            "sessionId": self.transcript_session_id,
+            "isReconnection": self.is_reconnection
+        })
+        logger.info(f"Transcript session started: {self.transcript_session_id}")
+
+    async def _generate_backend_greeting(self, timed) -> Optional[str]:
+        """
+        Generate a memory-aware greeting through the backend.
+
+        The transcript session id is chosen first so the greeting is recorded
+        under it. Its session.start is delivered later by the outbox; the
+        backend creates the session on the greeting's first message and fills
+        in its flags when session.start arrives.
+
+        On a reconnection the greeting also clears trip memory ("clearTrip"),
+        so the Memory Agent has cleared it before the welcome back is generated.
+
+        Returns:
+            Optional[str]: Greeting text, or None if the fallback greeting should be used
+        """
+        self._start_transcript_session()
+
+        try:
+            if self.is_reconnection:
+                # User reconnected - acknowledge the reconnection and use their name if known
+                system_message = "[SYSTEM: The user has just reconnected after briefly leaving. Welcome them back warmly. If you know their name, use it. Keep it brief - just acknowledge you're glad they're back and ask how you can help. Note: Trip memory has been cleared.]"
+            else:
+                # New session - check for stored name
+                system_message = "[SYSTEM: This is a new session. Check if the user has a stored name and greet accordingly. If no name is stored, ask for their name. If a name is stored, greet them by name.]"
+
+            backend_response = await timed("greeting", self.backend.chat(
+                user_id="voice-user",
+                user_input=system_message,
+                context={
+                    "mode": "voice",
+                    "source": "livekit",
+                    "session_start": True,
+                    "is_reconnection": self.is_reconnection,
+                    "clearTrip": self.is_reconnection
+                },
+                session_id=self.transcript_session_id
+            ))
+
+            if backend_response.success:
+                logger.info(f"Backend memory-aware greeting successful via {backend_response.agent} agent")
+                return backend_response.response
+
+            logger.error(f"Backend greeting failed: {backend_response.error}")
+        except Exception as e:
+            logger.error(f"Backend greeting error: {e}")
+
+        return None
 
     async def on_user_turn_completed(self, turn_ctx, new_message):
         """Handle user turn completion - override to route through backend or direct OpenAI"""
@@ -215,7 +364,12 @@ class AImeeAgent(Agent):
 
         if self.use_backend_router:
             # Try backend processing - if it succeeds, stop further processing
-            backend_handled = await self._handle_backend_speech(user_input)
+            if await self._handle_local_intent(user_input) or await self._handle_cached_reply(user_input):
+                backend_handled = True
+            elif RACE_MODE:
+                backend_handled = await self._handle_race(turn_ctx, user_input)
+            else:
+                backend_handled = await self._handle_backend_speech(user_input)
             if backend_handled:
                 # Prevent LiveKit from continuing with standard LLM processing
                 # This prevents double responses and additional OpenAI calls
@@ -230,7 +384,7 @@ class AImeeAgent(Agent):
             else:
                 # Backend failed, fall back to direct LLM processing
                 logger.info("Backend processing failed, using direct LLM fallback")
-                await self.session.generate_reply()
+                await self._generate_reply()
         else:
             # Use standard LiveKit Agent behavior for direct OpenAI
             await super().on_user_turn_completed(turn_ctx, new_message)
@@ -242,20 +396,31 @@ class AImeeAgent(Agent):
         Returns:
             bool: True if backend processing was successful, False if fallback needed
         """
+        if self.backend.streaming or self.preemptive:
+            return await self._handle_backend_speech_stream(user_input)
+
         try:
-            backend_response = await backend_client.chat(
+            turn_id = uuid.uuid4().hex
+            backend_response = await self._fetch_reply(turn_id, self.backend.chat(
                 user_id="voice-user",
                 user_input=user_input,
                 context={"mode": "voice", "source": "livekit"},
-                session_id=self.transcript_session_id
-            )
+                session_id=self.transcript_session_id,
+                turn_id=turn_id
+            ))
+            if backend_response is None:
+                return True  # User barged in - the next turn supersedes this one
 
             if backend_response.success:
                 logger.info(f"Backend response successful via {backend_response.agent} agent")
                 logger.info(f"Response: {backend_response.response[:100]}{'...' if len(backend_response.response) > 100 else ''}")
 
                 # Use TTS to speak the backend response
-                await self.session.say(backend_response.response, allow_interruptions=True, add_to_chat_ctx=True)
+                await self._say_cached(backend_response.response)
+                await response_cache.put(
+                    user_input, self.room_name, self.current_route_id, self.current_marker_id, self.travel_mode,
+                    backend_response.response, backend_response.agent, backend_response.metadata
+                )
                 return True  # Backend processing successful
             else:
                 logger.error(f"Backend response failed: {backend_response.error}")
@@ -265,39 +430,487 @@ class AImeeAgent(Agent):
             logger.error(f"Backend speech handling error: {e}")
             return False  # Backend processing failed
 
+    async def _handle_backend_speech_stream(self, user_input: str) -> bool:
+        """
+        Route user speech through the backend and speak the reply as it streams in.
+
+        The text stream is handed to session.say() directly, so TTS starts on
+        the first complete sentence instead of waiting for the full reply.
+
+        Returns:
+            bool: True if backend processing was successful, False if fallback needed
+        """
+        try:
+            # A matching speculative request keeps its turn id, so barge-in abandons the right turn
+            turn_id = (self.preemptive.claim(user_input) if self.preemptive else None) or uuid.uuid4().hex
+            stream = await self._fetch_reply(turn_id, self._open_stream(user_input, turn_id))
+            if stream is None:
+                return True  # User barged in - the next turn supersedes this one
+
+            if not stream.success:
+                logger.error(f"Backend stream failed: {stream.error}")
+                return False  # Nothing spoken yet - safe to fall back
+
+            logger.info(f"Backend stream started via {stream.agent} agent")
+            await self._speak(stream)
+
+            if stream.session_id != self.transcript_session_id:
+                # Speculative requests aren't recorded by the backend - record the claimed turn now
+                self._record_transcript(user_input, stream.text)
+
+            if not stream.success:
+                # The backend failed mid-reply; what was already spoken stands
+                logger.error(f"Backend stream ended with error: {stream.error}")
+            elif stream.complete:
+                await response_cache.put(
+                    user_input, self.room_name, self.current_route_id, self.current_marker_id, self.travel_mode,
+                    stream.text, stream.agent, stream.metadata
+                )
+
+            response_text = stream.text
+            logger.info(f"Response: {response_text[:100]}{'...' if len(response_text) > 100 else ''}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Backend speech streaming error: {e}")
+            return False
+
+    async def _handle_cached_reply(self, user_input: str) -> bool:
+        """
+        Answer a repeat question from the response cache, skipping the backend.
+
+        The exchange is still appended to the transcript, in the background.
+
+        Returns:
+            bool: True if a cached reply was spoken
+        """
+        cached = await response_cache.get(
+            user_input, self.room_name, self.current_route_id, self.current_marker_id, self.travel_mode
+        )
+        if cached is None:
+            return False
+
+        logger.info(f"Response cache hit ({cached.agent} agent) for: {user_input[:60]}{'...' if len(user_input) > 60 else ''}")
+        self._mark("cache_hit", agent=cached.agent)
+
+        # A speculative request for this turn is no longer needed
+        if self.preemptive:
+            self.preemptive.close()
+
+        self._record_transcript(user_input, cached.response)
+        await self._say_cached(cached.response)
+        return True
+
+    async def _handle_local_intent(self, user_input: str) -> bool:
+        """
+        Handle a trivial control utterance ("repeat that", "stop", "thanks") in the agent.
+
+        Returns:
+            bool: True if it was handled locally, False if it should go to the backend
+        """
+        intent = match_intent(user_input)
+        if intent is None:
+            return False
+        if intent == "repeat" and self.last_reply.text is None:
+            return False  # Nothing to repeat yet - let the backend answer
+
+        logger.info(f"Local intent '{intent}' for: {user_input}")
+        self._mark("local_intent", intent=intent)
+        self.local_intents[intent] = self.local_intents.get(intent, 0) + 1
+
+        # A speculative request for this turn is no longer needed
+        if self.preemptive:
+            self.preemptive.close()
+
+        if intent == "stop":
+            # The utterance itself barged in on current speech; also drop anything still pending
+            if self._pending_turn is not None and not self._pending_turn.done():
+                self._pending_turn.cancel()
+            self.session.interrupt()
+            self._record_transcript(user_input)
+            return True
+
+        if intent == "repeat":
+            self._record_transcript(user_input, self.last_reply.text)
+            audio = self.last_reply.audio()
+            if audio is not None:
+                await self._speak(self.last_reply.text, audio=audio, remember=False)
+            else:
+                await self._say_cached(self.last_reply.text)
+            return True
+
+        reply = acknowledgement(intent)
+        self._record_transcript(user_input, reply)
+        await self._say_cached(reply)
+        return True
+
+    def _record_transcript(self, user_input: Optional[str], reply: Optional[str] = None):
+        """Append a turn (or the part of it) the backend didn't record to the transcript (via the outbox)"""
+        if not self.transcript_session_id:
+            return
+        messages = [{"role": "user", "content": user_input}] if user_input else []
+        if reply:
+            messages.append({"role": "assistant", "content": reply})
+        if not messages:
+            return
+        outbox.enqueue("session.messages", {
+            "userId": "voice-user",
+            "sessionId": self.transcript_session_id,
+            "messages": messages
+        })
+
+    async def _open_stream(self, user_input: str, turn_id: str):
+        """Take the claimed speculative stream, or open a new backend stream"""
+        stream = await self.preemptive.take() if self.preemptive else None
+        if stream is None:
+            stream = await self.backend.chat_stream(
+                user_id="voice-user",
+                user_input=user_input,
+                context={"mode": "voice", "source": "livekit"},
+                session_id=self.transcript_session_id,
+                turn_id=turn_id
+            )
+        return stream
+
+    async def _fetch_reply(self, turn_id: str, coro):
+        """
+        Await a backend reply that the user can cancel by barging in.
+
+        Returns:
+            The reply, or None if the user barged in with a new turn before it
+            arrived (the request is cancelled and the backend told to abandon the turn)
+        """
+        task = asyncio.create_task(coro)
+        self._pending_turn = task
+        self._mark("backend_start")
+        try:
+            await asyncio.wait({task})
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            self._pending_turn = None
+            self._clear_barge_in()
+
+        if not task.cancelled():
+            reply = task.result()
+            self._mark("backend_end", agent=reply.agent)
+            return reply
+
+        if await self.backend.abandon_turn(turn_id):
+            self.cancellations["turns_abandoned"] += 1
+        return None
+
+    def _on_user_state_changed(self, event):
+        """Start a turn timeline at end of speech; watch speech over a pending reply for barge-in"""
+        self._record("user_state", old=event.old_state, new=event.new_state)
+        if event.old_state == "speaking" and event.new_state == "listening":
+            # Shorter than an interruption - only a final transcript can still cancel the reply
+            if self._barge_in_timer is not None:
+                self._barge_in_timer.cancel()
+                self._barge_in_timer = None
+            self._finish_timeline()
+            self.timeline = TurnTimeline(end_of_speech=getattr(event, "created_at", None))
+            return
+
+        if event.new_state != "speaking":
+            return
+        task = self._pending_turn
+        if task is None or task.done():
+            return
+
+        # A cough or an "uh-huh" must not throw away the reply
+        self._clear_barge_in()
+        self._barge_in_at = time.time()
+        min_duration, min_words = self._interruption_thresholds()
+        if not min_words:
+            self._barge_in_timer = asyncio.get_running_loop().call_later(min_duration, self._cancel_pending_turn)
+
+    def _check_barge_in(self, transcript: str, is_final: bool):
+        """Cancel the pending reply once speech over it is a new user turn"""
+        if self._barge_in_at is None or not transcript.strip():
+            return
+        min_duration, min_words = self._interruption_thresholds()
+        if is_final or (
+            len(transcript.split()) >= min_words and time.time() - self._barge_in_at >= min_duration
+        ):
+            self._cancel_pending_turn()
+
+    def _interruption_thresholds(self) -> Tuple[float, int]:
+        """The session's minimum interruption duration (seconds) and word count"""
+        options = self.session.options
+        interruption = getattr(options, "interruption", None)
+        if interruption is not None:
+            return interruption.get("min_duration", 0.5), interruption.get("min_words", 0)
+        # Older livekit-agents keep them as flat session options
+        return getattr(options, "min_interruption_duration", 0.5), getattr(options, "min_interruption_words", 0)
+
+    def _cancel_pending_turn(self):
+        self._clear_barge_in()
+        task = self._pending_turn
+        if task is not None and not task.done():
+            task.cancel()
+            self.cancellations["cancelled_before_playback"] += 1
+            logger.info("User barged in before the reply started - cancelled backend request")
+
+    def _clear_barge_in(self):
+        if self._barge_in_timer is not None:
+            self._barge_in_timer.cancel()
+        self._barge_in_timer = None
+        self._barge_in_at = None
+
+    async def _speak(self, text, audio=None, remember: bool = True):
+        """
+        Speak a reply and cancel its outstanding work if the user interrupts it.
+
+        Args:
+            text: Complete text, or a backend/LLM stream still producing text
+            audio: Optional pre-synthesized (or cache-synthesizing) audio frames
+            remember: Keep the reply (and its audio) for "repeat that"
+        """
+        capture = None
+        if remember and audio is not None:
+            capture = ReplyCapture()
+            audio = capture.tee(audio)
+
+        handle = self.session.say(text, audio=audio, allow_interruptions=True, add_to_chat_ctx=True)
+        await handle
+        if remember:
+            self.last_reply.remember(text if isinstance(text, str) else getattr(text, "text", ""), capture, not handle.interrupted)
+        if not handle.interrupted:
+            return
+
+        self.cancellations["interrupted_replies"] += 1
+        self._mark("interrupted", interrupted=True)
+
+        # Stop the backend from producing text nobody will hear
+        if hasattr(text, "abort") and not text.complete:
+            text.abort()
+            self.cancellations["streams_aborted"] += 1
+            turn_id = getattr(text, "turn_id", None)
+            if turn_id and await self.backend.abandon_turn(turn_id):
+                self.cancellations["turns_abandoned"] += 1
+            logger.info(f"Reply interrupted - aborted {getattr(text, 'agent', 'backend')} stream")
+
+        # Drop audio still queued for synthesis (a cache miss is then not stored)
+        if audio is not None and hasattr(audio, "aclose"):
+            await audio.aclose()
+
+    async def _handle_race(self, turn_ctx, user_input: str) -> bool:
+        """
+        Race the backend router against a hedged direct LLM generation.
+
+        Like the other backend paths, the race runs under _fetch_reply: barging
+        in cancels it and abandons the backend turn.
+
+        Returns:
+            bool: True if either produced a reply that was spoken, False if fallback needed
+        """
+        turn_id = uuid.uuid4().hex
+
+        async def race():
+            stream, info = await race_first_sentence(
+                self.session.llm,
+                turn_ctx,
+                self.instructions,
+                user_input,
+                self.transcript_session_id,
+                backend=self.backend,
+                turn_id=turn_id,
+            )
+            timings = ", ".join(f"{k}={v:.0f}" if isinstance(v, float) else f"{k}={v}" for k, v in info.items())
+            logger.info(f"Race decision: {timings}")
+            if stream is None:
+                raise RuntimeError("Neither the backend nor the direct LLM produced a reply")
+            return stream
+
+        try:
+            stream = await self._fetch_reply(turn_id, race())
+        except Exception as e:
+            logger.error(f"Race mode error: {e}")
+            return False
+        if stream is None:
+            return True  # User barged in - the next turn supersedes this one
+
+        await self._speak(stream)
+
+        if stream.agent == DirectLLMStream.agent:
+            # The backend recorded the question but not this reply - record what was spoken
+            self._record_transcript(None, stream.text)
+        return True
+
+    def _on_user_input_transcribed(self, event):
+        """Mark the final transcript; feed interim ones to the preemptive requester"""
+        self._record("transcript", text=event.transcript, final=event.is_final)
+        self._check_barge_in(event.transcript, event.is_final)
+        if event.is_final:
+            self._mark("stt_final", at=getattr(event, "created_at", None))
+        elif self.preemptive:
+            self.preemptive.on_interim(event.transcript)
+
+    def _on_agent_state_changed(self, event):
+        """First audio of a reply marks the turn; the end of the reply closes it"""
+        self._record("agent_state", old=event.old_state, new=event.new_state)
+        if event.new_state == "speaking":
+            self._mark("first_audio", at=getattr(event, "created_at", None))
+        elif event.old_state == "speaking":
+            self._finish_timeline()
+
+    def _on_metrics_collected(self, event):
+        """Take the TTS provider's time to first byte for the current turn"""
+        m = event.metrics
+        if getattr(m, "type", None) != "tts_metrics" or m.ttfb < 0:
+            return
+        # Metrics are emitted when synthesis ends; work back to its first byte
+        self._mark("tts_first_byte", at=m.timestamp - m.duration + m.ttfb)
+
+    def _record(self, event: str, **fields):
+        """Add an event to the session recording, if recording"""
+        if self.recorder is not None:
+            self.recorder.record(event, **fields)
+
+    def _mark(self, stage: str, at: Optional[float] = None, **attrs):
+        """Record a stage on the current turn's timeline, if one is open"""
+        if self.timeline is not None and not self.timeline.finished:
+            self.timeline.mark(stage, at, **attrs)
+
+    def _finish_timeline(self):
+        timeline = self.timeline
+        if timeline is None or timeline.finished:
+            return
+        if timeline.attrs.get("interrupted"):
+            outcome = "interrupted"
+        elif "first_audio" in timeline.marks:
+            outcome = "spoken"
+        else:
+            outcome = "no_reply"
+        timeline.finish(outcome)
+
+    async def _generate_reply(self, **kwargs):
+        """Let the LLM reply directly and keep what it said for "repeat that" """
+        handle = self.session.generate_reply(**kwargs)
+        await handle
+        self.last_reply.remember_generated(handle)
+
+    async def _say_cached(self, text: str):
+        """
+        Speak a complete utterance, reusing cached audio when it was synthesized before.
+
+        A cache hit plays without any TTS provider call; a miss synthesizes once
+        and stores the audio for the next time the same text is spoken.
+        """
+        tts = self.session.tts
+        if tts is None or not tts_cache.enabled:
+            await self._speak(text)
+            return
+
+        audio = await tts_cache.audio_for(tts, text, voice=TTS_VOICE, model=tts.model)
+        await self._speak(text, audio=audio)
+
+    async def _warm_tts(self, text: str):
+        """Synthesize text into the TTS cache without playing it"""
+        tts = self.session.tts
+        if tts is None or not tts_cache.enabled:
+            return
+        if await tts_cache.get(text, voice=TTS_VOICE, model=tts.model) is None:
+            async for _ in tts_cache.synthesize(tts, text, voice=TTS_VOICE, model=tts.model):
+                pass
+
+    def handle_location_message(self, message: Dict[str, Any]):
+        """
+        Handle a location/marker update from the mobile app's data channel.
+
+        Location updates drive arrival prediction and narrative prefetch;
+        arrivals (detected here or reported by the app) play the narrative.
+        """
+        self._record("location", message=message)
+        message_type = message.get("type")
+
+        if message_type == "markers":
+            self.arrivals.set_markers([Marker.from_dict(m) for m in message.get("markers", [])])
+
+        elif message_type == "location":
+            fix = LocationFix.from_dict(message)
+            self.travel_mode = fix.mode
+            if self.current_marker_id is not None and self.arrivals.has_left(self.current_marker_id, fix):
+                logger.info(f"Left marker: {self.current_marker_id}")
+                self.current_marker_id = None
+            arrived = self.arrivals.update_location(fix)
+            if arrived:
+                asyncio.create_task(self._play_arrival(arrived, fix.mode))
+
+        elif message_type == "route":
+            self.current_route_id = str(message.get("routeId"))
+            self.current_marker_id = None
+            asyncio.create_task(self.arrivals.load_route(self.current_route_id))
+
+        elif message_type == "arrival":
+            marker = self.arrivals.index.markers.get(str(message.get("markerId")))
+            if marker is None:
+                logger.warning(f"Arrival reported for unknown marker: {message.get('markerId')}")
+            elif self.arrivals.start_cooldown(marker.id):
+                asyncio.create_task(self._play_arrival(marker, message.get("mode", "drive")))
+
+    async def _play_arrival(self, marker: Marker, mode: str):
+        """Speak the arrival narrative for a marker"""
+        logger.info(f"Arrived at marker: {marker.name} ({marker.id})")
+        self.current_marker_id = marker.id
+        self.travel_mode = mode
+
+        # Pre-rendered route pack: no network calls at all
+        entry = self.arrivals.packed(marker.id)
+        if entry is not None:
+            logger.info(f"Arrival narrative for {marker.name} served from route pack")
+            audio = entry.audio.frames() if entry.audio else None
+            await self._speak(entry.narrative, audio=audio)
+            return
+
+        if not self.use_backend_router:
+            return
+
+        start = time.perf_counter()
+        narrative = await self.arrivals.narrative_for(marker, mode)
+        if narrative:
+            logger.info(f"Arrival narrative ready in {(time.perf_counter() - start) * 1000:.0f}ms")
+            await self._say_cached(narrative)
+
     async def on_exit(self):
         """Called when agent is replaced or session ends"""
         logger.info("AImee agent exiting session")
+        logger.info(f"TTS cache stats: {tts_cache.get_stats()}")
+        if get_tts_provider() == "sesame":
+            logger.info(f"Sesame TTS stats: {sesame_pool.get_stats()}")
+        logger.info(f"Response cache stats: {response_cache.get_stats()}")
+        logger.info(f"Arrival prefetch stats: {self.arrivals.stats}")
+        logger.info(f"Backend circuit: {self.backend.breaker.snapshot()}")
+        logger.info(f"Backend arrival circuit: {self.backend.arrival_breaker.snapshot()}")
+        logger.info(f"Barge-in cancellations: {self.cancellations}")
+        logger.info(f"Local intents: {self.local_intents}")
+        self._finish_timeline()
+        if self._session_started:
+            turn_metrics.session_ended()
+        if self.preemptive:
+            logger.info(f"Preemptive stats: {self.preemptive.stats} (hit rate {self.preemptive.hit_rate():.0%})")
+            self.preemptive.close()
+        self.arrivals.close()
 
-        # Send session end signal to Memory Agent to preserve trip in history
+        # Session end signal to the Memory Agent (to preserve the trip in history),
+        # then the transcript session end - both delivered in order by the outbox
         if self.transcript_session_id and self.use_backend_router:
-            try:
-                logger.info("Sending session end signal to Memory Agent")
-                await backend_client.chat(
-                    user_id="voice-user",
-                    user_input="[SYSTEM: Session ending]",
-                    context={"mode": "voice", "source": "livekit", "systemMessage": True},
-                    session_id=self.transcript_session_id
-                )
-            except Exception as e:
-                logger.error(f"Error sending session end signal: {e}")
+            logger.info("Sending session end signal to Memory Agent")
+            outbox.enqueue("chat", {
+                "userId": "voice-user",
+                "input": "[SYSTEM: Session ending]",
+                "context": {"mode": "voice", "source": "livekit", "systemMessage": True},
+                "sessionId": self.transcript_session_id
+            })
 
-        # End transcript session if one was started
         if self.transcript_session_id:
-            try:
-                session_response = await backend_client.end_session(
-                    user_id="voice-user",
-                    session_id=self.transcript_session_id
-                )
-                if session_response.success:
-                    logger.info(f"Transcript session ended: {self.transcript_session_id}")
-                else:
-                    logger.warning(f"Failed to end transcript session: {session_response.error}")
-            except Exception as e:
-                logger.error(f"Error ending transcript session: {e}")
+            outbox.enqueue("session.end", {"userId": "voice-user", "sessionId": self.transcript_session_id})
+            logger.info(f"Transcript session ended: {self.transcript_session_id}")
 
-        # Close backend client session
-        await backend_client.close()
+        if self.recorder is not None:
+            await self.recorder.close()
 
 # Create the AgentServer
 server = AgentServer()
@@ -308,6 +921,16 @@ def prewarm(proc: JobProcess):
     logger.info("Prewarming AImee agent models...")
     proc.userdata["vad"] = silero.VAD.load()
     proc.userdata["config"] = config
+    proc.userdata["session_registry"] = create_session_registry()
+    proc.userdata["providers"] = ProviderPool(
+        api_key=config["openai_api_key"],
+        llm_model=config["openai_model"],
+        tts_voice=TTS_VOICE,
+    )
+
+    # Load prompts once per process; sessions read them from memory
+    prompt_registry.load_all()
+    prompt_registry.start_watcher()
 
 server.setup_fnc = prewarm
 
@@ -322,54 +945,81 @@ async def entrypoint(ctx: JobContext):
 
     logger.info(f"AImee Agent starting session in room '{room_name}'")
 
+    # Session bookkeeping is written behind; drain it before the job process exits
+    outbox.start()
+
+    # Warm the shared provider connections while the session is being set up
+    providers: ProviderPool = ctx.proc.userdata["providers"]
+    warm_task = asyncio.create_task(providers.warm())
+    _background_tasks.add(warm_task)
+    warm_task.add_done_callback(_background_tasks.discard)
+    if config["use_backend_router"]:
+        backend_client.prewarm()
+
+    async def close_shared_pools():
+        # The outbox drains over the backend pool, so it goes first
+        await outbox.close()
+        await backend_client.close()
+        await providers.aclose()
+
+    ctx.add_shutdown_callback(close_shared_pools)
+
     # Check if this is a reconnection (user force-quit and rejoined)
+    # The registry only returns sessions seen within SESSION_TTL_SECONDS
+    registry: SessionRegistry = ctx.proc.userdata["session_registry"]
     is_reconnection = False
-    if room_name in _active_sessions:
-        last_session = _active_sessions[room_name]
-        # If we had a session within the last 5 minutes, treat as reconnection
-        time_since_last = time.time() - last_session.get("last_seen", 0)
-        if time_since_last < 300:  # 5 minutes
-            is_reconnection = True
-            logger.info(f"Detected RECONNECTION - user was last seen {time_since_last:.1f}s ago")
-        else:
-            logger.info(f"Previous session expired ({time_since_last:.1f}s ago) - treating as new session")
+    try:
+        last_session = await registry.get(room_name)
+    except Exception as e:
+        logger.error(f"Session registry lookup failed - treating as new session: {e}")
+        last_session = None
+
+    if last_session is not None:
+        time_since_last = time.time() - last_session.last_seen
+        is_reconnection = True
+        logger.info(f"Detected RECONNECTION - user was last seen {time_since_last:.1f}s ago")
     else:
-        logger.info("No previous session found - this is a new session")
+        logger.info("No recent session found - this is a new session")
 
     # Track this session
-    _active_sessions[room_name] = {
-        "started": time.time(),
-        "last_seen": time.time(),
-        "participant_connected": False
-    }
+    now = time.time()
+    try:
+        await registry.put(room_name, SessionRecord(started=now, last_seen=now, participant_connected=False))
+    except Exception as e:
+        logger.error(f"Failed to record session in registry: {e}")
+
+    def touch_registry(participant_connected: bool):
+        async def _touch():
+            try:
+                await registry.touch(room_name, participant_connected=participant_connected)
+            except Exception as e:
+                logger.error(f"Failed to update session registry: {e}")
+        asyncio.create_task(_touch())
 
     # Session holder to track current session state for reconnection handling
     # had_active_session: prevents duplicate sessions on fresh start (only reconnect if we HAD a session that closed)
-    session_holder: Dict[str, Any] = {"session": None, "active": False, "had_active_session": False}
+    session_holder: Dict[str, Any] = {"session": None, "agent": None, "active": False, "had_active_session": False}
 
     # Helper function to create a new agent session
     async def create_agent_session(is_reconnect: bool = False):
         """Create and start a new agent session"""
+        # Provider plugins are per-session but share the process-wide connection pool
         new_session = AgentSession(
             vad=ctx.proc.userdata["vad"],
-            stt=openai.STT(api_key=config["openai_api_key"]),
-            llm=openai.LLM(
-                model=config["openai_model"],
-                api_key=config["openai_api_key"],
-            ),
-            tts=openai.TTS(
-                api_key=config["openai_api_key"],
-                voice="alloy",
-            ),
+            stt=providers.stt(interim=PREEMPTIVE_MODE and not RACE_MODE),
+            llm=providers.llm(),
+            tts=providers.tts(),
         )
 
         new_agent = AImeeAgent(
             use_backend_router=config["use_backend_router"],
             room_name=room_name,
-            is_reconnection=is_reconnect
+            is_reconnection=is_reconnect,
+            room=ctx.room
         )
 
         session_holder["session"] = new_session
+        session_holder["agent"] = new_agent
         session_holder["active"] = True
         session_holder["had_active_session"] = True  # Mark that we've had at least one session
 
@@ -384,8 +1034,7 @@ async def entrypoint(ctx: JobContext):
     def on_participant_connected(participant: rtc.RemoteParticipant):
         if participant.identity != config["participant_identity"]:
             logger.info(f"Participant connected: {participant.identity}")
-            _active_sessions[room_name]["last_seen"] = time.time()
-            _active_sessions[room_name]["participant_connected"] = True
+            touch_registry(participant_connected=True)
 
             # Only create a new session if we previously HAD an active session that was closed
             # This prevents duplicate sessions on fresh start (where initial session is still being created)
@@ -399,11 +1048,20 @@ async def entrypoint(ctx: JobContext):
     def on_participant_disconnected(participant: rtc.RemoteParticipant):
         if participant.identity != config["participant_identity"]:
             logger.info(f"Participant disconnected: {participant.identity}")
-            _active_sessions[room_name]["last_seen"] = time.time()
-            _active_sessions[room_name]["participant_connected"] = False
+            touch_registry(participant_connected=False)
             # Mark session as inactive - it will be closed by LiveKit automatically
             session_holder["active"] = False
 
+    # Location and marker updates from the mobile app drive arrival prefetch
+    @ctx.room.on("data_received")
+    def on_data_received(packet: rtc.DataPacket):
+        if packet.topic != LOCATION_TOPIC or session_holder["agent"] is None:
+            return
+        try:
+            session_holder["agent"].handle_location_message(json.loads(packet.data))
+        except Exception as e:
+            logger.warning(f"Ignoring malformed location message: {e}")
+
     # Create initial agent session
     logger.info("Creating initial AImee agent session")
     await create_agent_session(is_reconnect=is_reconnection)
@@ -412,5 +1070,19 @@ if __name__ == "__main__":
     """Run the LiveKit Agents worker"""
     logger.info("Starting AImee LiveKit Agents worker...")
 
+    # Offline batch job: pre-render a route pack instead of running the worker
+    if len(sys.argv) > 1 and sys.argv[1] == "build-route-pack":
+        import route_pack
+
+        pool = ProviderPool(
+            api_key=os.environ.get("OPENAI_API_KEY", ""),
+            llm_model=get_llm_model(),
+            tts_voice=TTS_VOICE,
+        )
+        sys.exit(route_pack.main(sys.argv[2:], tts_factory=pool.tts))
+
+    # Serve per-turn latency histograms and session gauges from all job processes
+    turn_metrics.start_metrics_server()
+
     # Configure and start the LiveKit Agents worker
     cli.run_app(server)
\ No newline at end of file
@@ -11,6 +11,10 @@ PHASE 8 - THREE MODEL ARCHITECTURE:
 
 Current behavior: STT + LLM (gpt-4o-mini) + LiveKit TTS
 Future behavior: Direct GPT-4o-TTS or Realtime STS models with minimal code changes
+
+TTS PROVIDER:
+- openai: LiveKit OpenAI TTS plugin (default)
+- sesame: Self-hosted Sesame service, failing over to OpenAI TTS per utterance
 """
 
 import os
@@ -46,6 +50,19 @@ def get_tts_model() -> str:
     """
     return os.getenv("OPENAI_TTS_MODEL", "gpt-4o-tts")
 
+def get_tts_provider() -> str:
+    """
+    Get the TTS provider used to speak replies.
+
+    Returns:
+        str: 'openai' (default) or 'sesame'
+
+    Environment Variables:
+        TTS_PROVIDER: Select the TTS provider (optional)
+    """
+    provider = os.getenv("TTS_PROVIDER", "openai").lower()
+    return provider if provider in ("openai", "sesame") else "openai"
+
 def get_realtime_model() -> str:
     """
     Get the OpenAI Realtime model for speech-to-speech conversation.
@@ -75,17 +92,20 @@ def get_model_config() -> dict:
     """
     llm_model = get_llm_model()
     tts_model = get_tts_model()
+    tts_provider = get_tts_provider()
     realtime_model = get_realtime_model()
 
     return {
         "llm_model": llm_model,
         "tts_model": tts_model,
+        "tts_provider": tts_provider,
         "realtime_model": realtime_model,
         "temperature": 0.7,
         "max_tokens": 500,
         "description": {
             "llm": f"ACTIVE: {llm_model} for Chat Completions API",
             "tts": f"RESERVED: {tts_model} for future GPT-4o-TTS integration",
+            "tts_provider": f"ACTIVE: {tts_provider} for spoken replies",
             "realtime": f"RESERVED: {realtime_model} for future Realtime STS integration"
         }
     }
\ No newline at end of file
@@ -0,0 +1,210 @@
+"""
+Backend Channel for AImee LiveKit Agent
+
+One persistent WebSocket per worker process to the backend's /agent-channel,
+carrying the requests of every session in the process instead of a separate
+HTTP POST per turn. Requests are multiplexed by id and encoded with msgpack:
+
+    request   {"id": 7, "op": "chat", "body": {...same body as the HTTP endpoint...}}
+    result    {"id": 7, "type": "result", "status": 200, "body": {...}}
+    stream    {"id": 7, "type": "meta" | "delta" | "done" | "error", ...}
+
+Streaming chat requests ("stream": true) are answered with the same frames
+as the NDJSON endpoint, pushed as they are produced; everything else gets a
+single result frame with the HTTP status and body the endpoint would return.
+
+Operations: session.start, session.end, session.messages, chat,
+chat.abandon, arrival.
+
+When the channel can't be opened (e.g. an older backend without it),
+BackendClient falls back to HTTP and retries the channel periodically.
+"""
+
+import asyncio
+import os
+import logging
+import time
+from typing import Optional, Dict, Any, Tuple
+
+import aiohttp
+import msgpack
+
+# Configure logger
+logger = logging.getLogger("backend-channel")
+
+class BackendChannel:
+    """Multiplexed msgpack-over-WebSocket connection to the backend"""
+
+    def __init__(self, backend_url: str):
+        self.url = backend_url.replace("http://", "ws://", 1).replace("https://", "wss://", 1) + "/agent-channel"
+        self.enabled = os.getenv("BACKEND_CHANNEL", "true").lower() == "true"
+        self.connect_timeout = float(os.getenv("BACKEND_CHANNEL_CONNECT_TIMEOUT", "3"))
+        self.retry_interval = float(os.getenv("BACKEND_CHANNEL_RETRY_SECONDS", "30"))
+        self.heartbeat = float(os.getenv("BACKEND_CHANNEL_HEARTBEAT", "20"))
+
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._http_session: Optional[aiohttp.ClientSession] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._connecting: Optional[asyncio.Future] = None
+        self._pending: Dict[int, asyncio.Queue] = {}
+        self._next_id = 0
+        self._retry_at = 0.0
+
+        self.stats: Dict[str, int] = {"connects": 0, "connect_failures": 0, "requests": 0, "disconnects": 0}
+
+        logger.info("Backend Channel Configuration:")
+        logger.info(f"  Enabled: {self.enabled}")
+        logger.info(f"  URL: {self.url}")
+        logger.info(f"  Connect Timeout: {self.connect_timeout}s, retry every {self.retry_interval}s")
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None and not self._ws.closed
+
+    async def connect(self, session: aiohttp.ClientSession) -> bool:
+        """
+        Open the channel on the given HTTP session, unless already open
+
+        Returns:
+            True if the channel is usable
+        """
+        if not self.enabled:
+            return False
+        if self.connected and self._http_session is session:
+            return True
+        if time.monotonic() < self._retry_at:
+            return False
+
+        # Concurrent first requests share one connection attempt
+        if self._connecting is not None and not self._connecting.done():
+            return await asyncio.shield(self._connecting)
+
+        self._connecting = asyncio.get_running_loop().create_future()
+        connected = False
+        try:
+            await self._disconnect()
+            ws = await asyncio.wait_for(
+                session.ws_connect(self.url, heartbeat=self.heartbeat, autoping=True, max_msg_size=0),
+                timeout=self.connect_timeout
+            )
+            self._ws = ws
+            self._http_session = session
+            self._reader = asyncio.create_task(self._read_loop(ws))
+            self.stats["connects"] += 1
+            connected = True
+            logger.info(f"Backend Channel: Connected to {self.url}")
+        except Exception as e:
+            self.stats["connect_failures"] += 1
+            self._retry_at = time.monotonic() + self.retry_interval
+            logger.warning(f"Backend Channel: Connect failed ({e}) - using HTTP for the next {self.retry_interval:.0f}s")
+        finally:
+            self._connecting.set_result(connected)
+        return connected
+
+    async def _read_loop(self, ws: aiohttp.ClientWebSocketResponse):
+        """Route incoming frames to the queue of the request they answer"""
+        try:
+            async for message in ws:
+                if message.type != aiohttp.WSMsgType.BINARY:
+                    continue
+                try:
+                    frame = msgpack.unpackb(message.data, raw=False)
+                except Exception as e:
+                    logger.warning(f"Backend Channel: Skipping malformed frame: {e}")
+                    continue
+
+                # Frames for requests nobody is waiting on (e.g. aborted streams) are dropped
+                queue = self._pending.get(frame.get("id"))
+                if queue is not None:
+                    queue.put_nowait(frame)
+        except Exception as e:
+            logger.warning(f"Backend Channel: Read error: {e}")
+        finally:
+            if self._ws is ws:
+                self._ws = None
+                self.stats["disconnects"] += 1
+                logger.warning("Backend Channel: Disconnected")
+            # Wake every waiter - their requests are lost with the connection
+            for queue in self._pending.values():
+                queue.put_nowait(None)
+            self._pending.clear()
+
+    async def open(self, session: aiohttp.ClientSession, op: str, body: Dict[str, Any]) -> Optional[Tuple[int, asyncio.Queue]]:
+        """
+        Send a request over the channel
+
+        Returns:
+            (request id, frame queue), or None if the request wasn't sent
+            and should go over HTTP instead
+        """
+        if not await self.connect(session):
+            return None
+
+        self._next_id += 1
+        request_id = self._next_id
+        queue: asyncio.Queue = asyncio.Queue()
+        self._pending[request_id] = queue
+
+        try:
+            await self._ws.send_bytes(msgpack.packb({"id": request_id, "op": op, "body": body}, use_bin_type=True))
+        except Exception as e:
+            self._pending.pop(request_id, None)
+            logger.warning(f"Backend Channel: Send failed ({e}) - falling back to HTTP")
+            await self._disconnect()
+            return None
+
+        self.stats["requests"] += 1
+        return request_id, queue
+
+    @staticmethod
+    async def next_frame(queue: asyncio.Queue) -> Dict[str, Any]:
+        """Next frame for a request; raises if the connection was lost first"""
+        frame = await queue.get()
+        if frame is None:
+            raise aiohttp.ClientConnectionError("Backend channel closed")
+        return frame
+
+    def finish(self, request_id: int):
+        """Stop routing frames to a request"""
+        self._pending.pop(request_id, None)
+
+    async def request(
+        self,
+        session: aiohttp.ClientSession,
+        op: str,
+        body: Dict[str, Any],
+        timeout: Optional[float]
+    ) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """
+        Send a request and wait for its result frame
+
+        Returns:
+            (status, body) as the HTTP endpoint would have returned them, or
+            None if the request should go over HTTP instead
+        """
+        opened = await self.open(session, op, body)
+        if opened is None:
+            return None
+
+        request_id, queue = opened
+        try:
+            frame = await asyncio.wait_for(self.next_frame(queue), timeout=timeout)
+        finally:
+            self.finish(request_id)
+        return frame.get("status", 500), frame.get("body") or {}
+
+    async def _disconnect(self):
+        ws, self._ws = self._ws, None
+        reader, self._reader = self._reader, None
+        try:
+            if ws is not None and not ws.closed:
+                await ws.close()
+            if reader is not None:
+                await asyncio.gather(reader, return_exceptions=True)
+        except Exception as e:
+            # e.g. a connection left over from a previous event loop
+            logger.debug(f"Backend Channel: Error closing previous connection: {e}")
+
+    async def close(self):
+        """Close the channel (process shutdown)"""
+        await self._disconnect()
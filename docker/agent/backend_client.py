@@ -4,18 +4,31 @@ Backend Client for AImee LiveKit Agent
 HTTP client to communicate with the Node.js backend's multi-agent router.
 This allows the LiveKit agent to route user input through the backend
 instead of using direct OpenAI integration.
+
+Requests go over the process's persistent backend channel (see
+backend_channel.py) when it is available, and as HTTP POSTs otherwise.
 """
 
+import asyncio
 import os
 import logging
 import json
+import time
+import uuid
 import aiohttp
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
 from dataclasses import dataclass
 
+from backend_channel import BackendChannel
+from circuit_breaker import CircuitBreaker
+
 # Configure logger
 logger = logging.getLogger("backend-client")
 
+# Failure kinds that mean the backend is unreachable or too slow (as opposed to
+# an application-level error), and so count against the circuit breaker
+_AVAILABILITY_FAILURES = {"timeout", "network_error", "unexpected_error", "arrival_error", "http_error"}
+
 @dataclass
 class BackendResponse:
     """Response from backend multi-agent system"""
@@ -32,6 +45,244 @@ class SessionResponse:
     session_id: Optional[str] = None
     error: Optional[str] = None
 
+class BackendChatStream:
+    """
+    Incremental response from the /aimee-chat streaming mode
+
+    The backend answers streaming requests with NDJSON frames:
+        {"type": "meta", "agent": "..."}
+        {"type": "delta", "text": "..."}
+        {"type": "done", "agent": "...", "metadata": {...}}
+        {"type": "error", "error": "..."}
+
+    Iterating the stream yields response text as it arrives, so it can be
+    handed straight to session.say(). Once iteration finishes, `result`
+    holds the complete BackendResponse.
+    """
+
+    def __init__(self, response: Optional[aiohttp.ClientResponse] = None, turn_id: Optional[str] = None):
+        self._response = response
+        self.turn_id = turn_id
+        # Transcript session the backend records this turn in (None: not recorded)
+        self.session_id: Optional[str] = None
+        self._pending: List[str] = []
+        self._parts: List[str] = []
+        self._done = response is None
+        self.complete = response is None
+        self.agent = "unknown"
+        self.metadata: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+
+    @classmethod
+    def failed(cls, error: str, agent: str = "error") -> "BackendChatStream":
+        """Create an already-finished stream carrying an error"""
+        stream = cls()
+        stream.agent = agent
+        stream.error = error
+        return stream
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "BackendChatStream":
+        """Wrap a non-streaming JSON body (older backends) as a single-chunk stream"""
+        if not data.get("success"):
+            return cls.failed(data.get("error", "Unknown backend error"))
+
+        stream = cls()
+        stream.agent = data.get("agent", "unknown")
+        stream.metadata = data.get("metadata", {})
+        text = data.get("response", "")
+        if text:
+            stream._pending.append(text)
+            stream._parts.append(text)
+        return stream
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+    @property
+    def text(self) -> str:
+        """Response text received so far"""
+        return "".join(self._parts)
+
+    @property
+    def result(self) -> BackendResponse:
+        """Complete response, equivalent to what chat() would have returned"""
+        return BackendResponse(
+            success=self.success,
+            agent=self.agent if self.success else "error",
+            response=self.text,
+            metadata=self.metadata,
+            error=self.error
+        )
+
+    def _apply_frame(self, frame: Dict[str, Any]) -> Optional[str]:
+        """Update stream state from one NDJSON frame, returning any text it carries"""
+        frame_type = frame.get("type")
+
+        if frame_type == "delta":
+            text = frame.get("text", "")
+            if text:
+                self._parts.append(text)
+                return text
+        elif frame_type == "meta":
+            self.agent = frame.get("agent", self.agent)
+        elif frame_type == "done":
+            self.agent = frame.get("agent", self.agent)
+            self.metadata = frame.get("metadata", {})
+            self._done = True
+            self.complete = True
+        elif frame_type == "error":
+            self.error = frame.get("error", "Unknown backend error")
+            self._done = True
+            self.complete = True
+
+        return None
+
+    async def _next_text(self) -> Optional[str]:
+        """Read frames until one carries text or the stream ends"""
+        while not self._done:
+            line = await self._response.content.readline()
+            if not line:
+                self._done = True
+                self.complete = True
+                if not self._parts and self.error is None:
+                    self.error = "Stream ended without a response"
+                break
+
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                frame = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Backend Client: Skipping malformed stream frame: {line[:100]!r}")
+                continue
+
+            text = self._apply_frame(frame)
+            if text:
+                return text
+
+        return None
+
+    async def prime(self):
+        """
+        Wait for the first text chunk (or an error) before committing to playback
+
+        This lets the caller fall back to the direct LLM when the backend
+        fails, without having already started speech.
+        """
+        try:
+            text = await self._next_text()
+        except BaseException:
+            # Includes cancellation (e.g. losing a race) - release the connection
+            await self.aclose()
+            raise
+
+        if text:
+            self._pending.append(text)
+        if self._done:
+            await self.aclose()
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        try:
+            while self._pending:
+                yield self._pending.pop(0)
+
+            while not self._done:
+                try:
+                    text = await self._next_text()
+                except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                    # Cut off mid-reply - what was already yielded stands, but the reply failed
+                    self.error = f"Stream cut off: {e or type(e).__name__}"
+                    logger.warning(f"Backend Client: {self.error}")
+                    break
+                if text:
+                    yield text
+        finally:
+            await self.aclose()
+
+    async def aclose(self):
+        """Release the underlying HTTP response back to the connection pool"""
+        self._done = True
+        if self._response is not None:
+            self._response.release()
+            self._response = None
+
+    def abort(self):
+        """Abort an unfinished response, dropping any text not yet consumed"""
+        self._done = True
+        self._pending.clear()
+        if self._response is not None:
+            # close() drops the connection instead of draining the rest of the body
+            self._response.close()
+            self._response = None
+
+class ChannelChatStream(BackendChatStream):
+    """BackendChatStream fed by frames pushed over the backend channel"""
+
+    def __init__(
+        self,
+        channel: BackendChannel,
+        request_id: int,
+        queue: asyncio.Queue,
+        turn_id: Optional[str] = None,
+        read_timeout: Optional[float] = None
+    ):
+        super().__init__(turn_id=turn_id)
+        self._channel = channel
+        self._request_id = request_id
+        self._queue = queue
+        self._read_timeout = read_timeout
+        self._done = False
+        self.complete = False
+
+    def _apply_result(self, status: int, body: Dict[str, Any]) -> Optional[str]:
+        """Apply a non-streamed reply (e.g. a validation error or an abandoned turn)"""
+        self._done = True
+        self.complete = True
+
+        if status != 200:
+            self.agent = "http_error" if status >= 500 else "error"
+            self.error = f"HTTP {status}: {json.dumps(body)}"
+        elif not body.get("success"):
+            self.error = body.get("error", "Unknown backend error")
+        else:
+            self.agent = body.get("agent", "unknown")
+            self.metadata = body.get("metadata", {})
+            text = body.get("response", "")
+            if text:
+                self._parts.append(text)
+                return text
+        return None
+
+    async def _next_text(self) -> Optional[str]:
+        """Wait for frames until one carries text or the stream ends"""
+        while not self._done:
+            # Like sock_read on the HTTP stream, bound the wait between frames
+            frame = await asyncio.wait_for(self._channel.next_frame(self._queue), timeout=self._read_timeout)
+
+            if frame.get("type") == "result":
+                return self._apply_result(frame.get("status", 500), frame.get("body") or {})
+
+            text = self._apply_frame(frame)
+            if text:
+                return text
+
+        return None
+
+    async def aclose(self):
+        """Stop receiving frames for this request"""
+        self._done = True
+        self._channel.finish(self._request_id)
+
+    def abort(self):
+        """Abort an unfinished response, dropping any text not yet consumed"""
+        self._done = True
+        self._pending.clear()
+        self._channel.finish(self._request_id)
+
 class BackendClient:
     """HTTP client for AImee backend multi-agent router"""
 
@@ -40,27 +291,150 @@ class BackendClient:
         self.backend_url = os.getenv("BACKEND_URL", "http://backend:3000")
         self.enabled = os.getenv("USE_BACKEND_ROUTER", "false").lower() == "true"
         self.timeout = int(os.getenv("BACKEND_TIMEOUT", "10"))
-
-        # Session for connection pooling
+        self.streaming = os.getenv("BACKEND_STREAMING", "true").lower() == "true"
+
+        # Latency budgets: how long a user turn (or an arrival narrative) may
+        # wait on the backend before giving up and falling back
+        self.turn_budget = float(os.getenv("BACKEND_TURN_BUDGET_MS", "6000")) / 1000
+        self.arrival_budget = float(os.getenv("BACKEND_ARRIVAL_BUDGET_MS", str(self.timeout * 1000))) / 1000
+
+        # Skip the backend entirely while it is failing or too slow. Turns are
+        # cut off at the turn budget, so the p95 trip has to sit below it
+        self.breaker = CircuitBreaker("backend", p95_seconds=0.8 * self.turn_budget)
+
+        # Arrival narratives run on a much longer budget, so their latency
+        # gets its own window (and CIRCUIT_ARRIVAL_* tuning) instead of
+        # pushing chat turns over the p95 trip
+        self.arrival_breaker = CircuitBreaker(
+            "backend-arrival", env_prefix="CIRCUIT_ARRIVAL", p95_seconds=0.8 * self.arrival_budget
+        )
+
+        # One multiplexed connection per process, shared by every session
+        self.channel = BackendChannel(self.backend_url)
+
+        # Connection pool configuration
+        self.pool_limit = int(os.getenv("BACKEND_POOL_LIMIT", "100"))
+        self.pool_limit_per_host = int(os.getenv("BACKEND_POOL_LIMIT_PER_HOST", "20"))
+        self.keepalive_timeout = float(os.getenv("BACKEND_KEEPALIVE_TIMEOUT", "60"))
+        self.dns_cache_ttl = int(os.getenv("BACKEND_DNS_CACHE_TTL", "300"))
+
+        # Session for connection pooling, shared by every agent session in the process
         self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._warm_task: Optional[asyncio.Task] = None
+        self._warmed = False
 
         logger.info(f"Backend Client Configuration:")
         logger.info(f"  Backend URL: {self.backend_url}")
         logger.info(f"  Router Enabled: {self.enabled}")
         logger.info(f"  Timeout: {self.timeout}s")
+        logger.info(f"  Streaming: {self.streaming}")
+        logger.info(f"  Latency Budget: turn={self.turn_budget}s, arrival={self.arrival_budget}s")
+        logger.info(f"  Pool: limit={self.pool_limit}, per_host={self.pool_limit_per_host}, "
+                    f"keepalive={self.keepalive_timeout}s, dns_ttl={self.dns_cache_ttl}s")
 
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create HTTP session"""
-        if self._session is None or self._session.closed:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            stale = self._session
+            if stale is not None and not stale.closed:
+                # Left open by a previous job's event loop - release its sockets
+                try:
+                    await stale.close()
+                except Exception as e:
+                    logger.debug(f"Backend Client: Error closing previous pool: {e}")
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_limit,
+                limit_per_host=self.pool_limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True,
+            )
             timeout = aiohttp.ClientTimeout(total=self.timeout)
-            self._session = aiohttp.ClientSession(timeout=timeout)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            self._loop = loop
+            self._warmed = False
         return self._session
 
+    def prewarm(self):
+        """
+        Warm the shared connection pool in the background, unless it is warm
+
+        Opens a keep-alive connection with a /health call (and the backend
+        channel), so the first real turn doesn't pay the TCP handshake. Called
+        as soon as a job starts: the process setup hook runs before the job's
+        event loop exists, and the pool is bound to that loop. Agent sessions
+        call it again on entry in case the first warmup failed.
+        """
+        if not self.enabled:
+            return
+        loop = asyncio.get_running_loop()
+        if self._warmed and self._loop is loop and self._session is not None and not self._session.closed:
+            return
+        task = self._warm_task
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return  # Already warming
+        self._warm_task = asyncio.create_task(self.warm())
+
+    async def warm(self):
+        """Open a pooled connection (and the backend channel) ahead of the first turn"""
+        start = time.perf_counter()
+        healthy = await self.health_check()
+        self._warmed = healthy
+        if healthy:
+            await self.channel.connect(await self._get_session())
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if healthy:
+            logger.info(f"Backend Client: Pool warmed in {elapsed_ms:.0f}ms (channel: {self.channel.connected})")
+        else:
+            logger.warning(f"Backend Client: Pool warmup health check failed after {elapsed_ms:.0f}ms")
+
     async def close(self):
-        """Close HTTP session"""
+        """
+        Close the HTTP session and channel at job shutdown
+
+        The pool outlives individual agent sessions (reconnects reuse its
+        connections), so sessions never close it themselves.
+        """
+        self._warmed = False
+        task = self._warm_task
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+        await self.channel.close()
         if self._session and not self._session.closed:
             await self._session.close()
 
+    async def _post(self, op: str, path: str, payload: Dict[str, Any], timeout: Optional[float]) -> Tuple[int, Any]:
+        """
+        Send a request over the backend channel, or as an HTTP POST if the channel is unavailable
+
+        Args:
+            op: Channel operation name
+            path: Equivalent HTTP endpoint
+            payload: Request body (the same for both transports)
+            timeout: Seconds to wait for the response
+
+        Returns:
+            (HTTP status, decoded body) - the body is the raw text for non-200 responses
+        """
+        session = await self._get_session()
+
+        result = await self.channel.request(session, op, payload, timeout)
+        if result is not None:
+            status, body = result
+            return status, body if status == 200 else json.dumps(body)
+
+        async with session.post(
+            f"{self.backend_url}{path}",
+            json=payload,
+            headers={"Content-Type": "application/json"},
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            if response.status == 200:
+                return response.status, await response.json()
+            return response.status, await response.text()
+
     async def start_session(self, user_id: str, is_reconnection: bool = False) -> SessionResponse:
         """
         Start a new transcript session
@@ -76,8 +450,6 @@ class BackendClient:
             return SessionResponse(success=False, error="Backend router is disabled")
 
         try:
-            session = await self._get_session()
-
             payload = {
                 "userId": user_id,
                 "isReconnection": is_reconnection
@@ -85,21 +457,16 @@ class BackendClient:
 
             logger.info(f"Backend Client: Starting session for user {user_id} (reconnection: {is_reconnection})")
 
-            async with session.post(
-                f"{self.backend_url}/api/session/start",
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get("success"):
-                        session_id = data.get("sessionId")
-                        logger.info(f"Backend Client: Session started: {session_id}")
-                        return SessionResponse(success=True, session_id=session_id)
-                    else:
-                        return SessionResponse(success=False, error=data.get("error", "Unknown error"))
+            status, data = await self._post("session.start", "/api/session/start", payload, self.timeout)
+            if status == 200:
+                if data.get("success"):
+                    session_id = data.get("sessionId")
+                    logger.info(f"Backend Client: Session started: {session_id}")
+                    return SessionResponse(success=True, session_id=session_id)
                 else:
-                    return SessionResponse(success=False, error=f"HTTP {response.status}")
+                    return SessionResponse(success=False, error=data.get("error", "Unknown error"))
+            else:
+                return SessionResponse(success=False, error=f"HTTP {status}")
 
         except Exception as e:
             logger.error(f"Backend Client: Start session error: {e}")
@@ -120,8 +487,6 @@ class BackendClient:
             return SessionResponse(success=False, error="Backend router is disabled")
 
         try:
-            session = await self._get_session()
-
             payload = {
                 "userId": user_id,
                 "sessionId": session_id
@@ -129,31 +494,105 @@ class BackendClient:
 
             logger.info(f"Backend Client: Ending session {session_id} for user {user_id}")
 
-            async with session.post(
-                f"{self.backend_url}/api/session/end",
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get("success"):
-                        logger.info(f"Backend Client: Session ended: {session_id}")
-                        return SessionResponse(success=True, session_id=session_id)
-                    else:
-                        return SessionResponse(success=False, error=data.get("error", "Unknown error"))
+            status, data = await self._post("session.end", "/api/session/end", payload, self.timeout)
+            if status == 200:
+                if data.get("success"):
+                    logger.info(f"Backend Client: Session ended: {session_id}")
+                    return SessionResponse(success=True, session_id=session_id)
                 else:
-                    return SessionResponse(success=False, error=f"HTTP {response.status}")
+                    return SessionResponse(success=False, error=data.get("error", "Unknown error"))
+            else:
+                return SessionResponse(success=False, error=f"HTTP {status}")
 
         except Exception as e:
             logger.error(f"Backend Client: End session error: {e}")
             return SessionResponse(success=False, error=str(e))
 
+    async def record_messages(self, user_id: str, session_id: str, messages: List[Dict[str, str]]) -> bool:
+        """
+        Append messages to a transcript session without routing them
+
+        Used for turns answered without a backend round trip (e.g. cached
+        replies), so the transcript stays complete.
+
+        Args:
+            user_id: Unique user identifier
+            session_id: Transcript session ID
+            messages: [{"role": "user" | "assistant" | "system", "content": "..."}]
+
+        Returns:
+            True if the backend recorded the messages
+        """
+        if not self.enabled:
+            return False
+
+        try:
+            status, _ = await self._post(
+                "session.messages",
+                "/api/session/messages",
+                {"userId": user_id, "sessionId": session_id, "messages": messages},
+                self.timeout
+            )
+            return status == 200
+
+        except Exception as e:
+            logger.warning(f"Backend Client: Record messages error: {e}")
+            return False
+
+    async def send_batch(self, events: List[Dict[str, Any]], timeout: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Send a batch of queued events (see outbox.py) in one request
+
+        Args:
+            events: [{"id": ..., "op": ..., "body": {...}}], applied in order
+            timeout: Seconds to wait for the whole batch (default: BACKEND_TIMEOUT)
+
+        Returns:
+            Per-event results [{"id": ..., "status": ..., "error": ...}], or
+            None if the backend couldn't be reached
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            status, data = await self._post("batch", "/api/batch", {"events": events}, timeout or self.timeout)
+            if status == 200:
+                return data.get("results", [])
+            logger.warning(f"Backend Client: Batch rejected: HTTP {status}: {data}")
+        except Exception as e:
+            logger.warning(f"Backend Client: Batch of {len(events)} events failed: {e}")
+        return None
+
+    def _deadline(self, deadline: Optional[float], budget: float) -> float:
+        """Per-request deadline in seconds, drawn from the latency budget by default"""
+        return deadline if deadline is not None else budget
+
+    @staticmethod
+    def _counts_as_failure(response: BackendResponse) -> bool:
+        """Whether a response indicates the backend is unavailable (vs. an application error)"""
+        if response.success:
+            return False
+        if response.agent in _AVAILABILITY_FAILURES:
+            return True
+        return bool(response.error and response.error.startswith("HTTP 5"))
+
+    def _circuit_open_response(self) -> BackendResponse:
+        return BackendResponse(
+            success=False,
+            agent="circuit_open",
+            response="",
+            metadata={},
+            error="Backend circuit open - skipping backend"
+        )
+
     async def chat(
         self,
         user_id: str,
         user_input: str,
         context: Optional[Dict[str, Any]] = None,
-        session_id: Optional[str] = None
+        session_id: Optional[str] = None,
+        deadline: Optional[float] = None,
+        turn_id: Optional[str] = None
     ) -> BackendResponse:
         """
         Send user input to backend multi-agent router
@@ -163,6 +602,8 @@ class BackendClient:
             user_input: User's spoken/text input
             context: Additional context (location, preferences, etc.)
             session_id: Optional session ID for transcript recording
+            deadline: Seconds to wait for the response (default: BACKEND_TURN_BUDGET_MS)
+            turn_id: Optional id the turn can later be abandoned by
 
         Returns:
             BackendResponse with agent selection and response
@@ -176,9 +617,32 @@ class BackendClient:
                 error="Backend router is disabled"
             )
 
-        try:
-            session = await self._get_session()
+        if not self.breaker.allow_request():
+            return self._circuit_open_response()
 
+        start = time.perf_counter()
+        try:
+            response = await self._chat_request(
+                user_id, user_input, context, session_id, self._deadline(deadline, self.turn_budget), turn_id
+            )
+        except BaseException:
+            # Cancelled (barge-in, shutdown) - no outcome, but free a half-open probe
+            self.breaker.release()
+            raise
+        self.breaker.record(not self._counts_as_failure(response), time.perf_counter() - start)
+        return response
+
+    async def _chat_request(
+        self,
+        user_id: str,
+        user_input: str,
+        context: Optional[Dict[str, Any]],
+        session_id: Optional[str],
+        deadline: float,
+        turn_id: Optional[str] = None
+    ) -> BackendResponse:
+        """Send one /aimee-chat request (see chat())"""
+        try:
             # Prepare request payload
             payload = {
                 "userId": user_id,
@@ -190,45 +654,31 @@ class BackendClient:
             if session_id:
                 payload["sessionId"] = session_id
 
+            if turn_id:
+                payload["turnId"] = turn_id
+
             logger.info(f"Backend Client: Sending request to {self.backend_url}/aimee-chat")
             logger.info(f"Backend Client: User input: {user_input[:100]}{'...' if len(user_input) > 100 else ''}")
 
             # Send request to backend
-            async with session.post(
-                f"{self.backend_url}/aimee-chat",
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            ) as response:
+            status, data = await self._post("chat", "/aimee-chat", payload, deadline)
+
+            if status == 200:
+                if data.get("success"):
+                    backend_response = BackendResponse(
+                        success=True,
+                        agent=data.get("agent", "unknown"),
+                        response=data.get("response", ""),
+                        metadata=data.get("metadata", {})
+                    )
 
-                if response.status == 200:
-                    data = await response.json()
+                    logger.info(f"Backend Client: Success - Agent: {backend_response.agent}")
+                    logger.info(f"Backend Client: Response: {backend_response.response[:100]}{'...' if len(backend_response.response) > 100 else ''}")
 
-                    if data.get("success"):
-                        backend_response = BackendResponse(
-                            success=True,
-                            agent=data.get("agent", "unknown"),
-                            response=data.get("response", ""),
-                            metadata=data.get("metadata", {})
-                        )
-
-                        logger.info(f"Backend Client: Success - Agent: {backend_response.agent}")
-                        logger.info(f"Backend Client: Response: {backend_response.response[:100]}{'...' if len(backend_response.response) > 100 else ''}")
-
-                        return backend_response
-                    else:
-                        error_msg = data.get("error", "Unknown backend error")
-                        logger.error(f"Backend Client: Backend returned error: {error_msg}")
-
-                        return BackendResponse(
-                            success=False,
-                            agent="error",
-                            response="",
-                            metadata={},
-                            error=error_msg
-                        )
+                    return backend_response
                 else:
-                    error_msg = f"HTTP {response.status}: {await response.text()}"
-                    logger.error(f"Backend Client: HTTP error: {error_msg}")
+                    error_msg = data.get("error", "Unknown backend error")
+                    logger.error(f"Backend Client: Backend returned error: {error_msg}")
 
                     return BackendResponse(
                         success=False,
@@ -237,9 +687,20 @@ class BackendClient:
                         metadata={},
                         error=error_msg
                     )
-
-        except aiohttp.ClientTimeout:
-            error_msg = f"Request timeout after {self.timeout}s"
+            else:
+                error_msg = f"HTTP {status}: {data}"
+                logger.error(f"Backend Client: HTTP error: {error_msg}")
+
+                return BackendResponse(
+                    success=False,
+                    agent="error",
+                    response="",
+                    metadata={},
+                    error=error_msg
+                )
+
+        except asyncio.TimeoutError:
+            error_msg = f"Request timeout after {deadline}s"
             logger.error(f"Backend Client: {error_msg}")
 
             return BackendResponse(
@@ -274,13 +735,163 @@ class BackendClient:
                 error=error_msg
             )
 
+    async def chat_stream(
+        self,
+        user_id: str,
+        user_input: str,
+        context: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+        deadline: Optional[float] = None,
+        turn_id: Optional[str] = None
+    ) -> BackendChatStream:
+        """
+        Send user input to backend multi-agent router, streaming the response
+
+        The returned stream is primed: it has already received its first text
+        chunk, or has failed. Check `stream.success` before passing it to TTS.
+
+        Args:
+            user_id: Unique user identifier
+            user_input: User's spoken/text input
+            context: Additional context (location, preferences, etc.)
+            session_id: Optional session ID for transcript recording
+            deadline: Seconds to wait for the first chunk (default: BACKEND_TURN_BUDGET_MS)
+            turn_id: Id the turn can later be abandoned by (generated if omitted)
+
+        Returns:
+            BackendChatStream yielding response text as it arrives
+        """
+        if not self.enabled:
+            return BackendChatStream.failed("Backend router is disabled", agent="direct")
+
+        if not self.breaker.allow_request():
+            return BackendChatStream.failed("Backend circuit open - skipping backend", agent="circuit_open")
+
+        deadline = self._deadline(deadline, self.turn_budget)
+        start = time.perf_counter()
+        turn_id = turn_id or uuid.uuid4().hex
+        try:
+            stream = await self._chat_stream_request(user_id, user_input, context, session_id, deadline, turn_id)
+        except BaseException:
+            self.breaker.release()
+            raise
+        stream.turn_id = turn_id
+        stream.session_id = session_id
+
+        # Latency is time to first chunk - that's what the user waits on
+        available = stream.success or stream.agent not in _AVAILABILITY_FAILURES
+        self.breaker.record(available, time.perf_counter() - start)
+        return stream
+
+    async def _chat_stream_request(
+        self,
+        user_id: str,
+        user_input: str,
+        context: Optional[Dict[str, Any]],
+        session_id: Optional[str],
+        deadline: float,
+        turn_id: str
+    ) -> BackendChatStream:
+        """Open one streaming /aimee-chat request and wait for its first chunk (see chat_stream())"""
+        try:
+            session = await self._get_session()
+
+            payload = {
+                "userId": user_id,
+                "input": user_input,
+                "context": context or {},
+                "stream": True,
+                "turnId": turn_id
+            }
+
+            if session_id:
+                payload["sessionId"] = session_id
+
+            logger.info(f"Backend Client: Sending streaming request to {self.backend_url}/aimee-chat")
+            logger.info(f"Backend Client: User input: {user_input[:100]}{'...' if len(user_input) > 100 else ''}")
+
+            opened = await self.channel.open(session, "chat", payload)
+            if opened is not None:
+                # Frames are pushed over the backend channel as they are produced
+                request_id, queue = opened
+                stream = ChannelChatStream(self.channel, request_id, queue, turn_id=turn_id, read_timeout=self.timeout)
+                await asyncio.wait_for(stream.prime(), timeout=deadline)
+            else:
+                # Bound the wait between chunks rather than the whole response,
+                # since long narratives can legitimately stream for a while
+                response = await session.post(
+                    f"{self.backend_url}/aimee-chat",
+                    json=payload,
+                    headers={"Content-Type": "application/json", "Accept": "application/x-ndjson"},
+                    timeout=aiohttp.ClientTimeout(total=None, sock_connect=deadline, sock_read=self.timeout)
+                )
+
+                if response.status != 200:
+                    error_msg = f"HTTP {response.status}: {await response.text()}"
+                    response.release()
+                    logger.error(f"Backend Client: HTTP error: {error_msg}")
+                    return BackendChatStream.failed(error_msg, agent="http_error" if response.status >= 500 else "error")
+
+                if "ndjson" not in response.headers.get("Content-Type", ""):
+                    # Backend without streaming support - treat the JSON body as one chunk
+                    data = await response.json()
+                    response.release()
+                    stream = BackendChatStream.from_json(data)
+                else:
+                    stream = BackendChatStream(response, turn_id=turn_id)
+                    await asyncio.wait_for(stream.prime(), timeout=deadline)
+
+            if stream.success:
+                logger.info(f"Backend Client: Stream started - Agent: {stream.agent}")
+            else:
+                logger.error(f"Backend Client: Backend returned error: {stream.error}")
+
+            return stream
+
+        except asyncio.TimeoutError:
+            error_msg = f"No response within {deadline}s"
+            logger.error(f"Backend Client: {error_msg}")
+            return BackendChatStream.failed(error_msg, agent="timeout")
+
+        except aiohttp.ClientError as e:
+            error_msg = f"Network error: {str(e)}"
+            logger.error(f"Backend Client: {error_msg}")
+            return BackendChatStream.failed(error_msg, agent="network_error")
+
+        except Exception as e:
+            error_msg = f"Unexpected error: {str(e)}"
+            logger.error(f"Backend Client: {error_msg}")
+            return BackendChatStream.failed(error_msg, agent="unexpected_error")
+
+    async def abandon_turn(self, turn_id: str) -> bool:
+        """
+        Tell the backend the user barged in, so it discards the turn's result
+
+        Args:
+            turn_id: Id the turn's chat_stream() request was sent with
+
+        Returns:
+            True if the backend acknowledged the abandon
+        """
+        if not self.enabled:
+            return False
+
+        try:
+            status, _ = await self._post("chat.abandon", "/aimee-chat/abandon", {"turnId": turn_id}, 2)
+            return status == 200
+
+        except Exception as e:
+            logger.warning(f"Backend Client: Abandon turn {turn_id} failed: {e}")
+            return False
+
     async def arrival(
         self,
         user_id: str,
         marker_id: str,
         marker_name: str,
         location: Dict[str, float],
-        mode: str = "drive"
+        mode: str = "drive",
+        deadline: Optional[float] = None
     ) -> BackendResponse:
         """
         Send arrival event to backend for GPS-triggered narratives
@@ -291,6 +902,7 @@ class BackendClient:
             marker_name: Human-readable name of the marker
             location: Dict with 'lat' and 'lng' coordinates
             mode: Transportation mode ('drive' or 'walk')
+            deadline: Seconds to wait for the narrative (default: BACKEND_ARRIVAL_BUDGET_MS)
 
         Returns:
             BackendResponse with arrival narrative
@@ -304,9 +916,31 @@ class BackendClient:
                 error="Backend router is disabled"
             )
 
+        if not self.arrival_breaker.allow_request():
+            return self._circuit_open_response()
+
+        start = time.perf_counter()
         try:
-            session = await self._get_session()
+            response = await self._arrival_request(
+                user_id, marker_id, marker_name, location, mode, self._deadline(deadline, self.arrival_budget)
+            )
+        except BaseException:
+            self.arrival_breaker.release()
+            raise
+        self.arrival_breaker.record(not self._counts_as_failure(response), time.perf_counter() - start)
+        return response
 
+    async def _arrival_request(
+        self,
+        user_id: str,
+        marker_id: str,
+        marker_name: str,
+        location: Dict[str, float],
+        mode: str,
+        deadline: float
+    ) -> BackendResponse:
+        """Send one /aimee-arrival request (see arrival())"""
+        try:
             # Prepare request payload
             payload = {
                 "userId": user_id,
@@ -321,40 +955,23 @@ class BackendClient:
             logger.info(f"Backend Client: Location: {location}, Mode: {mode}")
 
             # Send request to backend
-            async with session.post(
-                f"{self.backend_url}/aimee-arrival",
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            ) as response:
+            status, data = await self._post("arrival", "/aimee-arrival", payload, deadline)
+
+            if status == 200:
+                if data.get("success"):
+                    backend_response = BackendResponse(
+                        success=True,
+                        agent=data.get("agent", "unknown"),
+                        response=data.get("response", ""),
+                        metadata=data.get("metadata", {})
+                    )
 
-                if response.status == 200:
-                    data = await response.json()
+                    logger.info(f"Backend Client: Arrival success - Agent: {backend_response.agent}")
 
-                    if data.get("success"):
-                        backend_response = BackendResponse(
-                            success=True,
-                            agent=data.get("agent", "unknown"),
-                            response=data.get("response", ""),
-                            metadata=data.get("metadata", {})
-                        )
-
-                        logger.info(f"Backend Client: Arrival success - Agent: {backend_response.agent}")
-
-                        return backend_response
-                    else:
-                        error_msg = data.get("error", "Unknown backend error")
-                        logger.error(f"Backend Client: Arrival backend error: {error_msg}")
-
-                        return BackendResponse(
-                            success=False,
-                            agent="error",
-                            response="",
-                            metadata={},
-                            error=error_msg
-                        )
+                    return backend_response
                 else:
-                    error_msg = f"HTTP {response.status}: {await response.text()}"
-                    logger.error(f"Backend Client: Arrival HTTP error: {error_msg}")
+                    error_msg = data.get("error", "Unknown backend error")
+                    logger.error(f"Backend Client: Arrival backend error: {error_msg}")
 
                     return BackendResponse(
                         success=False,
@@ -363,6 +980,17 @@ class BackendClient:
                         metadata={},
                         error=error_msg
                     )
+            else:
+                error_msg = f"HTTP {status}: {data}"
+                logger.error(f"Backend Client: Arrival HTTP error: {error_msg}")
+
+                return BackendResponse(
+                    success=False,
+                    agent="error",
+                    response="",
+                    metadata={},
+                    error=error_msg
+                )
 
         except Exception as e:
             error_msg = f"Arrival request error: {str(e)}"
@@ -0,0 +1,16 @@
+"""
+Load-Test Harness for AImee LiveKit Agent
+
+Runs many simulated AImeeAgent sessions on one box without LiveKit, the
+backend or OpenAI:
+
+- stub_backend:   local stand-in for the backend HTTP API with configurable latency
+- fake_providers: STT/LLM/TTS stand-ins that emit synthetic audio frames
+- driver:         runs N scripted sessions and reports throughput, per-stage
+                  latency percentiles, CPU and RSS per session
+- replay:         replays sessions recorded with SESSION_RECORDING=true to
+                  measure the agent's own per-turn overhead
+
+Usage (from docker/agent):
+    python -m benchmark.driver --sessions 50 --turns 5
+"""
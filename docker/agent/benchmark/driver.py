@@ -0,0 +1,359 @@
+"""
+Load-Test Driver for AImee LiveKit Agent
+
+Runs N concurrent simulated AImeeAgent sessions, each with a greeting and a
+series of scripted user turns, against the stand-in backend and fake
+providers. Reports throughput, per-stage latency percentiles (from the
+agent's own turn timelines), and CPU and RSS per session.
+
+Usage (from docker/agent):
+    python -m benchmark.driver --sessions 50 --turns 5
+    python -m benchmark.driver --sessions 200 --ramp 20 --chat-latency lognormal:900,0.5 \\
+        --json report.json --gate first_audio:p90=2500
+
+Everything runs offline; a stub backend is started on a free local port
+unless --backend-url points at one.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmark.latency import Latency
+from benchmark.stub_backend import add_latency_arguments
+
+# Configure logger
+logger = logging.getLogger("benchmark")
+
+AGENT_DIR = Path(__file__).resolve().parent.parent
+REPO_PROMPTS_DIR = AGENT_DIR.parent.parent / "config" / "prompts"
+
+DEFAULT_SCRIPT = [
+    "What's that building on the left?",
+    "Tell me more about the history of this town.",
+    "How long until the next stop?",
+    "Is there somewhere good to eat around here?",
+    "Who built the bridge we just crossed?",
+    "Remind me what you said about the lighthouse.",
+]
+
+def _rss_bytes() -> int:
+    """Current resident set size of this process"""
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "n": len(values),
+        "p50": _percentile(values, 50),
+        "p90": _percentile(values, 90),
+        "p99": _percentile(values, 99),
+        "max": max(values) if values else 0.0,
+    }
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class Results:
+    """Measurements collected across all sessions"""
+
+    def __init__(self):
+        self.timelines: List[Dict[str, float]] = []
+        self.greeting_ms: List[float] = []
+        self.turns = 0
+        self.sessions_completed = 0
+        self.sessions_failed = 0
+        self.fallback_replies = 0
+        self.frames_published = 0
+
+async def _start_stub_backend(args: argparse.Namespace):
+    """Start the stand-in backend in a subprocess and wait until it is healthy"""
+    port = _free_port()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "benchmark.stub_backend",
+        "--port", str(port),
+        "--chat-latency", args.chat_latency,
+        "--chunk-gap", args.chunk_gap,
+        "--arrival-latency", args.arrival_latency,
+        "--session-latency", args.session_latency,
+        cwd=str(AGENT_DIR),
+        stdout=asyncio.subprocess.PIPE,
+    )
+    line = await asyncio.wait_for(process.stdout.readline(), timeout=15)
+    if not line:
+        raise RuntimeError("Stub backend exited before it started listening")
+    return process, f"http://127.0.0.1:{port}"
+
+def _configure_environment(args: argparse.Namespace, backend_url: str, scratch_dir: str):
+    """Agent modules read their configuration at import, so set it first"""
+    os.environ["USE_BACKEND_ROUTER"] = "true"
+    os.environ["BACKEND_URL"] = backend_url
+    os.environ["BACKEND_STREAMING"] = "false" if args.no_streaming else "true"
+    os.environ["BACKEND_CHANNEL"] = "false" if args.no_channel else "true"
+    os.environ["RACE_MODE"] = "true" if args.race else "false"
+    os.environ["PREEMPTIVE_MODE"] = "true" if args.preemptive else "false"
+    os.environ["TTS_CACHE_ENABLED"] = "true" if args.tts_cache else "false"
+    os.environ.setdefault("TTS_CACHE_DIR", os.path.join(scratch_dir, "tts"))
+    os.environ["RESPONSE_CACHE_ENABLED"] = "true" if args.response_cache else "false"
+    os.environ.setdefault("METRICS_DIR", os.path.join(scratch_dir, "metrics"))
+    os.environ.setdefault("OUTBOX_DIR", os.path.join(scratch_dir, "outbox"))
+    os.environ.setdefault("PROMPT_RELOAD_INTERVAL", "0")
+    # One pool serves every simulated session, as in a busy worker process
+    os.environ.setdefault("BACKEND_POOL_LIMIT_PER_HOST", str(max(20, args.sessions)))
+
+def _bench_agent_class(results: Results):
+    """AImeeAgent bound to a FakeSession instead of a running AgentSession"""
+    from aimee_agent import AImeeAgent
+
+    class BenchAgent(AImeeAgent):
+        def __init__(self, fake_session, **kwargs):
+            super().__init__(**kwargs)
+            self._fake_session = fake_session
+
+        @property
+        def session(self):
+            return self._fake_session
+
+        def _finish_timeline(self):
+            timeline = self.timeline
+            pending = timeline is not None and not timeline.finished
+            super()._finish_timeline()
+            if pending and timeline.finished:
+                results.timelines.append(timeline.offsets_ms())
+
+    return BenchAgent
+
+async def _run_session(index: int, args: argparse.Namespace, script: List[str], results: Results, agent_class, latencies):
+    from livekit.agents import llm
+    from aimee_agent import StopResponse
+    from benchmark.fake_providers import FakeSession, FakeSTT, FakeLLM, FakeTTS
+
+    # Older livekit-agents without StopResponse: the agent clears the message instead
+    stop_response = StopResponse or ()
+
+    await asyncio.sleep(args.ramp * index / max(1, args.sessions))
+
+    session = FakeSession(
+        stt=FakeSTT(latencies["word_gap"], latencies["stt_final"]),
+        llm=FakeLLM(latencies["llm_ttft"], latencies["llm_token_gap"]),
+        tts=FakeTTS(latencies["tts_ttfb"]),
+        realtime_playout=args.realtime_playout,
+    )
+    agent = agent_class(session, use_backend_router=True, room_name=f"bench-{index}")
+
+    try:
+        start = time.perf_counter()
+        await agent.on_enter()
+        results.greeting_ms.append((time.perf_counter() - start) * 1000)
+
+        for turn in range(args.turns):
+            await asyncio.sleep(latencies["think"].sample())
+            utterance = script[(index + turn) % len(script)]
+
+            async for event_name, event in session.stt.transcribe(utterance):
+                session.emit(event_name, event)
+
+            message = llm.ChatMessage(role="user", content=[utterance])
+            try:
+                await agent.on_user_turn_completed(llm.ChatContext.empty(), message)
+            except stop_response:
+                pass
+            results.turns += 1
+
+        await agent.on_exit()
+        results.sessions_completed += 1
+    except Exception as e:
+        results.sessions_failed += 1
+        logger.error(f"Session {index} failed: {e!r}")
+    finally:
+        results.fallback_replies += session.fallback_replies
+        results.frames_published += session.frames_published
+
+async def _sample_rss(peak: List[int], stop: asyncio.Event):
+    while not stop.is_set():
+        peak[0] = max(peak[0], _rss_bytes())
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=0.25)
+        except asyncio.TimeoutError:
+            pass
+
+def _check_gates(report: Dict, gates: List[str]) -> List[str]:
+    """Evaluate gates like 'first_audio:p90=2500' against the report; returns violations"""
+    violations = []
+    for gate in gates:
+        target, _, limit = gate.partition("=")
+        stage, _, stat = target.partition(":")
+        summary = report["stages_ms"].get(stage) or report.get(stage)
+        if not isinstance(summary, dict) or stat not in summary:
+            violations.append(f"{gate}: no such measurement")
+        elif summary[stat] > float(limit):
+            violations.append(f"{gate}: measured {summary[stat]:.0f}")
+    return violations
+
+def _print_report(report: Dict):
+    print()
+    print(f"AImee load test: {report['sessions']} sessions x {report['turns_per_session']} turns")
+    print(f"  Wall time:          {report['wall_seconds']:.1f}s")
+    print(f"  Throughput:         {report['turns_per_second']:.2f} turns/s")
+    print(f"  Sessions completed: {report['sessions_completed']} (failed: {report['sessions_failed']})")
+    print(f"  Fallback replies:   {report['fallback_replies']}")
+    greeting = report["greeting_ms"]
+    print(f"  Greeting (on_enter) ms: p50 {greeting['p50']:.0f}  p90 {greeting['p90']:.0f}  p99 {greeting['p99']:.0f}")
+    print("  Stage latency from end of speech (ms):")
+    print(f"    {'stage':<16}{'n':>6}{'p50':>8}{'p90':>8}{'p99':>8}{'max':>8}")
+    for stage, summary in report["stages_ms"].items():
+        print(f"    {stage:<16}{summary['n']:>6}{summary['p50']:>8.0f}{summary['p90']:>8.0f}{summary['p99']:>8.0f}{summary['max']:>8.0f}")
+    cpu = report["cpu"]
+    print(f"  CPU: {cpu['seconds']:.2f}s total, {cpu['ms_per_session']:.1f}ms per session, "
+          f"{cpu['ms_per_turn']:.1f}ms per turn ({cpu['core_utilization']:.0%} of one core)")
+    rss = report["rss_mb"]
+    print(f"  RSS: baseline {rss['baseline']:.1f}MB, peak {rss['peak']:.1f}MB, {rss['per_session']:.2f}MB per session")
+
+async def run(args: argparse.Namespace) -> Dict:
+    """Run the load test and return the report"""
+    script = DEFAULT_SCRIPT
+    if args.script:
+        script = [line.strip() for line in Path(args.script).read_text().splitlines() if line.strip()]
+
+    stub = None
+    backend_url = args.backend_url
+    if not backend_url:
+        stub, backend_url = await _start_stub_backend(args)
+
+    scratch_dir = tempfile.mkdtemp(prefix="aimee-bench-")
+    _configure_environment(args, backend_url, scratch_dir)
+
+    from prompt_loader import prompt_registry
+    from backend_client import backend_client
+    from outbox import outbox
+
+    if not prompt_registry.base_path.exists():
+        prompt_registry.base_path = REPO_PROMPTS_DIR
+    prompt_registry.load_all()
+
+    results = Results()
+    agent_class = _bench_agent_class(results)
+    latencies = {
+        "word_gap": Latency(args.word_gap),
+        "stt_final": Latency(args.stt_latency),
+        "llm_ttft": Latency(args.llm_ttft),
+        "llm_token_gap": Latency("const:15"),
+        "tts_ttfb": Latency(args.tts_ttfb),
+        "think": Latency(args.think_time),
+    }
+
+    try:
+        baseline_rss = _rss_bytes()
+        peak_rss = [baseline_rss]
+        stop_sampling = asyncio.Event()
+        sampler = asyncio.create_task(_sample_rss(peak_rss, stop_sampling))
+
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(
+            _run_session(index, args, script, results, agent_class, latencies)
+            for index in range(args.sessions)
+        ))
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+
+        stop_sampling.set()
+        await sampler
+        # Like a job process exiting: drain session bookkeeping before closing the pool
+        await outbox.close()
+        await backend_client.close()
+    finally:
+        if stub is not None:
+            stub.terminate()
+            await stub.wait()
+
+    stages: Dict[str, List[float]] = {}
+    for timeline in results.timelines:
+        for stage, offset in timeline.items():
+            if stage != "end_of_speech":
+                stages.setdefault(stage, []).append(offset)
+
+    mb = 1024 * 1024
+    return {
+        "sessions": args.sessions,
+        "turns_per_session": args.turns,
+        "wall_seconds": wall,
+        "turns_per_second": results.turns / wall if wall else 0.0,
+        "sessions_completed": results.sessions_completed,
+        "sessions_failed": results.sessions_failed,
+        "fallback_replies": results.fallback_replies,
+        "frames_published": results.frames_published,
+        "greeting_ms": _summary(results.greeting_ms),
+        "stages_ms": {stage: _summary(values) for stage, values in sorted(stages.items(), key=lambda s: _percentile(s[1], 50))},
+        "cpu": {
+            "seconds": cpu,
+            "ms_per_session": cpu * 1000 / max(1, args.sessions),
+            "ms_per_turn": cpu * 1000 / max(1, results.turns),
+            "core_utilization": cpu / wall if wall else 0.0,
+        },
+        "rss_mb": {
+            "baseline": baseline_rss / mb,
+            "peak": peak_rss[0] / mb,
+            "per_session": (peak_rss[0] - baseline_rss) / mb / max(1, args.sessions),
+        },
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline load test for the AImee agent")
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent simulated sessions")
+    parser.add_argument("--turns", type=int, default=5, help="User turns per session")
+    parser.add_argument("--ramp", type=float, default=5.0, help="Seconds over which session starts are spread")
+    parser.add_argument("--think-time", default="uniform:500,2000", help="Pause before each user turn")
+    parser.add_argument("--script", help="File with one scripted utterance per line")
+    parser.add_argument("--backend-url", help="Use an already running (stub) backend instead of starting one")
+    add_latency_arguments(parser)
+    parser.add_argument("--word-gap", default="const:250", help="Interim transcript pacing (speaking rate)")
+    parser.add_argument("--stt-latency", default="lognormal:250,0.3", help="End of speech to final transcript")
+    parser.add_argument("--llm-ttft", default="lognormal:400,0.3")
+    parser.add_argument("--tts-ttfb", default="lognormal:200,0.3")
+    parser.add_argument("--realtime-playout", action="store_true", help="Pace published audio in real time")
+    parser.add_argument("--no-streaming", action="store_true", help="Disable NDJSON streaming from the backend")
+    parser.add_argument("--no-channel", action="store_true", help="Use per-request HTTP instead of the backend channel")
+    parser.add_argument("--race", action="store_true", help="Enable RACE_MODE")
+    parser.add_argument("--preemptive", action="store_true", help="Enable PREEMPTIVE_MODE")
+    parser.add_argument("--tts-cache", action="store_true", help="Enable the TTS cache (in a scratch directory)")
+    parser.add_argument("--response-cache", action="store_true", help="Enable the (per-process) response cache")
+    parser.add_argument("--json", help="Also write the report as JSON to this path")
+    parser.add_argument("--gate", action="append", default=[], help="Fail if exceeded, e.g. first_audio:p90=2500")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    report = asyncio.run(run(args))
+    _print_report(report)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+
+    violations = _check_gates(report, args.gate)
+    for violation in violations:
+        print(f"GATE FAILED: {violation}")
+    return 1 if violations or report["sessions_failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""
+Fake Providers for the AImee load-test harness
+
+Offline stand-ins for the parts of a LiveKit AgentSession that AImeeAgent
+talks to:
+
+- FakeSTT:     paces a scripted utterance into the VAD and transcript events
+               the session would emit (speaking, interims, end of speech, final)
+- FakeLLM:     streams a canned reply token by token (race mode / fallback)
+- FakeTTS:     synthesizes a sine tone sized to the text, as real AudioFrames,
+               and reports TTS metrics like the OpenAI plugin does
+- FakeSession: the say()/generate_reply()/on() surface of AgentSession; it
+               "publishes" frames and emits agent state changes
+
+Only the network, codec and WebRTC layers are replaced, so the agent's own
+event handling, backend client and say pipeline run as in production.
+"""
+
+import asyncio
+import math
+import time
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from livekit import rtc
+
+from benchmark.latency import Latency
+
+_FRAME_MS = 20
+
+# Roughly conversational speaking rate, used to size synthetic audio
+_CHARS_PER_SECOND = 15
+
+def session_event(**fields) -> SimpleNamespace:
+    """Event payload stamped with created_at, like AgentSession events"""
+    return SimpleNamespace(created_at=time.time(), **fields)
+
+class FakeSTT:
+    """Turns a scripted utterance into the session events STT + VAD would emit"""
+
+    def __init__(self, word_gap: Latency, final_latency: Latency):
+        self.word_gap = word_gap
+        self.final_latency = final_latency
+
+    async def transcribe(self, utterance: str) -> AsyncIterator[Tuple[str, SimpleNamespace]]:
+        """Yield (session event name, event) pairs for one spoken utterance"""
+        yield "user_state_changed", session_event(old_state="listening", new_state="speaking")
+
+        words = utterance.split()
+        for count in range(1, len(words) + 1):
+            await asyncio.sleep(self.word_gap.sample())
+            yield "user_input_transcribed", session_event(transcript=" ".join(words[:count]), is_final=False)
+
+        yield "user_state_changed", session_event(old_state="speaking", new_state="listening")
+
+        await asyncio.sleep(self.final_latency.sample())
+        yield "user_input_transcribed", session_event(transcript=utterance, is_final=True)
+
+class FakeLLMStream:
+    """Token stream shaped like llm.LLMStream (chunks with delta.content)"""
+
+    def __init__(self, text: str, ttft: Latency, token_gap: Latency):
+        self._tokens = [word + " " for word in text.split()]
+        self._ttft = ttft
+        self._token_gap = token_gap
+        self._closed = False
+
+    async def __aiter__(self):
+        await asyncio.sleep(self._ttft.sample())
+        for token in self._tokens:
+            if self._closed:
+                return
+            yield SimpleNamespace(delta=SimpleNamespace(content=token))
+            await asyncio.sleep(self._token_gap.sample())
+
+    async def aclose(self):
+        self._closed = True
+
+class FakeLLM:
+    """Stand-in for openai.LLM"""
+
+    model = "fake-llm"
+
+    def __init__(self, ttft: Latency, token_gap: Latency, reply: str = "Here's a quick answer while I look that up. It's a lovely spot."):
+        self.ttft = ttft
+        self.token_gap = token_gap
+        self.reply = reply
+
+    def chat(self, chat_ctx: Any = None, **kwargs) -> FakeLLMStream:
+        return FakeLLMStream(self.reply, self.ttft, self.token_gap)
+
+class FakeSynthesizeStream:
+    """Async context manager + iterator of synthesized frames, like tts.ChunkedStream"""
+
+    def __init__(self, tts: "FakeTTS", text: str):
+        self._tts = tts
+        self._text = text
+        self._start = 0.0
+        self._ttfb = -1.0
+
+    async def __aenter__(self) -> "FakeSynthesizeStream":
+        self._start = time.perf_counter()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        duration = time.perf_counter() - self._start
+        if self._tts.on_metrics:
+            self._tts.on_metrics(SimpleNamespace(
+                type="tts_metrics",
+                label="fake-tts",
+                timestamp=time.time(),
+                ttfb=self._ttfb,
+                duration=duration,
+                characters_count=len(self._text),
+                cancelled=exc_info[0] is not None,
+            ))
+
+    async def __aiter__(self):
+        await asyncio.sleep(self._tts.ttfb.sample())
+        self._ttfb = time.perf_counter() - self._start
+
+        frames = max(1, int(len(self._text) / _CHARS_PER_SECOND * 1000 / _FRAME_MS))
+        for index in range(frames):
+            yield SimpleNamespace(frame=self._tts.frame())
+            # Synthesis runs faster than real time but still yields to the loop
+            if index % 10 == 9:
+                await asyncio.sleep(0)
+
+class FakeTTS:
+    """Stand-in for openai.TTS producing a synthetic tone"""
+
+    model = "fake-tts"
+
+    def __init__(self, ttfb: Latency, sample_rate: int = 24000, num_channels: int = 1):
+        self.ttfb = ttfb
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+        self.on_metrics: Optional[Callable[[SimpleNamespace], None]] = None
+
+        # One 20 ms frame of a 220 Hz tone, reused for every frame
+        samples = sample_rate * _FRAME_MS // 1000
+        pcm = bytearray()
+        for i in range(samples):
+            value = int(8000 * math.sin(2 * math.pi * 220 * i / sample_rate)).to_bytes(2, "little", signed=True)
+            pcm += value * num_channels
+        self._pcm = bytes(pcm)
+        self._samples = samples
+
+    def frame(self) -> rtc.AudioFrame:
+        return rtc.AudioFrame(
+            data=self._pcm,
+            sample_rate=self.sample_rate,
+            num_channels=self.num_channels,
+            samples_per_channel=self._samples,
+        )
+
+    def synthesize(self, text: str) -> FakeSynthesizeStream:
+        return FakeSynthesizeStream(self, text)
+
+class FakeSpeechHandle:
+    """Awaitable result of FakeSession.say(), like SpeechHandle"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.interrupted = False
+
+    def __await__(self):
+        return self._task.__await__()
+
+class FakeSession:
+    """The AgentSession surface AImeeAgent uses, without rooms or audio I/O"""
+
+    def __init__(self, stt: FakeSTT, llm: FakeLLM, tts: FakeTTS, realtime_playout: bool = False):
+        self.stt = stt
+        self.llm = llm
+        self.tts = tts
+        self.realtime_playout = realtime_playout
+        self.agent_state = "listening"
+        self.frames_published = 0
+        self.replies = 0
+        self.fallback_replies = 0
+        self._handlers: Dict[str, List[Callable]] = {}
+        self._speaking: List[FakeSpeechHandle] = []
+
+        tts.on_metrics = lambda metrics: self.emit("metrics_collected", session_event(metrics=metrics))
+
+    def on(self, event: str, callback: Callable):
+        self._handlers.setdefault(event, []).append(callback)
+        return callback
+
+    def off(self, event: str, callback: Callable):
+        if callback in self._handlers.get(event, []):
+            self._handlers[event].remove(callback)
+
+    def emit(self, event: str, payload: Any):
+        for callback in list(self._handlers.get(event, [])):
+            callback(payload)
+
+    def _set_agent_state(self, state: str):
+        old_state, self.agent_state = self.agent_state, state
+        self.emit("agent_state_changed", session_event(old_state=old_state, new_state=state))
+
+    async def _text_chunks(self, text) -> AsyncIterator[str]:
+        if isinstance(text, str):
+            yield text
+            return
+        async for chunk in text:
+            yield chunk
+
+    async def _synthesize(self, text) -> AsyncIterator[rtc.AudioFrame]:
+        # Like the TTS node: synthesize each text chunk as it arrives
+        async for chunk in self._text_chunks(text):
+            async with self.tts.synthesize(chunk) as stream:
+                async for event in stream:
+                    yield event.frame
+
+    async def _play(self, text, audio, handle: FakeSpeechHandle):
+        frames = audio if audio is not None else self._synthesize(text)
+        started = False
+        try:
+            async for frame in frames:
+                if handle.interrupted:
+                    break
+                if not started:
+                    started = True
+                    self._set_agent_state("speaking")
+                self.frames_published += 1
+                if self.realtime_playout:
+                    await asyncio.sleep(frame.samples_per_channel / frame.sample_rate)
+                elif self.frames_published % 10 == 0:
+                    await asyncio.sleep(0)
+        finally:
+            self._speaking.remove(handle)
+            if hasattr(frames, "aclose"):
+                await frames.aclose()
+        if started:
+            self._set_agent_state("listening")
+
+    def say(self, text, audio=None, allow_interruptions: bool = True, add_to_chat_ctx: bool = True) -> FakeSpeechHandle:
+        self.replies += 1
+        handle = FakeSpeechHandle()
+        self._speaking.append(handle)
+        handle._task = asyncio.create_task(self._play(text, audio, handle))
+        return handle
+
+    def interrupt(self):
+        for handle in self._speaking:
+            handle.interrupted = True
+
+    def generate_reply(self, instructions: Optional[str] = None) -> FakeSpeechHandle:
+        self.fallback_replies += 1
+        stream = self.llm.chat()
+
+        async def _reply_text():
+            async for chunk in stream:
+                yield chunk.delta.content
+
+        return self.say(_reply_text())
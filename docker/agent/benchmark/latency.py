@@ -0,0 +1,50 @@
+"""
+Latency Distributions for the AImee load-test harness
+
+Distributions are given as short specs so they fit on a command line:
+
+    const:MS                fixed latency
+    uniform:LO,HI           uniform between LO and HI ms
+    normal:MEAN,STDDEV      normal, clipped at 0
+    lognormal:MEDIAN,SIGMA  log-normal with the given median (ms) and shape
+
+A bare number is treated as const.
+"""
+
+import math
+import random
+from typing import List, Optional
+
+class Latency:
+    """Samples delays (in seconds) from a latency spec"""
+
+    def __init__(self, spec: str, seed: Optional[int] = None):
+        self.spec = spec
+        self._random = random.Random(seed)
+
+        kind, _, params = spec.partition(":")
+        if not params:
+            kind, params = "const", kind
+        self.kind = kind.lower()
+        self.params: List[float] = [float(p) for p in params.split(",")]
+
+        expected = {"const": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if self.kind not in expected or len(self.params) != expected[self.kind]:
+            raise ValueError(f"Invalid latency spec '{spec}' (see benchmark/latency.py)")
+
+    def sample_ms(self) -> float:
+        if self.kind == "const":
+            return self.params[0]
+        if self.kind == "uniform":
+            return self._random.uniform(*self.params)
+        if self.kind == "normal":
+            return max(0.0, self._random.gauss(*self.params))
+        median, sigma = self.params
+        return self._random.lognormvariate(math.log(max(median, 1e-3)), sigma)
+
+    def sample(self) -> float:
+        """Delay in seconds"""
+        return self.sample_ms() / 1000
+
+    def __repr__(self) -> str:
+        return f"Latency({self.spec!r})"
@@ -0,0 +1,171 @@
+"""
+Session Replay for AImee LiveKit Agent
+
+Drives AImeeAgent with a recording made with SESSION_RECORDING=true. The
+recorded VAD, transcript and location events are re-emitted at their
+original times (or faster with --speed), and ReplayBackend serves the
+recorded backend responses at their recorded latency. TTS is instant, so
+what remains is the agent's own overhead:
+
+    pre_backend   final transcript -> backend request sent
+    post_backend  backend reply -> first audio frame published
+
+Usage (from docker/agent):
+    python -m benchmark.replay /app/cache/recordings/room-20250101T120000.ndjson.gz --speed 4 --repeat 5
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmark.driver import Results, REPO_PROMPTS_DIR, _bench_agent_class, _summary
+from benchmark.latency import Latency
+
+# Configure logger
+logger = logging.getLogger("benchmark-replay")
+
+def _configure_environment(args: argparse.Namespace, scratch_dir: str):
+    """Agent modules read their configuration at import, so set it first"""
+    os.environ["SESSION_RECORDING"] = "false"
+    os.environ["TTS_CACHE_ENABLED"] = "false"
+    # Every recorded backend request should be replayed, not answered from cache
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+    os.environ["RACE_MODE"] = "true" if args.race else "false"
+    os.environ["PREEMPTIVE_MODE"] = "true" if args.preemptive else "false"
+    os.environ.setdefault("METRICS_DIR", os.path.join(scratch_dir, "metrics"))
+    os.environ.setdefault("OUTBOX_DIR", os.path.join(scratch_dir, "outbox"))
+    os.environ.setdefault("PROMPT_RELOAD_INTERVAL", "0")
+
+async def replay_session(events: List[Dict], speed: float, results: Results, agent_class) -> Dict[str, int]:
+    """Replay one recording; returns the replay backend's match stats"""
+    from livekit.agents import llm
+    from aimee_agent import StopResponse
+    from session_recorder import ReplayBackend
+    from benchmark.fake_providers import FakeSession, FakeLLM, FakeTTS, session_event
+
+    stop_response = StopResponse or ()
+    backend = ReplayBackend(events, speed=speed)
+    session = FakeSession(stt=None, llm=FakeLLM(Latency("const:0"), Latency("const:0")), tts=FakeTTS(Latency("const:0")))
+
+    header = next((e for e in events if e["ev"] == "session"), {})
+    agent = agent_class(
+        session,
+        use_backend_router=True,
+        room_name=header.get("room", "replay"),
+        is_reconnection=header.get("reconnection", False),
+        backend=backend,
+    )
+
+    async def complete_turn(text: str):
+        try:
+            await agent.on_user_turn_completed(llm.ChatContext.empty(), llm.ChatMessage(role="user", content=[text]))
+        except stop_response:
+            pass
+        results.turns += 1
+
+    start = time.perf_counter()
+    await agent.on_enter()
+    results.greeting_ms.append((time.perf_counter() - start) * 1000)
+
+    turns: List[asyncio.Task] = []
+    for event in events:
+        delay = event["t"] / 1000 / speed - (time.perf_counter() - start)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if event["ev"] == "user_state":
+            session.emit("user_state_changed", session_event(old_state=event["old"], new_state=event["new"]))
+        elif event["ev"] == "transcript":
+            session.emit("user_input_transcribed", session_event(transcript=event["text"], is_final=event["final"]))
+            if event["final"]:
+                turns.append(asyncio.create_task(complete_turn(event["text"])))
+        elif event["ev"] == "location":
+            agent.handle_location_message(event["message"])
+
+    await asyncio.gather(*turns)
+    await agent.on_exit()
+    results.sessions_completed += 1
+    return backend.stats
+
+def _overheads(timelines: List[Dict[str, float]]) -> Dict[str, List[float]]:
+    overheads: Dict[str, List[float]] = {"pre_backend": [], "post_backend": []}
+    for timeline in timelines:
+        if "stt_final" in timeline and "backend_start" in timeline:
+            overheads["pre_backend"].append(timeline["backend_start"] - timeline["stt_final"])
+        if "backend_end" in timeline and "first_audio" in timeline:
+            overheads["post_backend"].append(timeline["first_audio"] - timeline["backend_end"])
+    return overheads
+
+async def run(args: argparse.Namespace) -> Dict:
+    scratch_dir = tempfile.mkdtemp(prefix="aimee-replay-")
+    _configure_environment(args, scratch_dir)
+
+    from prompt_loader import prompt_registry
+    from session_recorder import load_recording
+
+    if not prompt_registry.base_path.exists():
+        prompt_registry.base_path = REPO_PROMPTS_DIR
+    prompt_registry.load_all()
+
+    recordings = [load_recording(path) for path in args.recordings]
+    results = Results()
+    agent_class = _bench_agent_class(results)
+    unmatched = 0
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(args.repeat):
+        for events in recordings:
+            stats = await replay_session(events, args.speed, results, agent_class)
+            unmatched += stats["unmatched"]
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    return {
+        "recordings": len(recordings),
+        "repeat": args.repeat,
+        "speed": args.speed,
+        "turns": results.turns,
+        "wall_seconds": wall,
+        "unmatched_backend_requests": unmatched,
+        "overhead_ms": {name: _summary(values) for name, values in _overheads(results.timelines).items()},
+        "cpu": {"seconds": cpu, "ms_per_turn": cpu * 1000 / max(1, results.turns)},
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded AImee sessions against the agent")
+    parser.add_argument("recordings", nargs="+", help="Recording files (.ndjson.gz)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier (latencies are scaled too)")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay the recordings this many times")
+    parser.add_argument("--race", action="store_true", help="Enable RACE_MODE")
+    parser.add_argument("--preemptive", action="store_true", help="Enable PREEMPTIVE_MODE")
+    parser.add_argument("--json", help="Also write the report as JSON to this path")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    report = asyncio.run(run(args))
+
+    print()
+    print(f"AImee replay: {report['recordings']} recording(s) x {report['repeat']} at {report['speed']}x speed")
+    print(f"  Turns:      {report['turns']} in {report['wall_seconds']:.1f}s")
+    print(f"  Unmatched backend requests: {report['unmatched_backend_requests']}")
+    for name, summary in report["overhead_ms"].items():
+        print(f"  {name:<13} n={summary['n']:<5} p50 {summary['p50']:.1f}ms  p90 {summary['p90']:.1f}ms  "
+              f"p99 {summary['p99']:.1f}ms  max {summary['max']:.1f}ms")
+    print(f"  CPU: {report['cpu']['seconds']:.2f}s total, {report['cpu']['ms_per_turn']:.2f}ms per turn")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+Stand-in Backend for the AImee load-test harness
+
+Serves the backend endpoints the agent calls, with the same request and
+response shapes as docker/backend, but with canned replies and configurable
+latency instead of the multi-agent router:
+
+    GET  /health
+    POST /api/session/start, /api/session/end
+    POST /aimee-chat          (JSON, or NDJSON frames with "stream": true)
+    POST /aimee-chat/abandon
+    POST /aimee-arrival
+    POST /api/batch           (outbox events: session.start/end/messages, chat)
+    WS   /agent-channel       (msgpack-framed, multiplexed versions of the above)
+
+Run standalone:
+    python -m benchmark.stub_backend --port 3100 --chat-latency lognormal:800,0.4
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import re
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Any, Callable, Awaitable
+
+import msgpack
+from aiohttp import web, WSMsgType
+
+from benchmark.latency import Latency
+
+# Configure logger
+logger = logging.getLogger("stub-backend")
+
+AGENTS = ["navigator", "historian", "experience", "memory"]
+
+REPLIES = [
+    "That's the old lighthouse on your left. It was built in 1871 and still guides ships today. "
+    "Would you like to hear about the keepers who lived there?",
+    "Sure! The next stop is about ten minutes ahead. There's a great view of the bay once you round the bend.",
+    "The town grew up around the harbor in the eighteen hundreds. Fishing and shipbuilding kept it going for decades.",
+    "Good question. The bridge ahead was finished in 1937, the same year as the Golden Gate.",
+]
+
+def _sentences(text: str):
+    return re.findall(r"[^.!?]+[.!?]+[\"')\]]*\s*|[^.!?]+$", text) or [text]
+
+class StubBackend:
+    """Canned backend responses with sampled latency"""
+
+    def __init__(self, chat_latency: Latency, arrival_latency: Latency, session_latency: Latency, chunk_gap: Latency):
+        self.chat_latency = chat_latency
+        self.arrival_latency = arrival_latency
+        self.session_latency = session_latency
+        self.chunk_gap = chunk_gap
+        self.requests: Dict[str, int] = {}
+
+    def _count(self, endpoint: str):
+        self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+    def _metadata(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "userId": body.get("userId"),
+            "sessionId": body.get("sessionId"),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok", "service": "aimee-backend"})
+
+    async def session_start(self, request: web.Request) -> web.Response:
+        self._count("session_start")
+        await asyncio.sleep(self.session_latency.sample())
+        return web.json_response({"success": True, "sessionId": uuid.uuid4().hex})
+
+    async def session_end(self, request: web.Request) -> web.Response:
+        self._count("session_end")
+        await asyncio.sleep(self.session_latency.sample())
+        return web.json_response({"success": True})
+
+    async def _chat_reply(self, body: Dict[str, Any]):
+        self._count("chat")
+        await asyncio.sleep(self.chat_latency.sample())
+        return random.choice(AGENTS), random.choice(REPLIES), self._metadata(body)
+
+    async def _stream_frames(self, agent: str, text: str, metadata: Dict[str, Any], write: Callable[[Dict[str, Any]], Awaitable[None]]):
+        await write({"type": "meta", "agent": agent})
+        for sentence in _sentences(text):
+            await write({"type": "delta", "text": sentence})
+            await asyncio.sleep(self.chunk_gap.sample())
+        await write({"type": "done", "success": True, "agent": agent, "metadata": metadata})
+
+    async def chat(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        agent, text, metadata = await self._chat_reply(body)
+
+        if body.get("stream") is not True:
+            return web.json_response({"success": True, "agent": agent, "response": text, "metadata": metadata})
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+
+        async def write(frame: Dict[str, Any]):
+            await response.write((json.dumps(frame) + "\n").encode())
+
+        await self._stream_frames(agent, text, metadata, write)
+        await response.write_eof()
+        return response
+
+    def _abandon(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        self._count("abandon")
+        return {"success": True, "turnId": body.get("turnId")}
+
+    async def abandon(self, request: web.Request) -> web.Response:
+        return web.json_response(self._abandon(await request.json()))
+
+    async def _arrival(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        self._count("arrival")
+        await asyncio.sleep(self.arrival_latency.sample())
+        name = body.get("markerName", "this spot")
+        return {
+            "success": True,
+            "agent": "historian",
+            "response": f"You've arrived at {name}. {random.choice(REPLIES)}",
+            "metadata": self._metadata(body),
+        }
+
+    async def arrival(self, request: web.Request) -> web.Response:
+        return web.json_response(await self._arrival(await request.json()))
+
+    async def _batch(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        self._count("batch")
+        results = []
+        for event in body.get("events", []):
+            if event.get("op") == "chat":
+                await self._chat_reply(event.get("body") or {})
+            else:
+                self._count(event.get("op", "unknown").replace(".", "_"))
+                await asyncio.sleep(self.session_latency.sample())
+            results.append({"id": event.get("id"), "status": 200})
+        return {"success": True, "results": results}
+
+    async def batch(self, request: web.Request) -> web.Response:
+        return web.json_response(await self._batch(await request.json()))
+
+    async def _channel_request(self, ws: web.WebSocketResponse, request_id: int, op: str, body: Dict[str, Any]):
+        async def send(frame: Dict[str, Any]):
+            if not ws.closed:
+                await ws.send_bytes(msgpack.packb({"id": request_id, **frame}, use_bin_type=True))
+
+        if op == "chat":
+            agent, text, metadata = await self._chat_reply(body)
+            if body.get("stream") is True:
+                await self._stream_frames(agent, text, metadata, send)
+                return
+            result = {"success": True, "agent": agent, "response": text, "metadata": metadata}
+        elif op == "chat.abandon":
+            result = self._abandon(body)
+        elif op == "arrival":
+            result = await self._arrival(body)
+        elif op == "batch":
+            result = await self._batch(body)
+        elif op in ("session.start", "session.end", "session.messages"):
+            self._count(op.replace(".", "_"))
+            await asyncio.sleep(self.session_latency.sample())
+            result = {"success": True, "sessionId": body.get("sessionId") or uuid.uuid4().hex}
+        else:
+            await send({"type": "result", "status": 404, "body": {"success": False, "error": f"Unknown operation {op!r}"}})
+            return
+
+        await send({"type": "result", "status": 200, "body": result})
+
+    async def channel(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        tasks = set()
+        async for message in ws:
+            if message.type != WSMsgType.BINARY:
+                continue
+            frame = msgpack.unpackb(message.data, raw=False)
+            task = asyncio.create_task(self._channel_request(ws, frame["id"], frame["op"], frame.get("body") or {}))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        return ws
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/health", self.health)
+        app.router.add_post("/api/session/start", self.session_start)
+        app.router.add_post("/api/session/end", self.session_end)
+        app.router.add_post("/aimee-chat", self.chat)
+        app.router.add_post("/aimee-chat/abandon", self.abandon)
+        app.router.add_post("/aimee-arrival", self.arrival)
+        app.router.add_post("/api/batch", self.batch)
+        app.router.add_get("/agent-channel", self.channel)
+        return app
+
+def add_latency_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--chat-latency", default="lognormal:800,0.4", help="Routing delay before the first chat frame")
+    parser.add_argument("--chunk-gap", default="const:0", help="Delay between streamed sentences")
+    parser.add_argument("--arrival-latency", default="lognormal:1200,0.3")
+    parser.add_argument("--session-latency", default="const:20", help="Session start/end delay")
+
+def from_arguments(args: argparse.Namespace) -> StubBackend:
+    return StubBackend(
+        chat_latency=Latency(args.chat_latency),
+        arrival_latency=Latency(args.arrival_latency),
+        session_latency=Latency(args.session_latency),
+        chunk_gap=Latency(args.chunk_gap),
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in AImee backend for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3100)
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    stub = from_arguments(args)
+    print(f"Stub backend listening on http://{args.host}:{args.port}", flush=True)
+    web.run_app(stub.app(), host=args.host, port=args.port, print=None, access_log=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Circuit Breaker for AImee LiveKit Agent
+
+Tracks the rolling error rate and p95 latency of backend requests. After
+repeated failures (or when the backend is consistently too slow) the circuit
+opens and callers skip the backend immediately, falling back to the direct
+LLM. After a cool-down it half-opens and lets a few probe requests through;
+a successful probe closes it again.
+
+A degraded backend then costs one timeout, not one per utterance.
+"""
+
+import os
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, Any, Tuple
+
+# Configure logger
+logger = logging.getLogger("circuit-breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """Rolling-window circuit breaker with half-open probing"""
+
+    def __init__(self, name: str, env_prefix: str = "CIRCUIT", p95_seconds: float = 8.0):
+        """
+        Args:
+            name: Name used in logs
+            env_prefix: Prefix of the environment variables that tune this breaker
+            p95_seconds: Default p95 latency threshold
+        """
+        self.name = name
+
+        self.window_seconds = float(os.getenv(f"{env_prefix}_WINDOW_SECONDS", "60"))
+        self.min_requests = int(os.getenv(f"{env_prefix}_MIN_REQUESTS", "5"))
+        self.failure_threshold = int(os.getenv(f"{env_prefix}_FAILURE_THRESHOLD", "3"))
+        self.error_rate_threshold = float(os.getenv(f"{env_prefix}_ERROR_RATE", "0.5"))
+        self.p95_threshold = float(os.getenv(f"{env_prefix}_P95_SECONDS", str(p95_seconds)))
+        self.open_seconds = float(os.getenv(f"{env_prefix}_OPEN_SECONDS", "30"))
+        self.half_open_probes = int(os.getenv(f"{env_prefix}_HALF_OPEN_PROBES", "1"))
+
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._consecutive_failures = 0
+        self._probes_in_flight = 0
+        self._window: Deque[Tuple[float, bool, float]] = deque()
+
+        self.stats: Dict[str, int] = {"opened": 0, "rejected": 0, "probes": 0}
+
+    def _trim(self, now: float):
+        cutoff = now - self.window_seconds
+        while self._window and self._window[0][0] < cutoff:
+            self._window.popleft()
+
+    def error_rate(self) -> float:
+        """Fraction of failed requests in the rolling window"""
+        self._trim(time.time())
+        if not self._window:
+            return 0.0
+        return sum(1 for _, ok, _ in self._window if not ok) / len(self._window)
+
+    def p95_latency(self) -> float:
+        """95th percentile latency (seconds) in the rolling window"""
+        self._trim(time.time())
+        if not self._window:
+            return 0.0
+        latencies = sorted(latency for _, _, latency in self._window)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    def _transition(self, state: str, reason: str = ""):
+        if state == self.state:
+            return
+        logger.warning(f"Circuit '{self.name}': {self.state} -> {state}{f' ({reason})' if reason else ''}")
+        self.state = state
+        if state == OPEN:
+            self._opened_at = time.time()
+            self.stats["opened"] += 1
+        elif state == CLOSED:
+            self._consecutive_failures = 0
+            self._window.clear()
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a request may be sent now
+
+        Every allowed request must be followed by exactly one record() or
+        release() call.
+        """
+        if self.state == OPEN:
+            if time.time() - self._opened_at < self.open_seconds:
+                self.stats["rejected"] += 1
+                return False
+            self._transition(HALF_OPEN, "cool-down elapsed")
+            self._probes_in_flight = 0
+
+        if self.state == HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_probes:
+                self.stats["rejected"] += 1
+                return False
+            self._probes_in_flight += 1
+            self.stats["probes"] += 1
+
+        return True
+
+    def record(self, success: bool, latency: float):
+        """Record the outcome and latency (seconds) of an allowed request"""
+        now = time.time()
+
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if success and latency <= self.p95_threshold:
+                self._transition(CLOSED, f"probe succeeded in {latency:.2f}s")
+            else:
+                self._transition(OPEN, "probe failed")
+            return
+
+        self._window.append((now, success, latency))
+        self._trim(now)
+        self._consecutive_failures = 0 if success else self._consecutive_failures + 1
+
+        if self.state != CLOSED:
+            return
+
+        if self._consecutive_failures >= self.failure_threshold:
+            self._transition(OPEN, f"{self._consecutive_failures} consecutive failures")
+        elif len(self._window) >= self.min_requests:
+            if self.error_rate() >= self.error_rate_threshold:
+                self._transition(OPEN, f"error rate {self.error_rate():.0%}")
+            elif self.p95_latency() > self.p95_threshold:
+                self._transition(OPEN, f"p95 latency {self.p95_latency():.2f}s")
+
+    def release(self):
+        """
+        Give back an allowed request that ended without an outcome (cancelled)
+
+        Frees its half-open probe slot without counting it as a success or
+        failure, so cancellations neither bias the rolling window nor leave
+        the circuit half-open with no probe left to close it.
+        """
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state and rolling statistics"""
+        return {
+            "state": self.state,
+            "error_rate": round(self.error_rate(), 3),
+            "p95_latency": round(self.p95_latency(), 3),
+            "window_requests": len(self._window),
+            **self.stats,
+        }
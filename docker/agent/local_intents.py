@@ -0,0 +1,144 @@
+"""
+Local Intents for AImee LiveKit Agent
+
+Handles trivial control utterances in the agent itself, without a backend
+round trip:
+
+    repeat    "repeat that", "say that again", "what did you say"
+              -> replay the last reply's audio from memory
+    stop      "stop", "be quiet", "never mind"
+              -> cancel playback and pending replies, say nothing
+    thanks    "thanks", "thank you"
+              -> short canned reply
+
+Only whole utterances match (after normalization and stripping fillers like
+"hey aimee" or "please"), so "stop at the next gas station" or "thanks, what's
+that building?" still go to the backend. Yes/no answers always go to the
+backend, which knows the question they answer.
+"""
+
+import os
+import logging
+import random
+from typing import Optional, Dict, List, AsyncIterator
+
+from livekit import rtc
+
+from response_cache import normalize_question
+
+# Configure logger
+logger = logging.getLogger("local-intents")
+
+LOCAL_INTENTS = os.getenv("LOCAL_INTENTS", "true").lower() == "true"
+LOCAL_REPEAT_MAX_SECONDS = float(os.getenv("LOCAL_REPEAT_MAX_SECONDS", "120"))
+
+_PHRASES: Dict[str, List[str]] = {
+    "repeat": [
+        "repeat", "repeat that", "repeat that again", "can you repeat that", "could you repeat that",
+        "say that again", "can you say that again", "could you say that again", "say again",
+        "what did you say", "what was that", "come again", "pardon", "pardon me", "sorry what",
+        "one more time",
+    ],
+    "stop": [
+        "stop", "stop it", "stop talking", "be quiet", "quiet", "shush", "shh", "hush", "shut up",
+        "enough", "that's enough", "never mind", "nevermind", "cancel", "cancel that", "forget it",
+    ],
+    "thanks": [
+        "thanks", "thank you", "thank you so much", "thanks a lot", "thanks so much", "cheers",
+        "great thanks", "awesome thanks", "perfect thanks", "much appreciated",
+    ],
+}
+
+_INTENTS: Dict[str, str] = {phrase: intent for intent, phrases in _PHRASES.items() for phrase in phrases}
+
+ACKNOWLEDGEMENTS: Dict[str, List[str]] = {
+    "thanks": ["You're welcome!", "Anytime!", "My pleasure!"],
+}
+
+def match_intent(text: str) -> Optional[str]:
+    """Local intent for a whole utterance, or None if it should go to the backend"""
+    if not LOCAL_INTENTS:
+        return None
+    return _INTENTS.get(normalize_question(text))
+
+def acknowledgement(intent: str) -> Optional[str]:
+    """Short spoken reply for an intent, if it has one"""
+    replies = ACKNOWLEDGEMENTS.get(intent)
+    return random.choice(replies) if replies else None
+
+class ReplyCapture:
+    """Frames of one reply as they are played, bounded by LOCAL_REPEAT_MAX_SECONDS"""
+
+    def __init__(self):
+        self.frames: List[rtc.AudioFrame] = []
+        self.seconds = 0.0
+        self.overflowed = False
+
+    async def tee(self, audio: AsyncIterator[rtc.AudioFrame]) -> AsyncIterator[rtc.AudioFrame]:
+        try:
+            async for frame in audio:
+                if not self.overflowed:
+                    self.seconds += frame.samples_per_channel / frame.sample_rate
+                    if self.seconds > LOCAL_REPEAT_MAX_SECONDS:
+                        self.overflowed = True
+                        self.frames = []
+                    else:
+                        self.frames.append(frame)
+                yield frame
+        finally:
+            # Closing the tee (e.g. on interruption) must close the source too
+            if hasattr(audio, "aclose"):
+                await audio.aclose()
+
+class LastReply:
+    """The agent's most recent reply, kept in memory for "repeat that" """
+
+    def __init__(self):
+        self.text: Optional[str] = None
+        self.frames: Optional[List[rtc.AudioFrame]] = None
+
+    def remember(self, text: str, capture: Optional[ReplyCapture], complete: bool):
+        """
+        Keep a reply once it has been spoken
+
+        Args:
+            text: Reply text (for a stream, the text received)
+            capture: Its captured audio, if it was played from frames
+            complete: False if it was interrupted - then only the text is kept
+        """
+        if not text:
+            return
+        self.text = text
+        self.frames = capture.frames if capture and complete and not capture.overflowed else None
+
+    def remember_generated(self, handle):
+        """
+        Keep the text of a reply the LLM generated and spoke itself
+
+        There is no captured audio for it, so "repeat that" re-synthesizes the
+        text. If nothing was said, the older reply is forgotten rather than
+        repeated in its place.
+
+        Args:
+            handle: The reply's SpeechHandle, once it has played out
+        """
+        text = " ".join(
+            item.text_content for item in handle.chat_items
+            if item.type == "message" and item.role == "assistant" and item.text_content
+        )
+        if text:
+            self.remember(text, None, not handle.interrupted)
+        else:
+            self.text = None
+            self.frames = None
+
+    def audio(self) -> Optional[AsyncIterator[rtc.AudioFrame]]:
+        """Replay the last reply's frames, if they were kept"""
+        if not self.frames:
+            return None
+
+        async def _replay(frames: List[rtc.AudioFrame]):
+            for frame in frames:
+                yield frame
+
+        return _replay(self.frames)
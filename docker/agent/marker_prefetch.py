@@ -0,0 +1,363 @@
+"""
+Arrival Narrative Prefetch for AImee LiveKit Agent
+
+Keeps a spatial index of tour markers and follows the user's location
+updates from the room data channel. When the predicted path enters a
+marker's radius, the arrival narrative is requested from the backend (and
+its audio synthesized into the TTS cache) ahead of time, so playback at the
+marker is near-instant instead of starting after the user has driven past.
+
+Data channel protocol (topic "aimee.location", JSON payloads):
+    {"type": "markers", "markers": [{"id", "name", "lat", "lng", "radiusMeters"}]}
+    {"type": "location", "lat", "lng", "speed"?, "heading"?, "mode"?}
+    {"type": "arrival", "markerId", "mode"?}
+    {"type": "route", "routeId"}
+
+When a route pack exists for the announced route (see route_pack.py), its
+markers and pre-rendered narratives are used and nothing is prefetched.
+"""
+
+import asyncio
+import math
+import os
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional, Dict, List, Tuple, Callable, Awaitable
+
+from backend_client import backend_client, BackendResponse
+
+# Configure logger
+logger = logging.getLogger("marker-prefetch")
+
+# Data channel topic carrying location and marker updates
+LOCATION_TOPIC = "aimee.location"
+
+EARTH_RADIUS_METERS = 6371000.0
+
+# Grid cell size for the spatial index (~1.1km of latitude)
+_CELL_DEGREES = 0.01
+
+# Default travel speeds by tour mode, used when the GPS fix has no speed
+MODE_SPEEDS = {
+    "drive": float(os.getenv("DRIVE_SPEED_MPS", "13.4")),
+    "walk": float(os.getenv("WALK_SPEED_MPS", "1.4")),
+}
+
+@dataclass
+class Marker:
+    """A tour marker with its arrival radius"""
+    id: str
+    name: str
+    lat: float
+    lng: float
+    radius_meters: float = 50.0
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Marker":
+        return cls(
+            id=str(data["id"]),
+            name=str(data.get("name", data["id"])),
+            lat=float(data["lat"]),
+            lng=float(data["lng"]),
+            radius_meters=float(data.get("radiusMeters", data.get("radius_meters", 50.0))),
+        )
+
+@dataclass
+class LocationFix:
+    """One location update from the mobile app"""
+    lat: float
+    lng: float
+    speed: Optional[float] = None  # meters/second
+    heading: Optional[float] = None  # degrees clockwise from north
+    mode: str = "drive"
+    timestamp: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LocationFix":
+        # Expo reports unknown speed/heading as -1
+        speed = data.get("speed")
+        heading = data.get("heading")
+        return cls(
+            lat=float(data["lat"]),
+            lng=float(data["lng"]),
+            speed=float(speed) if speed is not None and speed >= 0 else None,
+            heading=float(heading) if heading is not None and heading >= 0 else None,
+            mode=data.get("mode", "drive"),
+            timestamp=time.time(),
+        )
+
+def haversine_meters(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points in meters"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(a))
+
+def _local_offset(origin: LocationFix, lat: float, lng: float) -> Tuple[float, float]:
+    """Equirectangular (east, north) offset in meters from origin - accurate at tour scales"""
+    east = math.radians(lng - origin.lng) * EARTH_RADIUS_METERS * math.cos(math.radians(origin.lat))
+    north = math.radians(lat - origin.lat) * EARTH_RADIUS_METERS
+    return east, north
+
+class MarkerIndex:
+    """Uniform lat/lng grid index of markers for radius queries"""
+
+    def __init__(self):
+        self._cells: Dict[Tuple[int, int], List[Marker]] = {}
+        self.markers: Dict[str, Marker] = {}
+
+    @staticmethod
+    def _cell(lat: float, lng: float) -> Tuple[int, int]:
+        return (math.floor(lat / _CELL_DEGREES), math.floor(lng / _CELL_DEGREES))
+
+    def replace(self, markers: List[Marker]):
+        """Rebuild the index from a new marker list"""
+        self._cells = {}
+        self.markers = {}
+        for marker in markers:
+            self.markers[marker.id] = marker
+            self._cells.setdefault(self._cell(marker.lat, marker.lng), []).append(marker)
+
+    def within(self, lat: float, lng: float, radius_meters: float) -> List[Tuple[Marker, float]]:
+        """Markers within radius_meters of a point, with their distances"""
+        lat_span = math.ceil(math.degrees(radius_meters / EARTH_RADIUS_METERS) / _CELL_DEGREES)
+        cos_lat = max(math.cos(math.radians(lat)), 0.01)
+        lng_span = math.ceil(math.degrees(radius_meters / (EARTH_RADIUS_METERS * cos_lat)) / _CELL_DEGREES)
+        row, col = self._cell(lat, lng)
+
+        results = []
+        for r in range(row - lat_span, row + lat_span + 1):
+            for c in range(col - lng_span, col + lng_span + 1):
+                for marker in self._cells.get((r, c), ()):
+                    distance = haversine_meters(lat, lng, marker.lat, marker.lng)
+                    if distance <= radius_meters:
+                        results.append((marker, distance))
+        return results
+
+class ArrivalPrefetcher:
+    """Predicts upcoming marker arrivals and prefetches their narratives"""
+
+    def __init__(
+        self,
+        user_id: str = "voice-user",
+        warm_audio: Optional[Callable[[str], Awaitable[None]]] = None,
+        backend=None,
+    ):
+        self.user_id = user_id
+        self.warm_audio = warm_audio
+        self.backend = backend or backend_client
+        self.index = MarkerIndex()
+
+        self.horizon_seconds = float(os.getenv("PREFETCH_HORIZON_SECONDS", "60"))
+        self.corridor_meters = float(os.getenv("PREFETCH_CORRIDOR_METERS", "75"))
+        self.cooldown_seconds = float(os.getenv("ARRIVAL_COOLDOWN_SECONDS", "300"))
+        # Leaving takes a wider radius than arriving, so GPS jitter at the edge doesn't flap
+        self.leave_factor = float(os.getenv("MARKER_LEAVE_FACTOR", "2"))
+        self.ttl_seconds = float(os.getenv("PREFETCH_TTL_SECONDS", "900"))
+        self._semaphore = asyncio.Semaphore(int(os.getenv("PREFETCH_MAX_INFLIGHT", "2")))
+
+        self._last_fix: Optional[LocationFix] = None
+        self._prefetched: Dict[str, Tuple[float, asyncio.Task]] = {}
+        self._cooldowns: Dict[str, float] = {}
+        self.route_pack = None
+        self._route_id: Optional[str] = None
+
+        self.stats: Dict[str, int] = {"prefetched": 0, "prefetch_hits": 0, "pack_hits": 0, "live_fetches": 0}
+
+    async def load_route(self, route_id: str) -> bool:
+        """
+        Use the pre-rendered pack for a route, if one exists
+
+        The pack is opened in a thread so the session's event loop keeps running.
+
+        Returns:
+            bool: True if a pack was loaded
+        """
+        from route_pack import RoutePack
+
+        self._route_id = route_id
+        try:
+            pack = await asyncio.to_thread(RoutePack.for_route, route_id)
+        except Exception as e:
+            logger.error(f"Failed to load route pack for '{route_id}': {e}")
+            return False
+
+        if pack is None:
+            return False
+
+        # Another route was announced while this pack was loading
+        if self._route_id != route_id:
+            pack.close()
+            return False
+
+        if self.route_pack is not None:
+            self.route_pack.close()
+        self.route_pack = pack
+        self.set_markers(pack.markers)
+        return True
+
+    def packed(self, marker_id: str):
+        """Pre-rendered pack entry for a marker, if the current route has one"""
+        if self.route_pack is None:
+            return None
+        entry = self.route_pack.get(marker_id)
+        if entry is not None:
+            self.stats["pack_hits"] += 1
+        return entry
+
+    def set_markers(self, markers: List[Marker]):
+        """Replace the tour's marker set"""
+        self.index.replace(markers)
+        logger.info(f"Marker index loaded with {len(markers)} markers")
+
+    def _heading(self, fix: LocationFix) -> Optional[float]:
+        """Heading in degrees from the fix, or derived from the previous fix"""
+        if fix.heading is not None:
+            return fix.heading
+
+        previous = self._last_fix
+        if previous is None or haversine_meters(previous.lat, previous.lng, fix.lat, fix.lng) < 5:
+            return None
+
+        east, north = _local_offset(previous, fix.lat, fix.lng)
+        return math.degrees(math.atan2(east, north)) % 360
+
+    def _predicted_markers(self, fix: LocationFix) -> List[Marker]:
+        """Markers whose radius the predicted path enters within the lookahead horizon"""
+        speed = fix.speed if fix.speed is not None else MODE_SPEEDS.get(fix.mode, MODE_SPEEDS["drive"])
+        lookahead = max(speed, MODE_SPEEDS.get(fix.mode, 0.0)) * self.horizon_seconds
+        heading = self._heading(fix)
+
+        candidates = self.index.within(fix.lat, fix.lng, lookahead + self.corridor_meters + 500)
+        upcoming = []
+
+        for marker, distance in candidates:
+            reach = marker.radius_meters + self.corridor_meters
+            if distance <= reach:
+                upcoming.append(marker)
+                continue
+
+            if heading is None:
+                # No direction of travel yet - anything within the lookahead circle
+                if distance <= lookahead + marker.radius_meters:
+                    upcoming.append(marker)
+                continue
+
+            # Project onto the direction of travel: ahead of us and close to the line
+            east, north = _local_offset(fix, marker.lat, marker.lng)
+            dir_east, dir_north = math.sin(math.radians(heading)), math.cos(math.radians(heading))
+            along = east * dir_east + north * dir_north
+            across = abs(east * dir_north - north * dir_east)
+            if 0 <= along <= lookahead + marker.radius_meters and across <= reach:
+                upcoming.append(marker)
+
+        return upcoming
+
+    def _prefetch(self, marker: Marker, mode: str) -> asyncio.Task:
+        """Start (or reuse) a prefetch for a marker's arrival narrative"""
+        entry = self._prefetched.get(marker.id)
+        if entry and time.time() - entry[0] < self.ttl_seconds:
+            task = entry[1]
+            if not task.done() or (not task.cancelled() and task.exception() is None and task.result().success):
+                return task
+
+        task = asyncio.create_task(self._fetch(marker, mode, warm=True))
+        self._prefetched[marker.id] = (time.time(), task)
+        self.stats["prefetched"] += 1
+        logger.info(f"Prefetching arrival narrative for {marker.name} ({mode})")
+        return task
+
+    async def _fetch(self, marker: Marker, mode: str, warm: bool) -> BackendResponse:
+        async with self._semaphore:
+            response = await self.backend.arrival(
+                user_id=self.user_id,
+                marker_id=marker.id,
+                marker_name=marker.name,
+                location={"lat": marker.lat, "lng": marker.lng},
+                mode=mode
+            )
+
+        if warm and response.success and self.warm_audio:
+            try:
+                await self.warm_audio(response.response)
+            except Exception as e:
+                logger.warning(f"Audio prefetch failed for {marker.name}: {e}")
+        return response
+
+    def update_location(self, fix: LocationFix) -> Optional[Marker]:
+        """
+        Process a location update
+
+        Schedules prefetches for markers on the predicted path.
+
+        Returns:
+            The marker the user just arrived at, if any (respecting cooldowns)
+        """
+        arrived = None
+        now = time.time()
+
+        for marker in self._predicted_markers(fix):
+            if marker.id in self._cooldowns and now < self._cooldowns[marker.id]:
+                continue
+            if self.route_pack is not None and self.route_pack.get(marker.id) is not None:
+                continue
+            self._prefetch(marker, fix.mode)
+
+        for marker, _ in self.index.within(fix.lat, fix.lng, 1000):
+            if haversine_meters(fix.lat, fix.lng, marker.lat, marker.lng) <= marker.radius_meters:
+                if self.start_cooldown(marker.id):
+                    arrived = marker
+                    break
+
+        self._last_fix = fix
+        return arrived
+
+    def has_left(self, marker_id: str, fix: LocationFix) -> bool:
+        """True once a fix is well outside a marker's arrival radius (or the marker is gone)"""
+        marker = self.index.markers.get(marker_id)
+        if marker is None:
+            return True
+        return haversine_meters(fix.lat, fix.lng, marker.lat, marker.lng) > marker.radius_meters * self.leave_factor
+
+    def start_cooldown(self, marker_id: str) -> bool:
+        """Mark a marker as arrived; returns False if it is still in cooldown"""
+        now = time.time()
+        if now < self._cooldowns.get(marker_id, 0):
+            return False
+        self._cooldowns[marker_id] = now + self.cooldown_seconds
+        return True
+
+    async def narrative_for(self, marker: Marker, mode: str = "drive") -> Optional[str]:
+        """
+        Get the arrival narrative for a marker, prefetched if available
+
+        Returns:
+            Narrative text, or None if the backend could not provide one
+        """
+        entry = self._prefetched.pop(marker.id, None)
+        if entry and time.time() - entry[0] < self.ttl_seconds:
+            # The prefetch may have been cancelled or failed - that's not this caller's
+            # cancellation, so fall back to a live fetch instead of propagating it
+            task = entry[1]
+            await asyncio.wait({task})
+            if not task.cancelled() and task.exception() is None and task.result().success:
+                self.stats["prefetch_hits"] += 1
+                logger.info(f"Arrival narrative for {marker.name} served from prefetch")
+                return task.result().response
+
+        self.stats["live_fetches"] += 1
+        response = await self._fetch(marker, mode, warm=False)
+        return response.response if response.success else None
+
+    def close(self):
+        """Cancel outstanding prefetches and release any route pack"""
+        for _, task in self._prefetched.values():
+            task.cancel()
+        self._prefetched.clear()
+
+        self._route_id = None
+        if self.route_pack is not None:
+            self.route_pack.close()
+            self.route_pack = None
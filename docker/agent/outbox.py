@@ -0,0 +1,387 @@
+"""
+Outbox for AImee LiveKit Agent
+
+Write-behind queue for session bookkeeping that no caller waits on:
+transcript session start/end, transcript messages for replies served from
+the response cache, and the [SYSTEM: ...] chats to the Memory Agent
+(reconnection trip clear, session ending).
+
+Events are queued per process and sent in batches to the backend's batch
+endpoint (POST /api/batch, or the "batch" operation on the backend channel).
+
+- Coalescing: queued transcript messages for the same session merge into
+  one event; events with a coalesce key replace a queued one with the same key
+- Retry: transport failures and 5xx results are retried with exponential
+  backoff; other failures are dropped with a warning
+- Persistence: the queue is journaled to OUTBOX_DIR (one file per process)
+  so events survive a worker restart. Each process holds a lock on its
+  journal's lock file while it runs; a new process claims the journals whose
+  lock nobody holds (pids are reused after a container restart, so a live
+  pid doesn't mean the journal is still owned). Recovery runs off the event
+  loop, before the first batch is sent
+- Shutdown: close() drains the queue for up to OUTBOX_SHUTDOWN_TIMEOUT
+
+Each event has an id, so the backend can drop a batch it already applied
+(e.g. when a process died between sending a batch and journaling the ack).
+"""
+
+import asyncio
+import fcntl
+import json
+import os
+import logging
+import time
+import uuid
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Set, Tuple
+
+from backend_client import backend_client
+
+# Configure logger
+logger = logging.getLogger("outbox")
+
+@dataclass
+class OutboxEvent:
+    """A queued backend request"""
+    id: str
+    op: str
+    body: Dict[str, Any]
+    created: float
+    attempts: int = 0
+    coalesce_key: Optional[str] = None
+
+    def to_wire(self) -> Dict[str, Any]:
+        return {"id": self.id, "op": self.op, "body": self.body}
+
+class Outbox:
+    """Per-process batching, coalescing, persistent queue of fire-and-forget backend events"""
+
+    def __init__(self):
+        self.enabled = os.getenv("OUTBOX_ENABLED", "true").lower() == "true"
+        self.directory = Path(os.getenv("OUTBOX_DIR", "/app/cache/outbox"))
+        self.batch_size = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+        self.flush_delay = float(os.getenv("OUTBOX_FLUSH_DELAY_MS", "100")) / 1000
+        self.send_timeout = float(os.getenv("OUTBOX_SEND_TIMEOUT", "30"))
+        self.max_backoff = float(os.getenv("OUTBOX_MAX_BACKOFF_SECONDS", "60"))
+        self.max_age = float(os.getenv("OUTBOX_MAX_AGE_SECONDS", "86400"))
+        self.shutdown_timeout = float(os.getenv("OUTBOX_SHUTDOWN_TIMEOUT", "5"))
+
+        self.path = self.directory / f"outbox-{os.getpid()}.jsonl"
+        self.lock_path = self.path.with_suffix(".lock")
+        self._lock_file = None
+        self._recovery: Optional[asyncio.Task] = None
+        self._queued: List[OutboxEvent] = []
+        self._in_flight: List[OutboxEvent] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._backoff = 0.0
+        # Unbatched sends while the outbox is disabled
+        self._unbatched: Set[asyncio.Task] = set()
+
+        self.stats: Dict[str, int] = {"queued": 0, "coalesced": 0, "sent": 0, "retried": 0, "dropped": 0, "recovered": 0}
+
+        logger.info("Outbox Configuration:")
+        logger.info(f"  Enabled: {self.enabled}")
+        logger.info(f"  Journal: {self.path}")
+        logger.info(f"  Batch: up to {self.batch_size} events, {self.flush_delay * 1000:.0f}ms delay")
+
+    @property
+    def pending(self) -> int:
+        """Events not yet acknowledged by the backend"""
+        return len(self._in_flight) + len(self._queued)
+
+    def start(self):
+        """Recover journaled events and start the sender (needs a running event loop)"""
+        if not self.enabled or (self._task is not None and not self._task.done()):
+            return
+
+        self._lock_journal()
+        self._wake = asyncio.Event()
+        self._recovery = asyncio.create_task(self._recover())
+        self._task = asyncio.create_task(self._run())
+
+    def enqueue(self, op: str, body: Dict[str, Any], coalesce_key: Optional[str] = None):
+        """
+        Queue an event for the backend
+
+        Args:
+            op: Backend operation (session.start, session.end, session.messages, chat)
+            body: Request body, as the HTTP endpoint takes it
+            coalesce_key: Replaces a queued event with the same key
+        """
+        if not backend_client.enabled:
+            return
+        if not self.enabled:
+            # Still off the caller's path, but without batching, retry or persistence
+            event = OutboxEvent(id=uuid.uuid4().hex, op=op, body=body, created=time.time())
+            task = asyncio.create_task(backend_client.send_batch([event.to_wire()], timeout=self.send_timeout))
+            self._unbatched.add(task)
+            task.add_done_callback(self._unbatched.discard)
+            return
+        self.start()
+
+        # Transcript messages for a session merge into the queued event
+        if op == "session.messages":
+            for event in self._queued:
+                if event.op == op and event.body.get("sessionId") == body.get("sessionId"):
+                    event.body["messages"] = event.body["messages"] + body["messages"]
+                    self.stats["coalesced"] += 1
+                    self._journal(event)
+                    self._wake.set()
+                    return
+
+        if coalesce_key is not None:
+            before = len(self._queued)
+            self._queued = [e for e in self._queued if e.coalesce_key != coalesce_key]
+            if len(self._queued) != before:
+                self.stats["coalesced"] += before - len(self._queued)
+                self._compact()
+
+        event = OutboxEvent(id=uuid.uuid4().hex, op=op, body=body, created=time.time(), coalesce_key=coalesce_key)
+        self._queued.append(event)
+        self.stats["queued"] += 1
+        self._journal(event)
+        self._wake.set()
+
+    async def _run(self):
+        # Shielded: cancelling the sender at shutdown must not lose claimed journals
+        await asyncio.shield(self._recovery)
+        while True:
+            await self._wake.wait()
+            # Give events queued together (e.g. at session end) a moment to join the batch
+            await asyncio.sleep(self.flush_delay)
+            self._wake.clear()
+
+            if await self._send_batch():
+                self._backoff = 0.0
+                if self._queued:
+                    self._wake.set()
+            else:
+                self._backoff = min(self.max_backoff, max(1.0, self._backoff * 2))
+                logger.warning(f"Outbox: Send failed, retrying {self.pending} events in {self._backoff:.0f}s")
+                await asyncio.sleep(self._backoff)
+                self._wake.set()
+
+    async def _send_batch(self) -> bool:
+        """
+        Send the next batch
+
+        Returns:
+            False if the backend couldn't be reached (the batch stays queued)
+        """
+        self._drop_expired()
+        if not self._queued:
+            return True
+
+        batch, self._queued = self._queued[:self.batch_size], self._queued[self.batch_size:]
+        self._in_flight = batch
+        try:
+            results = await backend_client.send_batch([event.to_wire() for event in batch], timeout=self.send_timeout)
+        except BaseException:
+            # Cancelled mid-send (e.g. at shutdown) - the batch is still unacknowledged
+            self._queued = batch + self._queued
+            raise
+        finally:
+            self._in_flight = []
+
+        if results is None:
+            for event in batch:
+                event.attempts += 1
+            self._queued = batch + self._queued
+            self.stats["retried"] += len(batch)
+            return False
+
+        statuses = {result.get("id"): result for result in results}
+        retry: List[OutboxEvent] = []
+        for event in batch:
+            result = statuses.get(event.id, {"status": 500, "error": "No result"})
+            status = result.get("status", 500)
+            if status < 300:
+                self.stats["sent"] += 1
+            elif status >= 500:
+                event.attempts += 1
+                retry.append(event)
+            else:
+                self.stats["dropped"] += 1
+                logger.warning(f"Outbox: Backend rejected {event.op} event: HTTP {status} {result.get('error', '')}")
+
+        if retry:
+            # Retried after the backoff, ahead of newer events
+            self._queued = retry + self._queued
+            self.stats["retried"] += len(retry)
+
+        self._compact()
+        return not retry
+
+    def _drop_expired(self):
+        cutoff = time.time() - self.max_age
+        expired = [e for e in self._queued if e.created < cutoff]
+        if expired:
+            self._queued = [e for e in self._queued if e.created >= cutoff]
+            self.stats["dropped"] += len(expired)
+            logger.warning(f"Outbox: Dropped {len(expired)} events older than {self.max_age:.0f}s")
+
+    async def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Send everything queued now, without waiting for the batch delay
+
+        Returns:
+            True if the queue was drained
+        """
+        async def _drain():
+            if self._recovery is not None:
+                await asyncio.shield(self._recovery)
+            while self._queued and await self._send_batch():
+                pass
+
+        try:
+            await asyncio.wait_for(_drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.pending == 0
+
+    async def close(self):
+        """Drain the queue at process shutdown; whatever is left stays journaled for the next worker"""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+        drained = await self.flush(timeout=self.shutdown_timeout)
+        if not drained:
+            logger.warning(f"Outbox: {self.pending} events left for the next worker in {self.path}")
+        else:
+            self._unlock_journal()
+        logger.info(f"Outbox stats: {self.stats}")
+
+    def _journal(self, event: OutboxEvent):
+        """Append an event to the journal (a later line with the same id supersedes it)"""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(event), separators=(",", ":")) + "\n")
+        except OSError as e:
+            logger.warning(f"Outbox: Failed to journal event: {e}")
+
+    def _compact(self):
+        """Rewrite the journal with just the unacknowledged events"""
+        events = self._in_flight + self._queued
+        try:
+            if not events:
+                self.path.unlink(missing_ok=True)
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                for event in events:
+                    f.write(json.dumps(asdict(event), separators=(",", ":")) + "\n")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Outbox: Failed to compact journal: {e}")
+
+    @staticmethod
+    def _read_journal(path: Path) -> List[OutboxEvent]:
+        events: Dict[str, OutboxEvent] = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = OutboxEvent(**json.loads(line))
+                except (ValueError, TypeError):
+                    continue  # torn write at crash
+                events[event.id] = event
+        return list(events.values())
+
+    def _lock_journal(self):
+        """Hold this process's journal lock until it exits (the OS drops it if the process dies)"""
+        if self._lock_file is not None:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._lock_file = open(self.lock_path, "a")
+            fcntl.lockf(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError as e:
+            logger.warning(f"Outbox: Failed to lock journal: {e}")
+
+    def _unlock_journal(self):
+        """Release the journal lock once nothing is left in the journal"""
+        if self._lock_file is None:
+            return
+        self.lock_path.unlink(missing_ok=True)
+        self._lock_file.close()
+        self._lock_file = None
+
+    @staticmethod
+    def _owner_gone(journal: Path) -> bool:
+        """True if no running process holds a journal's lock"""
+        try:
+            with open(journal.with_suffix(".lock"), "r+") as f:
+                fcntl.lockf(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except (BlockingIOError, PermissionError):
+            return False
+        except OSError:
+            return True  # No lock file - its owner never started or exited cleanly
+        return True
+
+    def _claim_journals(self) -> Tuple[List[OutboxEvent], List[Path]]:
+        """
+        Read this process's journal and claim the journals of processes that are gone
+
+        Blocking - runs in a thread.
+
+        Returns:
+            The journaled events, and the claimed files to remove once the
+            events are journaled here
+        """
+        if not self.directory.exists():
+            return [], []
+
+        recovered: List[OutboxEvent] = []
+        claimed_paths: List[Path] = []
+        for path in sorted(self.directory.glob("outbox-*.jsonl")):
+            try:
+                if path == self.path:
+                    recovered.extend(self._read_journal(path))
+                    continue
+                if not self._owner_gone(path):
+                    continue
+
+                # Rename first so only one new worker claims a dead worker's journal
+                claimed = path.with_name(f"claimed-{os.getpid()}-{path.name}")
+                os.rename(path, claimed)
+                recovered.extend(self._read_journal(claimed))
+                claimed_paths.append(claimed)
+            except (OSError, ValueError):
+                continue
+        return recovered, claimed_paths
+
+    async def _recover(self):
+        """Queue journaled events ahead of new ones (journal I/O runs off the event loop)"""
+        recovered, claimed_paths = await asyncio.to_thread(self._claim_journals)
+
+        # This process's journal also holds the events queued while recovery ran
+        queued = {event.id for event in self._queued}
+        recovered = [event for event in recovered if event.id not in queued]
+        if recovered:
+            recovered.sort(key=lambda event: event.created)
+            self._queued = recovered + self._queued
+            self.stats["recovered"] += len(recovered)
+            logger.info(f"Outbox: Recovered {len(recovered)} events from previous workers")
+            self._compact()
+            self._wake.set()
+
+        if claimed_paths:
+            await asyncio.to_thread(self._remove, claimed_paths)
+
+    @staticmethod
+    def _remove(paths: List[Path]):
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "pending": self.pending}
+
+# Global outbox instance
+outbox = Outbox()
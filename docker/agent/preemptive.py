@@ -0,0 +1,203 @@
+"""
+Preemptive Backend Requests for AImee LiveKit Agent
+
+Starts the backend chat request on a stable interim STT transcript instead
+of waiting for end-of-turn. When the final transcript matches the
+speculative one closely enough, its (possibly already finished) response is
+used; otherwise the speculative request is cancelled and a normal one is
+issued. Endpointing delay, STT finalization and the backend round trip then
+overlap instead of adding up.
+
+Each speculative request has its own turn id. It carries no transcript
+session id, so a miss leaves nothing in the transcript: the backend is told
+to abandon turns that are cancelled or never claimed, and the agent records
+a claimed turn itself once it has been spoken.
+"""
+
+import asyncio
+import difflib
+import os
+import logging
+import re
+import time
+import uuid
+from typing import Optional, Dict, Any, Set
+
+from backend_client import backend_client, BackendChatStream
+
+# Configure logger
+logger = logging.getLogger("preemptive")
+
+PREEMPTIVE_MODE = os.getenv("PREEMPTIVE_MODE", "false").lower() == "true"
+
+def normalize_transcript(text: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace for comparison"""
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s']", " ", text.lower())).strip()
+
+class PreemptiveRequester:
+    """Per-session speculative backend request driven by interim transcripts"""
+
+    def __init__(self, context: Optional[Dict[str, Any]] = None, backend=None):
+        self.context = context or {"mode": "voice", "source": "livekit"}
+        self.backend = backend or backend_client
+        self.stable_seconds = float(os.getenv("PREEMPTIVE_STABLE_MS", "300")) / 1000
+        self.min_words = int(os.getenv("PREEMPTIVE_MIN_WORDS", "3"))
+        self.match_threshold = float(os.getenv("PREEMPTIVE_MATCH_THRESHOLD", "0.9"))
+
+        self._interim = ""
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._text: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._turn_id: Optional[str] = None
+        self._claimed: Optional[asyncio.Task] = None
+        self._claimed_turn_id: Optional[str] = None
+        self._started_at = 0.0
+        self._ready_at: Optional[float] = None
+        # Stream closes and abandon notices run after the requester moves on
+        self._background: Set[asyncio.Task] = set()
+
+        self.stats: Dict[str, float] = {"launched": 0, "hits": 0, "misses": 0, "ms_saved": 0.0}
+
+    def on_interim(self, transcript: str):
+        """Feed an interim transcript; launches a request once it stops changing"""
+        normalized = normalize_transcript(transcript)
+        if not normalized or normalized == self._interim:
+            return
+
+        self._interim = normalized
+        if self._timer:
+            self._timer.cancel()
+
+        if len(normalized.split()) < self.min_words:
+            return
+
+        loop = asyncio.get_running_loop()
+        self._timer = loop.call_later(self.stable_seconds, self._launch, transcript, normalized)
+
+    def _launch(self, transcript: str, normalized: str):
+        self._timer = None
+        if normalized != self._interim or normalized == self._text:
+            return
+
+        self._cancel_request()
+        self._text = normalized
+        self._turn_id = uuid.uuid4().hex
+        self._started_at = time.perf_counter()
+        self._ready_at = None
+        self._task = asyncio.create_task(self.backend.chat_stream(
+            user_id="voice-user",
+            user_input=transcript,
+            context=self.context,
+            turn_id=self._turn_id
+        ))
+        self._task.add_done_callback(self._on_ready)
+        self.stats["launched"] += 1
+        logger.info(f"Preemptive request launched on interim: {transcript[:60]}{'...' if len(transcript) > 60 else ''}")
+
+    def _on_ready(self, task: asyncio.Task):
+        if task is self._task:
+            self._ready_at = time.perf_counter()
+
+    def _cancel_request(self):
+        task, turn_id = self._task, self._turn_id
+        self._task = None
+        self._turn_id = None
+        self._text = None
+        self._discard(task, turn_id)
+
+    def _discard(self, task: Optional[asyncio.Task], turn_id: Optional[str]):
+        """Cancel a speculative request and tell the backend to drop its turn"""
+        if task is None:
+            return
+        if not task.done():
+            task.cancel()
+        elif task.cancelled() or task.exception() is not None:
+            return
+        else:
+            stream = task.result()
+            self._spawn(stream.aclose())
+            if not stream.success or stream.complete:
+                return  # Nothing left for the backend to discard
+
+        # The backend may still be routing it - don't let it record or stream the reply
+        self._spawn(self.backend.abandon_turn(turn_id))
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def claim(self, final_transcript: str) -> Optional[str]:
+        """
+        Match the final transcript against the speculative request
+
+        On a match the request is reserved for take(); otherwise it is cancelled.
+
+        Returns:
+            The speculative request's turn id if it matches, else None
+            (the caller should issue a normal request)
+        """
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        self._interim = ""
+
+        if self._task is None:
+            return None
+
+        final = normalize_transcript(final_transcript)
+        similarity = difflib.SequenceMatcher(None, self._text or "", final).ratio()
+        if similarity < self.match_threshold:
+            self.stats["misses"] += 1
+            logger.info(f"Preemptive miss (similarity {similarity:.2f}) - reissuing")
+            self._cancel_request()
+            return None
+
+        turn_id = self._turn_id
+        self._claimed, self._claimed_turn_id = self._task, turn_id
+        self._task, self._turn_id, self._text = None, None, None
+        logger.info(f"Preemptive match (similarity {similarity:.2f})")
+        return turn_id
+
+    async def take(self) -> Optional[BackendChatStream]:
+        """
+        Wait for the claimed speculative response
+
+        Cancelling the caller cancels the request; the caller abandons the
+        claimed turn id.
+
+        Returns:
+            The speculative stream, or None if it failed (the caller should
+            reissue the turn)
+        """
+        task, self._claimed, self._claimed_turn_id = self._claimed, None, None
+        if task is None:
+            return None
+
+        # Time saved: how far the speculative request got before the final transcript arrived
+        now = time.perf_counter()
+        saved_ms = ((self._ready_at or now) - self._started_at) * 1000
+        stream = await task
+        if not stream.success:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        self.stats["ms_saved"] += saved_ms
+        logger.info(f"Preemptive hit - saved {saved_ms:.0f}ms")
+        return stream
+
+    def hit_rate(self) -> float:
+        attempts = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / attempts if attempts else 0.0
+
+    def close(self):
+        """Cancel any outstanding speculative request, including a claimed one not yet taken"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        self._cancel_request()
+        claimed, turn_id = self._claimed, self._claimed_turn_id
+        self._claimed = None
+        self._claimed_turn_id = None
+        self._discard(claimed, turn_id)
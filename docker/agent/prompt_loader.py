@@ -6,11 +6,20 @@ This module is the single source of truth for agent prompts.
 
 To modify AImee's behavior, edit the corresponding .md files in /config/prompts/
 instead of changing code.
+
+Prompts are served from an in-memory registry that is loaded once per worker
+process (in prewarm). A background watcher re-reads a file only when its
+mtime changes and swaps it in when its content hash differs, so live edits
+still take effect without blocking session setup on disk I/O.
 """
 
 import os
+import hashlib
 import logging
+import threading
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Dict, Optional
 
 # Configure logger
 logger = logging.getLogger("prompt-loader")
@@ -18,12 +27,16 @@ logger = logging.getLogger("prompt-loader")
 # Path to prompt files in the Docker container
 PROMPTS_BASE_PATH = Path("/app/config/prompts")
 
-def _load_prompt(filename: str) -> str:
+# How often the background watcher checks prompt files for changes (0 disables)
+PROMPT_RELOAD_INTERVAL = float(os.getenv("PROMPT_RELOAD_INTERVAL", "5"))
+
+def _load_prompt(filename: str, base_path: Path = PROMPTS_BASE_PATH) -> str:
     """
     Generic prompt loader with error handling
 
     Args:
         filename: Name of the prompt file to load
+        base_path: Directory containing the prompt files
 
     Returns:
         str: Content of the prompt file
@@ -32,7 +45,7 @@ def _load_prompt(filename: str) -> str:
         FileNotFoundError: If the prompt file doesn't exist
         ValueError: If the prompt file is empty
     """
-    prompt_path = PROMPTS_BASE_PATH / filename
+    prompt_path = base_path / filename
 
     try:
         if not prompt_path.exists():
@@ -50,6 +63,157 @@ def _load_prompt(filename: str) -> str:
         logger.error(f"Failed to load prompt from {prompt_path}: {error}")
         raise
 
+@dataclass
+class CachedPrompt:
+    """A prompt file held in memory"""
+    content: str
+    mtime: float
+    sha256: str
+
+class PromptRegistry:
+    """
+    In-memory cache of all prompt files with mtime-based hot reload
+
+    Reads happen at load time and in the watcher thread only; get() never
+    touches the disk for a prompt that is already cached.
+    """
+
+    def __init__(self, base_path: Path = PROMPTS_BASE_PATH):
+        self.base_path = base_path
+        self._prompts: Dict[str, CachedPrompt] = {}
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._version = "unloaded"
+
+    def _read(self, filename: str) -> CachedPrompt:
+        """Read one prompt file from disk"""
+        mtime = (self.base_path / filename).stat().st_mtime
+        content = _load_prompt(filename, self.base_path)
+        sha256 = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        return CachedPrompt(content=content, mtime=mtime, sha256=sha256)
+
+    def _update_version(self):
+        """Recompute the registry-wide version id (caller holds the lock)"""
+        digest = hashlib.sha256()
+        for filename in sorted(self._prompts):
+            digest.update(f"{filename}:{self._prompts[filename].sha256}\n".encode("utf-8"))
+        self._version = digest.hexdigest()[:12]
+
+    def load_all(self):
+        """Load every .md prompt in the prompts directory into memory"""
+        loaded: Dict[str, CachedPrompt] = {}
+        for path in sorted(self.base_path.glob("*.md")):
+            try:
+                loaded[path.name] = self._read(path.name)
+            except Exception as error:
+                logger.error(f"Skipping prompt {path.name}: {error}")
+
+        with self._lock:
+            self._prompts = loaded
+            self._update_version()
+
+        logger.info(f"Prompt registry loaded {len(loaded)} prompts (version {self._version})")
+
+    def refresh(self) -> bool:
+        """
+        Reload prompts whose mtime changed and whose content actually differs
+
+        Returns:
+            bool: True if any prompt content changed
+        """
+        changed = False
+        with self._lock:
+            current = dict(self._prompts)
+        # Only entries re-read here are written back, so prompts that get()
+        # loads while the files are being checked aren't dropped
+        updates: Dict[str, CachedPrompt] = {}
+        seen = set()
+
+        for path in self.base_path.glob("*.md"):
+            filename = path.name
+            seen.add(filename)
+            try:
+                mtime = path.stat().st_mtime
+                cached = current.get(filename)
+                if cached and cached.mtime == mtime:
+                    continue
+
+                fresh = self._read(filename)
+                if cached and cached.sha256 == fresh.sha256:
+                    # Touched but unchanged - remember the new mtime only
+                    updates[filename] = fresh
+                    continue
+
+                updates[filename] = fresh
+                changed = True
+                logger.info(f"Prompt reloaded: {filename}")
+            except Exception as error:
+                # Keep serving the last good version of a broken or half-written file
+                logger.error(f"Failed to reload prompt {filename}: {error}")
+
+        for filename in set(current) - seen:
+            logger.warning(f"Prompt file removed, keeping cached copy: {filename}")
+
+        with self._lock:
+            self._prompts.update(updates)
+            if changed:
+                self._update_version()
+
+        if changed:
+            logger.info(f"Prompt registry updated to version {self._version}")
+        return changed
+
+    def get(self, filename: str) -> str:
+        """
+        Get a prompt's content from memory, loading it on first use if needed
+
+        Raises:
+            FileNotFoundError: If the prompt file doesn't exist
+            ValueError: If the prompt file is empty
+        """
+        cached = self._prompts.get(filename)
+        if cached is None:
+            cached = self._read(filename)
+            with self._lock:
+                self._prompts[filename] = cached
+                self._update_version()
+        return cached.content
+
+    @property
+    def version(self) -> str:
+        """Short id identifying the current revision of all loaded prompts"""
+        return self._version
+
+    def prompt_version(self, filename: str) -> Optional[str]:
+        """Short content hash of a single prompt, if loaded"""
+        cached = self._prompts.get(filename)
+        return cached.sha256[:12] if cached else None
+
+    def start_watcher(self, interval: float = PROMPT_RELOAD_INTERVAL):
+        """Start the background reload thread (no-op if disabled or already running)"""
+        if interval <= 0 or (self._watcher and self._watcher.is_alive()):
+            return
+
+        def _watch():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as error:
+                    logger.error(f"Prompt watcher error: {error}")
+
+        self._stop.clear()
+        self._watcher = threading.Thread(target=_watch, name="prompt-watcher", daemon=True)
+        self._watcher.start()
+        logger.info(f"Prompt watcher started (interval {interval}s)")
+
+    def stop_watcher(self):
+        """Stop the background reload thread"""
+        self._stop.set()
+
+# Global prompt registry instance
+prompt_registry = PromptRegistry()
+
 def get_aimee_system_prompt() -> str:
     """
     Load AImee's main system prompt
@@ -57,7 +221,16 @@ def get_aimee_system_prompt() -> str:
     Returns:
         str: AImee's system prompt for the LiveKit agent
     """
-    return _load_prompt('aimee_system_prompt.md')
+    return prompt_registry.get('aimee_system_prompt.md')
+
+def get_prompt_version() -> str:
+    """
+    Get the current prompt revision id
+
+    Returns:
+        str: Short hash identifying the loaded prompt set
+    """
+    return prompt_registry.version
 
 def validate_prompt_files() -> bool:
     """
@@ -0,0 +1,133 @@
+"""
+Provider Pool for AImee LiveKit Agent
+
+Per-process pool of OpenAI provider connections shared by every session in a
+worker process. Each session still gets its own STT/LLM/TTS plugin instances
+(AgentSession attaches per-session listeners and metrics to them), but all of
+them are bound to one OpenAI client whose HTTP connection pool keeps warm
+keep-alive connections. A reconnect after a force-quit therefore reuses an
+already-open TLS connection instead of paying a cold handshake on its greeting.
+
+With TTS_PROVIDER=sesame, sessions speak through the self-hosted Sesame
+service (sesame_tts), with an OpenAI TTS on the shared client as fallback.
+"""
+
+import asyncio
+import os
+import logging
+import time
+from typing import Optional
+
+import httpx
+import openai as openai_sdk
+from livekit.agents import tts as agents_tts
+from livekit.plugins import openai
+
+from aimee_model_config import get_tts_provider
+from sesame_tts import SesameTTS, sesame_pool
+
+# Configure logger
+logger = logging.getLogger("provider-pool")
+
+class ProviderPool:
+    """Shared OpenAI client and factory for per-session provider plugins"""
+
+    def __init__(self, api_key: str, llm_model: str, tts_voice: str = "alloy"):
+        self.api_key = api_key
+        self.llm_model = llm_model
+        self.tts_voice = tts_voice
+        self.tts_provider = get_tts_provider()
+
+        # Connection pool configuration
+        self.max_connections = int(os.getenv("PROVIDER_MAX_CONNECTIONS", "50"))
+        self.max_keepalive = int(os.getenv("PROVIDER_MAX_KEEPALIVE", "20"))
+        self.keepalive_expiry = float(os.getenv("PROVIDER_KEEPALIVE_EXPIRY", "120"))
+
+        self._client: Optional[openai_sdk.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_warm = 0.0
+
+        logger.info("Provider Pool Configuration:")
+        logger.info(f"  Max Connections: {self.max_connections}")
+        logger.info(f"  Max Keep-Alive: {self.max_keepalive}")
+        logger.info(f"  Keep-Alive Expiry: {self.keepalive_expiry}s")
+        logger.info(f"  TTS Provider: {self.tts_provider}")
+
+    @property
+    def client(self) -> openai_sdk.AsyncClient:
+        """
+        Get the shared OpenAI client, creating it on first use
+
+        The underlying httpx pool is bound to the running event loop, so the
+        client is rebuilt if the worker process starts a new loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(timeout=30.0, connect=10.0),
+                follow_redirects=True,
+            )
+            self._client = openai_sdk.AsyncClient(
+                api_key=self.api_key,
+                http_client=http_client,
+                max_retries=0,
+            )
+            self._loop = loop
+            self._last_warm = 0.0
+            logger.info("Provider Pool: Created shared OpenAI client")
+        return self._client
+
+    def stt(self, interim: bool = False) -> openai.STT:
+        """
+        Create a session-scoped STT bound to the shared client
+
+        Args:
+            interim: Stream interim transcripts (realtime transcription) instead
+                of transcribing only once the user stops speaking
+        """
+        return openai.STT(client=self.client, use_realtime=interim)
+
+    def llm(self) -> openai.LLM:
+        """Create a session-scoped LLM bound to the shared client"""
+        return openai.LLM(model=self.llm_model, client=self.client)
+
+    def tts(self) -> agents_tts.TTS:
+        """Create a session-scoped TTS (Sesame, or OpenAI bound to the shared client)"""
+        openai_tts = openai.TTS(voice=self.tts_voice, client=self.client)
+        if self.tts_provider == "sesame":
+            return SesameTTS(pool=sesame_pool, fallback=openai_tts)
+        return openai_tts
+
+    async def warm(self):
+        """
+        Open (or refresh) a keep-alive connection to the provider
+
+        Cheap metadata request so the TLS handshake happens off the
+        greeting path. Skipped if the pool was warmed recently.
+        """
+        client = self.client
+        if time.time() - self._last_warm < self.keepalive_expiry / 2:
+            return
+        if self.tts_provider == "sesame":
+            asyncio.create_task(sesame_pool.warm())
+
+        start = time.perf_counter()
+        try:
+            await client.models.retrieve(self.llm_model)
+            self._last_warm = time.time()
+            logger.info(f"Provider Pool: Warmed connection in {(time.perf_counter() - start) * 1000:.0f}ms")
+        except Exception as e:
+            logger.warning(f"Provider Pool: Warmup failed: {e}")
+
+    async def aclose(self):
+        """Close the shared client and its connections"""
+        await sesame_pool.aclose()
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            self._loop = None
@@ -0,0 +1,274 @@
+"""
+Response Cache for AImee LiveKit Agent
+
+Caches backend replies to common questions ("what is this place", "how old is
+it", "where's the restroom") so repeat questions at the same marker skip the
+multi-agent round trip. Combined with the TTS cache, a hit plays immediately.
+
+Keys combine the normalized utterance with the context that changes the
+answer: current route and marker, travel mode, and the user. Replies are
+cached per user by default, since the backend can personalize any reply with
+stored memory (the user's name, earlier preferences). Only replies the
+backend marks as not personalized ("personalized": false in the reply
+metadata) to questions that aren't about the user are shared. Turns before
+the first marker arrival have no such context and bypass the cache, as do
+memory-bearing turns ("remember...", "what did you say earlier", "call me
+...") and replies from the memory agent or the navigator, whose answers
+depend on where the user is right now.
+
+Two tiers:
+- memory: per-process LRU, bounded by entry count and TTL
+- SQLite (RESPONSE_CACHE_PATH): shared by every worker process on the node
+"""
+
+import asyncio
+import hashlib
+import os
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List
+
+from preemptive import normalize_transcript
+
+# Configure logger
+logger = logging.getLogger("response-cache")
+
+# Turns that read or write conversation memory - never cached
+_MEMORY_BEARING = re.compile(
+    r"\b(remember|remind|forget|earlier|before|last time|you said|you told|again|call me|my name|"
+    r"i said|i told|i asked)\b"
+)
+
+# First-person questions - answers depend on the user, so they are never shared
+_PERSONAL = re.compile(r"\b(i|i'm|i've|i'd|i'll|my|mine|myself|we|we're|we've|our|ours|us)\b")
+
+# Fillers that don't change the question
+_FILLERS = {"um", "uh", "er", "hmm", "hey", "aimee", "ok", "okay", "so", "well", "please"}
+
+# Replies from these agents depend on stored user state or the live location (lowercase)
+_UNCACHEABLE_AGENTS = {"memory", "navigator", "error", "circuit_open", "direct"}
+
+@dataclass
+class CachedResponse:
+    """A cached backend reply"""
+    response: str
+    agent: str
+    created: float
+
+def is_shareable(metadata: Optional[Dict[str, Any]]) -> bool:
+    """True if the backend marked a reply as not personalized for the user"""
+    return bool(metadata) and metadata.get("personalized") is False
+
+def normalize_question(text: str) -> str:
+    """Normalized utterance used in cache keys (case, punctuation, leading/trailing fillers)"""
+    words = normalize_transcript(text).split()
+    while words and words[0] in _FILLERS:
+        words.pop(0)
+    while words and words[-1] in _FILLERS:
+        words.pop()
+    return " ".join(words)
+
+class ResponseCache:
+    """Two-tier (memory LRU + shared SQLite) cache of backend chat replies"""
+
+    def __init__(self):
+        self.enabled = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+        self.ttl_seconds = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+        self.max_entries = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+        self.path = os.getenv("RESPONSE_CACHE_PATH", "")
+
+        self._memory: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "bypassed": 0, "stores": 0, "evictions": 0}
+
+        logger.info("Response Cache Configuration:")
+        logger.info(f"  Enabled: {self.enabled}")
+        logger.info(f"  TTL: {self.ttl_seconds:.0f}s")
+        logger.info(f"  Max Entries: {self.max_entries}")
+        logger.info(f"  Shared Store: {self.path or 'none (per-process only)'}")
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if not self.path:
+            return None
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " response TEXT NOT NULL,"
+                " agent TEXT NOT NULL,"
+                " created REAL NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+        return self._conn
+
+    def scopes(self, user_input: str, user_key: str, shareable: bool = True) -> List[str]:
+        """
+        Cache scopes an utterance's reply may be stored under or read from
+
+        Args:
+            user_input: The user's utterance
+            user_key: Identifies the user
+            shareable: False if the reply may be personalized
+
+        Returns:
+            "user:<key>", followed by "shared" unless the reply may be
+            personalized or the question is about the user; empty to bypass
+            the cache
+        """
+        text = normalize_transcript(user_input)
+        if not text or user_input.startswith("[SYSTEM:") or _MEMORY_BEARING.search(text):
+            return []
+        if shareable and not _PERSONAL.search(text):
+            return [f"user:{user_key}", "shared"]
+        return [f"user:{user_key}"]
+
+    def make_key(self, question: str, route_id: Optional[str], marker_id: str, mode: str, scope: str) -> str:
+        """Cache key for a normalized question in its context"""
+        raw = f"{question}|{route_id or '-'}|{marker_id}|{mode}|{scope}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _keys_for(
+        self,
+        user_input: str,
+        user_key: str,
+        route_id: Optional[str],
+        marker_id: Optional[str],
+        mode: str,
+        shareable: bool = True
+    ) -> List[str]:
+        if marker_id is None:
+            return []  # Not at a marker yet - "what is this place" has no stable answer
+        question = normalize_question(user_input)
+        return [
+            self.make_key(question, route_id, marker_id, mode, scope)
+            for scope in self.scopes(user_input, user_key, shareable)
+        ]
+
+    def _db_get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT response, agent, created FROM responses WHERE key = ? AND created >= ?",
+                (key, time.time() - self.ttl_seconds),
+            ).fetchone()
+            if row is not None:
+                db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        return CachedResponse(response=row[0], agent=row[1], created=row[2]) if row else None
+
+    def _db_put(self, key: str, entry: CachedResponse):
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, agent, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, entry.response, entry.agent, entry.created, entry.created),
+            )
+            # Sweep expired rows and trim to size periodically
+            self._writes += 1
+            if self._writes % 50 == 0:
+                db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_seconds,))
+                db.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    " SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def _remember(self, key: str, entry: CachedResponse):
+        self._memory.pop(key, None)
+        self._memory[key] = entry
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    async def _lookup(self, key: str) -> Optional[CachedResponse]:
+        entry = self._memory.get(key)
+        if entry is not None and time.time() - entry.created > self.ttl_seconds:
+            self._memory.pop(key)
+            entry = None
+        if entry is not None:
+            self._memory.move_to_end(key)
+        elif self.path:
+            try:
+                entry = await asyncio.to_thread(self._db_get, key)
+            except Exception as e:
+                logger.warning(f"Response Cache: Shared store read failed: {e}")
+            if entry is not None:
+                self._remember(key, entry)
+        return entry
+
+    async def get(
+        self, user_input: str, user_key: str, route_id: Optional[str], marker_id: Optional[str], mode: str
+    ) -> Optional[CachedResponse]:
+        """Cached reply for this question in this context, if any (this user's first, then shared)"""
+        if not self.enabled:
+            return None
+
+        keys = self._keys_for(user_input, user_key, route_id, marker_id, mode)
+        if not keys:
+            self.stats["bypassed"] += 1
+            return None
+
+        for key in keys:
+            entry = await self._lookup(key)
+            if entry is not None:
+                self.stats["hits"] += 1
+                return entry
+
+        self.stats["misses"] += 1
+        return None
+
+    async def put(
+        self,
+        user_input: str,
+        user_key: str,
+        route_id: Optional[str],
+        marker_id: Optional[str],
+        mode: str,
+        response: str,
+        agent: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Store a complete backend reply, unless the turn or agent is uncacheable
+
+        The reply is kept for this user only, unless the backend metadata marks
+        it shareable (see is_shareable()) and the question isn't about the user.
+        Error fallbacks (metadata "error" set) are never stored.
+        """
+        if not self.enabled or not response or agent.lower() in _UNCACHEABLE_AGENTS:
+            return
+        if metadata and metadata.get("error"):
+            return  # An apology, not an answer - ask the backend again next time
+
+        keys = self._keys_for(user_input, user_key, route_id, marker_id, mode, is_shareable(metadata))
+        if not keys:
+            return
+
+        # Most widely shared scope only - lookups fall through to it
+        key = keys[-1]
+        entry = CachedResponse(response=response, agent=agent, created=time.time())
+        self._remember(key, entry)
+        self.stats["stores"] += 1
+
+        if self.path:
+            try:
+                await asyncio.to_thread(self._db_put, key, entry)
+            except Exception as e:
+                logger.warning(f"Response Cache: Shared store write failed: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "memory_entries": len(self._memory)}
+
+# Global response cache instance
+response_cache = ResponseCache()
@@ -0,0 +1,264 @@
+"""
+Route Packs for AImee LiveKit Agent
+
+Pre-renders arrival narratives and their audio for a planned tour so a live
+session can serve them without any network calls (and keep working through
+cellular dead zones).
+
+A pack is a single file:
+    magic (4 bytes) | index length (uint32) | JSON index | PCM blobs...
+
+The JSON index lists each marker with its narrative and the offset/length of
+its audio blob. Loading a pack memory-maps the file, so audio pages are only
+read when played and are shared between sessions in the same worker.
+
+Build a pack (from the agent container):
+    python aimee_agent.py build-route-pack route.json [--out PATH] [--concurrency N]
+
+where route.json is:
+    {"routeId": "...", "mode": "drive", "markers": [{"id", "name", "lat", "lng", "radiusMeters"}]}
+"""
+
+import argparse
+import asyncio
+import json
+import mmap
+import os
+import logging
+import re
+import struct
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+from livekit.agents import tts as agents_tts
+
+from backend_client import backend_client
+from marker_prefetch import Marker
+from tts_cache import CachedAudio
+
+# Configure logger
+logger = logging.getLogger("route-pack")
+
+# Directory where sessions look for packs by route id
+ROUTE_PACK_DIR = Path(os.getenv("ROUTE_PACK_DIR", "/app/cache/packs"))
+
+# Route ids come from the mobile app - only plain file names are looked up
+_ROUTE_ID = re.compile(r"[\w.-]+")
+
+_MAGIC = b"AMRP"
+_HEADER = struct.Struct("<4sI")
+
+@dataclass
+class PackEntry:
+    """Pre-rendered arrival narrative for one marker"""
+    marker: Marker
+    narrative: str
+    agent: str
+    audio: Optional[CachedAudio] = None
+
+class RoutePack:
+    """Read-only, memory-mapped route pack"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, index_length = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"Not a route pack: {path}")
+
+        index_start = _HEADER.size
+        index = json.loads(bytes(self._mmap[index_start:index_start + index_length]))
+        blob_start = index_start + index_length
+        view = memoryview(self._mmap)
+
+        self.route_id: str = index["routeId"]
+        self.mode: str = index.get("mode", "drive")
+        self.created: float = index.get("created", 0.0)
+        self.entries: Dict[str, PackEntry] = {}
+
+        for item in index["markers"]:
+            audio = None
+            if item.get("audioLength"):
+                offset = blob_start + item["audioOffset"]
+                audio = CachedAudio(
+                    pcm=view[offset:offset + item["audioLength"]],
+                    sample_rate=item["sampleRate"],
+                    num_channels=item["numChannels"],
+                )
+            self.entries[item["marker"]["id"]] = PackEntry(
+                marker=Marker.from_dict(item["marker"]),
+                narrative=item["narrative"],
+                agent=item.get("agent", "unknown"),
+                audio=audio,
+            )
+
+        logger.info(f"Loaded route pack '{self.route_id}' with {len(self.entries)} markers from {path}")
+
+    @classmethod
+    def for_route(cls, route_id: str) -> Optional["RoutePack"]:
+        """
+        Load the pack for a route id from ROUTE_PACK_DIR, if one exists
+
+        Opening and indexing the file blocks; call it off the event loop.
+        """
+        if not _ROUTE_ID.fullmatch(route_id):
+            logger.warning(f"Ignoring invalid route id: {route_id!r}")
+            return None
+
+        path = ROUTE_PACK_DIR / f"{route_id}.pack"
+        if not path.exists():
+            logger.info(f"No route pack for '{route_id}'")
+            return None
+        return cls(path)
+
+    @property
+    def markers(self) -> List[Marker]:
+        return [entry.marker for entry in self.entries.values()]
+
+    def get(self, marker_id: str) -> Optional[PackEntry]:
+        return self.entries.get(marker_id)
+
+    def close(self):
+        # Entries hold views into the mapping; drop them before unmapping
+        self.entries = {}
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Audio still being played - the mapping is released with the last view
+            pass
+        self._file.close()
+
+async def _render_marker(
+    marker: Marker,
+    mode: str,
+    tts: agents_tts.TTS,
+    semaphore: asyncio.Semaphore,
+) -> Optional[Dict[str, Any]]:
+    """Fetch and synthesize one marker's arrival narrative"""
+    async with semaphore:
+        start = time.perf_counter()
+        response = await backend_client.arrival(
+            user_id="route-pack",
+            marker_id=marker.id,
+            marker_name=marker.name,
+            location={"lat": marker.lat, "lng": marker.lng},
+            mode=mode
+        )
+        if not response.success:
+            logger.error(f"Skipping {marker.name}: {response.error}")
+            return None
+
+        chunks: List[bytes] = []
+        sample_rate, num_channels = tts.sample_rate, tts.num_channels
+        async with tts.synthesize(response.response) as stream:
+            async for event in stream:
+                sample_rate = event.frame.sample_rate
+                num_channels = event.frame.num_channels
+                chunks.append(bytes(event.frame.data))
+
+        logger.info(f"Rendered {marker.name} in {time.perf_counter() - start:.1f}s")
+        return {
+            "marker": {
+                "id": marker.id,
+                "name": marker.name,
+                "lat": marker.lat,
+                "lng": marker.lng,
+                "radiusMeters": marker.radius_meters,
+            },
+            "narrative": response.response,
+            "agent": response.agent,
+            "pcm": b"".join(chunks),
+            "sampleRate": sample_rate,
+            "numChannels": num_channels,
+        }
+
+async def build_route_pack(
+    route: Dict[str, Any],
+    out_path: Path,
+    tts: agents_tts.TTS,
+    concurrency: int = 4,
+) -> int:
+    """
+    Render every marker on a route and write the pack file
+
+    Args:
+        route: Route definition with routeId, mode and markers
+        out_path: Destination pack file
+        tts: TTS used to synthesize narratives
+        concurrency: Maximum markers rendered at once
+
+    Returns:
+        int: Number of markers written to the pack
+    """
+    mode = route.get("mode", "drive")
+    markers = [Marker.from_dict(m) for m in route["markers"]]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    logger.info(f"Building route pack '{route['routeId']}' ({len(markers)} markers, concurrency {concurrency})")
+    rendered = await asyncio.gather(*(_render_marker(m, mode, tts, semaphore) for m in markers))
+
+    index_markers = []
+    blobs = []
+    offset = 0
+    for item in rendered:
+        if item is None:
+            continue
+        pcm = item.pop("pcm")
+        item["audioOffset"] = offset
+        item["audioLength"] = len(pcm)
+        index_markers.append(item)
+        blobs.append(pcm)
+        offset += len(pcm)
+
+    index = json.dumps({
+        "routeId": route["routeId"],
+        "mode": mode,
+        "created": time.time(),
+        "markers": index_markers,
+    }).encode("utf-8")
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(index)))
+        f.write(index)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, out_path)
+
+    logger.info(f"Wrote route pack {out_path} ({len(index_markers)}/{len(markers)} markers, {offset} audio bytes)")
+    return len(index_markers)
+
+def main(argv: List[str], tts_factory) -> int:
+    """
+    Command-line entry point for building a route pack
+
+    Args:
+        argv: Arguments after the subcommand name
+        tts_factory: Callable returning the TTS to synthesize with
+    """
+    parser = argparse.ArgumentParser(prog="aimee_agent.py build-route-pack")
+    parser.add_argument("route", type=Path, help="Route definition JSON file")
+    parser.add_argument("--out", type=Path, help="Output pack path (default: ROUTE_PACK_DIR/<routeId>.pack)")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("ROUTE_PACK_CONCURRENCY", "4")))
+    args = parser.parse_args(argv)
+
+    route = json.loads(args.route.read_text(encoding="utf-8"))
+    out_path = args.out or ROUTE_PACK_DIR / f"{route['routeId']}.pack"
+
+    # Building a pack always goes through the backend, regardless of USE_BACKEND_ROUTER
+    backend_client.enabled = True
+
+    async def _run() -> int:
+        try:
+            return await build_route_pack(route, out_path, tts_factory(), args.concurrency)
+        finally:
+            await backend_client.close()
+
+    written = asyncio.run(_run())
+    return 0 if written == len(route["markers"]) else 1
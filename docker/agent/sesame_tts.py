@@ -0,0 +1,253 @@
+"""
+Sesame TTS for AImee LiveKit Agent
+
+TTS provider backed by the self-hosted Sesame service (docker/sesame), with
+per-utterance failover to OpenAI TTS. Selected with TTS_PROVIDER=sesame
+(see aimee_model_config.get_tts_provider()).
+
+Each utterance is synthesized through Sesame's streaming endpoint
+(POST /inference/stream, raw PCM frames - see docker/sesame/server/pcm_stream.py)
+and falls back to OpenAI TTS, before any audio has played, when:
+
+- Sesame doesn't deliver first audio within SESAME_FIRST_AUDIO_MS
+- Sesame answers 429/503 (overloaded)
+- the request fails outright
+- the rolling tracker is open: recent first-audio p95 or failure rate was too
+  high, so Sesame is skipped until a probe utterance succeeds again
+
+All sessions in a worker process share one keep-alive connection pool and
+one latency tracker (the global sesame_pool).
+"""
+
+import asyncio
+import os
+import logging
+import struct
+import time
+from typing import Optional, Dict, Any, Tuple
+
+import aiohttp
+from livekit.agents import tts as agents_tts
+from livekit.agents import APIConnectionError, APIConnectOptions, DEFAULT_API_CONNECT_OPTIONS, utils
+
+from circuit_breaker import CircuitBreaker
+
+# Configure logger
+logger = logging.getLogger("sesame-tts")
+
+# Stream format of POST /inference/stream (docker/sesame/server/pcm_stream.py)
+_STREAM_HEADER = struct.Struct("<4sIHH")
+_FRAME_HEADER = struct.Struct("<BI")
+_MAGIC = b"SPCM"
+_AUDIO = 1
+_END = 2
+
+class SesameOverloaded(Exception):
+    """Sesame refused the request (429/503)"""
+
+async def _read_frame(content: aiohttp.StreamReader) -> Tuple[int, bytes]:
+    kind, length = _FRAME_HEADER.unpack(await content.readexactly(_FRAME_HEADER.size))
+    return kind, (await content.readexactly(length) if length else b"")
+
+class SesamePool:
+    """Per-process connection pool and rolling latency tracker for the Sesame service"""
+
+    def __init__(self):
+        self.url = os.getenv("SESAME_URL", "http://sesame:8000").rstrip("/")
+        self.speaker = int(os.getenv("SESAME_SPEAKER", "0"))
+        self.sample_rate = int(os.getenv("SESAME_SAMPLE_RATE", "24000"))
+        self.first_audio_deadline = float(os.getenv("SESAME_FIRST_AUDIO_MS", "800")) / 1000
+        self.read_timeout = float(os.getenv("SESAME_READ_TIMEOUT", "10"))
+        self.max_connections = int(os.getenv("SESAME_MAX_CONNECTIONS", "20"))
+        self.keepalive_expiry = float(os.getenv("SESAME_KEEPALIVE_EXPIRY", "60"))
+
+        # Rolling first-audio latency and failure rate; open means "use OpenAI for now"
+        self.tracker = CircuitBreaker("sesame", env_prefix="SESAME_CIRCUIT", p95_seconds=self.first_audio_deadline)
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.stats: Dict[str, int] = {
+            "utterances": 0,
+            "sesame": 0,
+            "failover_circuit": 0,
+            "failover_overloaded": 0,
+            "failover_deadline": 0,
+            "failover_error": 0,
+        }
+
+        logger.info("Sesame TTS Configuration:")
+        logger.info(f"  URL: {self.url}")
+        logger.info(f"  Speaker: {self.speaker}")
+        logger.info(f"  First Audio Deadline: {self.first_audio_deadline * 1000:.0f}ms")
+        logger.info(f"  Max Connections: {self.max_connections}")
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Shared HTTP session, rebuilt if the worker process starts a new event loop"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=self.keepalive_expiry)
+            )
+            self._loop = loop
+        return self._session
+
+    async def warm(self):
+        """Open a keep-alive connection to Sesame off the greeting path"""
+        try:
+            async with self.session.get(f"{self.url}/health", timeout=aiohttp.ClientTimeout(total=2)) as response:
+                logger.info(f"Sesame TTS: Health check HTTP {response.status}")
+        except Exception as e:
+            logger.warning(f"Sesame TTS: Warmup failed: {e}")
+
+    async def aclose(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            self._loop = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "tracker": self.tracker.snapshot()}
+
+class SesameChunkedStream(agents_tts.ChunkedStream):
+    """One utterance: Sesame if it delivers first audio in time, otherwise the fallback TTS"""
+
+    def __init__(self, *, tts: "SesameTTS", input_text: str, conn_options: APIConnectOptions):
+        super().__init__(tts=tts, input_text=input_text, conn_options=conn_options)
+        self._sesame_tts = tts
+        # Model that actually produced the audio - the fallback's after a failover
+        self.provider_model = tts.model
+
+    async def _run(self, output_emitter: agents_tts.AudioEmitter):
+        pool = self._sesame_tts.pool
+        request_id = utils.shortuuid()
+
+        reason = await self._run_sesame(pool, output_emitter, request_id)
+        if reason is None:
+            return
+
+        pool.stats[f"failover_{reason}"] += 1
+        self.provider_model = self._sesame_tts.fallback.model
+        logger.warning(f"Sesame TTS: Failing over to OpenAI ({reason}) for: {self.input_text[:50]}")
+        await self._run_fallback(output_emitter, request_id)
+
+    async def _open(self, pool: SesamePool) -> Tuple[aiohttp.ClientResponse, int, bytes]:
+        """Start synthesis and wait for the stream header and first audio frame"""
+        # Sesame drops the request unstarted once we'd have failed over anyway
+        response = await pool.session.post(
+            f"{pool.url}/inference/stream",
+            json={"text": self.input_text, "speaker": pool.speaker},
+            headers={"X-Deadline-Ms": str(int(pool.first_audio_deadline * 1000))}
+        )
+        try:
+            if response.status in (429, 503):
+                raise SesameOverloaded(f"HTTP {response.status}")
+            if response.status != 200:
+                raise APIConnectionError(f"Sesame returned HTTP {response.status}")
+
+            magic, sample_rate, channels, bits = _STREAM_HEADER.unpack(
+                await response.content.readexactly(_STREAM_HEADER.size)
+            )
+            if magic != _MAGIC or channels != 1 or bits != 16:
+                raise APIConnectionError("Unsupported Sesame stream format")
+
+            kind, payload = await _read_frame(response.content)
+            if kind != _AUDIO:
+                raise APIConnectionError(f"Sesame produced no audio: {payload.decode('utf-8', 'replace')}")
+            return response, sample_rate, payload
+        except BaseException:
+            response.close()
+            raise
+
+    async def _run_sesame(self, pool: SesamePool, output_emitter: agents_tts.AudioEmitter, request_id: str) -> Optional[str]:
+        """
+        Synthesize through Sesame
+
+        Returns:
+            None once the utterance has been synthesized, or the reason to fail
+            over ("circuit", "overloaded", "deadline", "error") if no audio was produced
+        """
+        pool.stats["utterances"] += 1
+        if not pool.tracker.allow_request():
+            return "circuit"
+
+        start = time.perf_counter()
+        try:
+            response, sample_rate, first_audio = await asyncio.wait_for(self._open(pool), timeout=pool.first_audio_deadline)
+        except SesameOverloaded:
+            pool.tracker.record(False, time.perf_counter() - start)
+            return "overloaded"
+        except asyncio.TimeoutError:
+            pool.tracker.record(False, pool.first_audio_deadline)
+            return "deadline"
+        except Exception as e:
+            pool.tracker.record(False, time.perf_counter() - start)
+            logger.warning(f"Sesame TTS: Request failed: {e}")
+            return "error"
+        except BaseException:
+            # Cancelled (interrupted speech) - no outcome, but free a half-open probe
+            pool.tracker.release()
+            raise
+
+        pool.tracker.record(True, time.perf_counter() - start)
+        pool.stats["sesame"] += 1
+
+        # Audio is playing from here on - a later failure can't switch providers
+        try:
+            output_emitter.initialize(request_id=request_id, sample_rate=sample_rate, num_channels=1, mime_type="audio/pcm")
+            output_emitter.push(first_audio)
+            while True:
+                kind, payload = await asyncio.wait_for(_read_frame(response.content), timeout=pool.read_timeout)
+                if kind == _AUDIO:
+                    output_emitter.push(payload)
+                elif kind == _END:
+                    response.release()
+                    return None
+                else:
+                    raise APIConnectionError(f"Sesame synthesis failed: {payload.decode('utf-8', 'replace')}")
+        except (aiohttp.ClientError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+            raise APIConnectionError(f"Sesame stream cut off: {e}") from e
+        finally:
+            response.close()
+
+    async def _run_fallback(self, output_emitter: agents_tts.AudioEmitter, request_id: str):
+        initialized = False
+        async with self._sesame_tts.fallback.synthesize(self.input_text) as stream:
+            async for event in stream:
+                frame = event.frame
+                if not initialized:
+                    output_emitter.initialize(
+                        request_id=request_id,
+                        sample_rate=frame.sample_rate,
+                        num_channels=frame.num_channels,
+                        mime_type="audio/pcm"
+                    )
+                    initialized = True
+                output_emitter.push(bytes(frame.data))
+
+class SesameTTS(agents_tts.TTS):
+    """Session-scoped Sesame TTS with an OpenAI TTS fallback"""
+
+    def __init__(self, pool: SesamePool, fallback: agents_tts.TTS):
+        super().__init__(
+            capabilities=agents_tts.TTSCapabilities(streaming=False),
+            sample_rate=pool.sample_rate,
+            num_channels=1,
+        )
+        self.pool = pool
+        self.fallback = fallback
+
+    @property
+    def model(self) -> str:
+        """Model name for TTS cache keys"""
+        return f"sesame-{self.pool.speaker}"
+
+    def synthesize(self, text: str, *, conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS) -> SesameChunkedStream:
+        return SesameChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+    async def aclose(self):
+        await self.fallback.aclose()
+
+# Global Sesame pool instance
+sesame_pool = SesamePool()
@@ -0,0 +1,261 @@
+"""
+Session Recording for AImee LiveKit Agent
+
+Optionally records each session's turn stream to a compact local log
+(gzipped NDJSON, one file per session): VAD and transcript events, agent
+state changes, location/arrival messages from the app, and every backend
+request with its response and timings. A streamed reply also records when
+each chunk arrived.
+
+The log can then be replayed against AImeeAgent (python -m benchmark.replay)
+with ReplayBackend serving the recorded responses at their recorded (or
+accelerated) latency. This gives reproducible measurements of the agent's
+own overhead on real traffic shapes.
+
+Session bookkeeping (session start/end, transcript messages) is delivered
+by the outbox, off the turn path, so it is neither recorded nor replayed.
+
+Each event is a JSON object with "t" (ms since session start) and "ev":
+    session      room, reconnection, prompt_version
+    user_state   old, new
+    transcript   text, final
+    agent_state  old, new
+    location     message (as received on the data channel)
+    backend      kind, request fields, response fields, latency_ms
+                 (chat_stream adds chunks: [[ms since request, text], ...])
+
+Recordings are written when the session ends.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import logging
+import re
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+from backend_client import BackendChatStream, BackendResponse
+from circuit_breaker import CircuitBreaker
+
+# Configure logger
+logger = logging.getLogger("session-recorder")
+
+SESSION_RECORDING = os.getenv("SESSION_RECORDING", "false").lower() == "true"
+SESSION_RECORDING_DIR = Path(os.getenv("SESSION_RECORDING_DIR", "/app/cache/recordings"))
+
+class SessionRecorder:
+    """In-memory event log for one session, written out when it closes"""
+
+    def __init__(self, room_name: str, directory: Path = SESSION_RECORDING_DIR):
+        safe_room = re.sub(r"[^\w.-]", "_", room_name) or "session"
+        self.path = directory / f"{safe_room}-{time.strftime('%Y%m%dT%H%M%S')}.ndjson.gz"
+        self._start = time.perf_counter()
+        self._events: List[Dict[str, Any]] = []
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self._start) * 1000, 1)
+
+    def record(self, event: str, **fields) -> Dict[str, Any]:
+        """Append an event; the returned dict may be updated until close()"""
+        entry = {"t": self.elapsed_ms(), "ev": event, **fields}
+        self._events.append(entry)
+        return entry
+
+    def _write(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            for entry in self._events:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    async def close(self):
+        """Write the recording to disk"""
+        try:
+            await asyncio.to_thread(self._write)
+            logger.info(f"Session recording saved: {self.path} ({len(self._events)} events)")
+        except Exception as e:
+            logger.error(f"Failed to save session recording {self.path}: {e}")
+
+def load_recording(path: str) -> List[Dict[str, Any]]:
+    """Read a recording written by SessionRecorder"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+class _RecordedStream:
+    """Chat stream proxy that records each chunk as it is consumed"""
+
+    def __init__(self, stream, entry: Dict[str, Any], started: float):
+        self._stream = stream
+        self._entry = entry
+        self._started = started
+
+    def __getattr__(self, name: str):
+        return getattr(self._stream, name)
+
+    async def __aiter__(self):
+        chunks = self._entry.setdefault("chunks", [])
+        try:
+            async for text in self._stream:
+                chunks.append([round((time.perf_counter() - self._started) * 1000, 1), text])
+                yield text
+        finally:
+            self._entry.update(complete=self._stream.complete, error=self._stream.error)
+
+class RecordingBackend:
+    """Backend client wrapper that records requests and responses"""
+
+    def __init__(self, backend, recorder: SessionRecorder):
+        self._backend = backend
+        self._recorder = recorder
+
+    def __getattr__(self, name: str):
+        return getattr(self._backend, name)
+
+    async def _call(self, kind: str, request: Dict[str, Any], call):
+        started = time.perf_counter()
+        entry = self._recorder.record("backend", kind=kind, **request)
+        try:
+            result = await call
+        except asyncio.CancelledError:
+            entry.update(cancelled=True, latency_ms=round((time.perf_counter() - started) * 1000, 1))
+            raise
+        entry["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result, entry, started
+
+    async def chat(self, **kwargs) -> BackendResponse:
+        response, entry, _ = await self._call(
+            "chat", {"input": kwargs.get("user_input"), "context": kwargs.get("context")}, self._backend.chat(**kwargs)
+        )
+        entry.update(success=response.success, agent=response.agent, response=response.response, error=response.error)
+        return response
+
+    async def chat_stream(self, **kwargs):
+        stream, entry, started = await self._call(
+            "chat_stream", {"input": kwargs.get("user_input"), "context": kwargs.get("context")}, self._backend.chat_stream(**kwargs)
+        )
+        entry.update(success=stream.success, agent=stream.agent, error=stream.error)
+        return _RecordedStream(stream, entry, started)
+
+    async def arrival(self, **kwargs) -> BackendResponse:
+        response, entry, _ = await self._call(
+            "arrival", {"marker_id": kwargs.get("marker_id"), "mode": kwargs.get("mode")}, self._backend.arrival(**kwargs)
+        )
+        entry.update(success=response.success, agent=response.agent, response=response.response, error=response.error)
+        return response
+
+    async def abandon_turn(self, turn_id: str) -> bool:
+        acknowledged, entry, _ = await self._call("abandon", {}, self._backend.abandon_turn(turn_id))
+        entry["success"] = acknowledged
+        return acknowledged
+
+class ReplayChatStream(BackendChatStream):
+    """Chat stream that replays recorded chunks at their recorded offsets"""
+
+    def __init__(self, entry: Dict[str, Any], started: float, speed: float, turn_id: Optional[str] = None):
+        super().__init__(turn_id=turn_id)
+        self.agent = entry.get("agent") or "unknown"
+        self._chunks = list(entry.get("chunks") or [])
+        self._started = started
+        self._speed = speed
+        self._done = not self._chunks
+        self.complete = self._done
+
+    async def _next_text(self) -> Optional[str]:
+        if not self._chunks:
+            self._done = True
+            self.complete = True
+            return None
+
+        offset_ms, text = self._chunks.pop(0)
+        delay = offset_ms / 1000 / self._speed - (time.perf_counter() - self._started)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        self._parts.append(text)
+        if not self._chunks:
+            self._done = True
+            self.complete = True
+        return text
+
+class ReplayBackend:
+    """
+    Serves recorded backend responses in place of the backend client
+
+    Requests are matched to recorded ones of the same kind, by input text
+    where possible (speculative requests may be issued in a different order),
+    otherwise in recorded order.
+    """
+
+    def __init__(self, events: List[Dict[str, Any]], speed: float = 1.0):
+        self.speed = speed
+        self.enabled = True
+        self.breaker = CircuitBreaker("replay")
+        self.arrival_breaker = CircuitBreaker("replay-arrival", env_prefix="CIRCUIT_ARRIVAL")
+        self._recorded: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for event in events:
+            if event.get("ev") == "backend":
+                self._recorded[event["kind"]].append(event)
+        self.streaming = bool(self._recorded["chat_stream"])
+        self.stats: Dict[str, int] = {"served": 0, "unmatched": 0}
+
+    def _take(self, kind: str, user_input: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        recorded = self._recorded[kind]
+        for index, entry in enumerate(recorded):
+            if user_input is None or entry.get("input") == user_input:
+                self.stats["served"] += 1
+                return recorded.pop(index)
+        if recorded:
+            self.stats["served"] += 1
+            return recorded.pop(0)
+        self.stats["unmatched"] += 1
+        logger.warning(f"Replay: no recorded {kind} response left for {user_input!r}")
+        return None
+
+    async def _wait(self, entry: Dict[str, Any]):
+        await asyncio.sleep(entry.get("latency_ms", 0) / 1000 / self.speed)
+
+    def prewarm(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def _response(self, kind: str, user_input: Optional[str]) -> BackendResponse:
+        entry = self._take(kind, user_input)
+        if entry is None:
+            return BackendResponse(success=False, agent="replay", response="", metadata={}, error="No recorded response")
+        await self._wait(entry)
+        return BackendResponse(
+            success=bool(entry.get("success")),
+            agent=entry.get("agent") or "unknown",
+            response=entry.get("response") or "",
+            metadata={},
+            error=entry.get("error"),
+        )
+
+    async def chat(self, user_input: str = "", **kwargs) -> BackendResponse:
+        return await self._response("chat", user_input)
+
+    async def arrival(self, **kwargs) -> BackendResponse:
+        return await self._response("arrival", None)
+
+    async def chat_stream(self, user_input: str = "", turn_id: Optional[str] = None, **kwargs) -> BackendChatStream:
+        entry = self._take("chat_stream", user_input)
+        if entry is None:
+            return BackendChatStream.failed("No recorded response", agent="replay")
+
+        started = time.perf_counter()
+        if not entry.get("success"):
+            await self._wait(entry)
+            return BackendChatStream.failed(entry.get("error") or "Recorded failure")
+
+        stream = ReplayChatStream(entry, started, self.speed, turn_id=turn_id)
+        stream.session_id = kwargs.get("session_id")
+        await stream.prime()
+        return stream
+
+    async def abandon_turn(self, turn_id: str) -> bool:
+        return True
@@ -0,0 +1,216 @@
+"""
+Session Registry for AImee LiveKit Agent
+
+Tracks the last session seen in each room so the entrypoint can tell a
+reconnection (user force-quit and rejoined) from a new session. Entries
+expire after a TTL, so memory stays bounded no matter how many rooms a
+worker has served.
+
+Backends (SESSION_REGISTRY env var):
+- memory: per-process, TTL + LRU bounded (default)
+- sqlite: shared file, so every worker process on a node sees the same rooms
+- redis:  shared server, so reconnects dispatched to another node are detected
+          (requires the optional `redis` package)
+"""
+
+import abc
+import asyncio
+import os
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+# Configure logger
+logger = logging.getLogger("session-registry")
+
+# Sessions seen within this window are treated as reconnections; entries
+# are evicted once they are older than this
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "300"))
+
+@dataclass
+class SessionRecord:
+    """Last known session state for a room"""
+    started: float
+    last_seen: float
+    participant_connected: bool = False
+
+class SessionRegistry(abc.ABC):
+    """Base interface for session registry backends"""
+
+    def __init__(self, ttl_seconds: float = SESSION_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+
+    @abc.abstractmethod
+    async def get(self, room_name: str) -> Optional[SessionRecord]:
+        """Get the unexpired record for a room, if any"""
+
+    @abc.abstractmethod
+    async def put(self, room_name: str, record: SessionRecord):
+        """Create or replace the record for a room"""
+
+    async def touch(self, room_name: str, participant_connected: bool):
+        """Update last_seen and connection state, creating the record if it expired"""
+        now = time.time()
+        record = await self.get(room_name)
+        if record is None:
+            record = SessionRecord(started=now, last_seen=now)
+        record.last_seen = now
+        record.participant_connected = participant_connected
+        await self.put(room_name, record)
+
+    async def close(self):
+        """Release backend resources"""
+
+class MemorySessionRegistry(SessionRegistry):
+    """Per-process registry bounded by TTL and entry count"""
+
+    def __init__(self, ttl_seconds: float = SESSION_TTL_SECONDS, max_entries: int = 10000):
+        super().__init__(ttl_seconds)
+        self.max_entries = max_entries
+        self._records: "OrderedDict[str, SessionRecord]" = OrderedDict()
+
+    def _evict(self):
+        cutoff = time.time() - self.ttl_seconds
+        # Records are kept in last-write order, so expired ones are at the front
+        while self._records:
+            room_name, record = next(iter(self._records.items()))
+            if record.last_seen >= cutoff and len(self._records) <= self.max_entries:
+                break
+            self._records.pop(room_name)
+
+    async def get(self, room_name: str) -> Optional[SessionRecord]:
+        self._evict()
+        record = self._records.get(room_name)
+        return SessionRecord(**asdict(record)) if record else None
+
+    async def put(self, room_name: str, record: SessionRecord):
+        self._records.pop(room_name, None)
+        self._records[room_name] = SessionRecord(**asdict(record))
+        self._evict()
+
+class SQLiteSessionRegistry(SessionRegistry):
+    """Registry in a shared SQLite file, visible to all worker processes on a node"""
+
+    def __init__(self, path: str, ttl_seconds: float = SESSION_TTL_SECONDS):
+        super().__init__(ttl_seconds)
+        self.path = path
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " room_name TEXT PRIMARY KEY,"
+            " started REAL NOT NULL,"
+            " last_seen REAL NOT NULL,"
+            " participant_connected INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions(last_seen)")
+
+    def _get(self, room_name: str) -> Optional[SessionRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT started, last_seen, participant_connected FROM sessions"
+                " WHERE room_name = ? AND last_seen >= ?",
+                (room_name, time.time() - self.ttl_seconds),
+            ).fetchone()
+        if row is None:
+            return None
+        return SessionRecord(started=row[0], last_seen=row[1], participant_connected=bool(row[2]))
+
+    def _put(self, room_name: str, record: SessionRecord):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (room_name, started, last_seen, participant_connected)"
+                " VALUES (?, ?, ?, ?)",
+                (room_name, record.started, record.last_seen, int(record.participant_connected)),
+            )
+            # Expired rows are filtered on read; sweep them periodically to bound the file
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._conn.execute("DELETE FROM sessions WHERE last_seen < ?", (time.time() - self.ttl_seconds,))
+
+    async def get(self, room_name: str) -> Optional[SessionRecord]:
+        return await asyncio.to_thread(self._get, room_name)
+
+    async def put(self, room_name: str, record: SessionRecord):
+        await asyncio.to_thread(self._put, room_name, record)
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+class RedisSessionRegistry(SessionRegistry):
+    """Registry on a Redis-compatible server, shared across nodes"""
+
+    def __init__(self, url: str, ttl_seconds: float = SESSION_TTL_SECONDS, prefix: str = "aimee:session:"):
+        super().__init__(ttl_seconds)
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as e:
+            raise ImportError("SESSION_REGISTRY=redis requires the 'redis' package") from e
+
+        self.url = url
+        self.prefix = prefix
+        self._redis_asyncio = redis_asyncio
+        self._client = None
+
+    def _get_client(self):
+        # Created lazily so the connection pool binds to the job's event loop
+        if self._client is None:
+            self._client = self._redis_asyncio.from_url(self.url, decode_responses=True)
+        return self._client
+
+    async def get(self, room_name: str) -> Optional[SessionRecord]:
+        data = await self._get_client().hgetall(self.prefix + room_name)
+        if not data:
+            return None
+        return SessionRecord(
+            started=float(data["started"]),
+            last_seen=float(data["last_seen"]),
+            participant_connected=data.get("participant_connected") == "1",
+        )
+
+    async def put(self, room_name: str, record: SessionRecord):
+        key = self.prefix + room_name
+        async with self._get_client().pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={
+                "started": record.started,
+                "last_seen": record.last_seen,
+                "participant_connected": "1" if record.participant_connected else "0",
+            })
+            pipe.expire(key, int(self.ttl_seconds))
+            await pipe.execute()
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+def create_session_registry() -> SessionRegistry:
+    """
+    Create the session registry configured by environment variables
+
+    Environment Variables:
+        SESSION_REGISTRY: memory (default), sqlite or redis
+        SESSION_REGISTRY_URL: SQLite file path or Redis URL
+        SESSION_TTL_SECONDS: Reconnection window and eviction TTL
+    """
+    backend = os.getenv("SESSION_REGISTRY", "memory").lower()
+    url = os.getenv("SESSION_REGISTRY_URL", "")
+
+    if backend == "sqlite":
+        registry: SessionRegistry = SQLiteSessionRegistry(url or "/app/cache/sessions.db")
+    elif backend == "redis":
+        registry = RedisSessionRegistry(url or "redis://localhost:6379/0")
+    else:
+        registry = MemorySessionRegistry()
+
+    logger.info(f"Session registry: {type(registry).__name__} (TTL {registry.ttl_seconds:.0f}s)")
+    return registry
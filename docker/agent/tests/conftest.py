@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Agent modules are imported flat, as the worker runs them (python aimee_agent.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,90 @@
+import asyncio
+
+from backend_channel import BackendChannel
+from backend_client import BackendClient, ChannelChatStream
+
+def _open_stream(read_timeout=1.0):
+    channel = BackendChannel("http://backend:3000")
+    queue: asyncio.Queue = asyncio.Queue()
+    channel._pending[1] = queue
+    return channel, queue, ChannelChatStream(channel, 1, queue, turn_id="turn-1", read_timeout=read_timeout)
+
+async def _consume(stream):
+    return [text async for text in stream]
+
+def test_channel_stream_completes_on_done():
+    async def scenario():
+        channel, queue, stream = _open_stream()
+        for frame in ({"type": "meta", "agent": "Historian"}, {"type": "delta", "text": "Built in 1870."},
+                      {"type": "done", "agent": "Historian"}):
+            queue.put_nowait({"id": 1, **frame})
+        return stream, await _consume(stream)
+
+    stream, texts = asyncio.run(scenario())
+    assert texts == ["Built in 1870."]
+    assert stream.success and stream.complete
+    assert stream.agent == "Historian"
+
+def test_channel_closing_mid_reply_fails_the_stream():
+    async def scenario():
+        channel, queue, stream = _open_stream()
+        queue.put_nowait({"id": 1, "type": "delta", "text": "The lighthouse"})
+        # What BackendChannel's read loop does when the connection drops
+        queue.put_nowait(None)
+        return stream, await _consume(stream)
+
+    stream, texts = asyncio.run(scenario())
+    assert texts == ["The lighthouse"]
+    assert not stream.success
+    assert not stream.complete
+    assert "Backend channel closed" in stream.error
+    assert stream.text == "The lighthouse"
+
+def test_stalled_channel_fails_the_stream():
+    async def scenario():
+        channel, queue, stream = _open_stream(read_timeout=0.05)
+        queue.put_nowait({"id": 1, "type": "delta", "text": "The lighthouse"})
+        texts = await _consume(stream)
+        return channel, stream, texts
+
+    channel, stream, texts = asyncio.run(scenario())
+    assert texts == ["The lighthouse"]
+    assert not stream.success
+    assert not stream.complete
+    assert 1 not in channel._pending
+
+def test_pool_from_a_previous_event_loop_is_closed():
+    client = BackendClient()
+    first = asyncio.run(client._get_session())
+
+    async def next_job():
+        session = await client._get_session()
+        await client.close()
+        return session
+
+    assert asyncio.run(next_job()) is not first
+    assert first.closed
+
+def test_prewarm_warms_once_per_job(monkeypatch):
+    monkeypatch.setenv("USE_BACKEND_ROUTER", "true")
+    client = BackendClient()
+    warms = []
+
+    async def warm():
+        warms.append(1)
+        await client._get_session()
+        client._warmed = True
+    monkeypatch.setattr(client, "warm", warm)
+
+    async def job():
+        client.prewarm()
+        client.prewarm()  # still warming
+        await client._warm_task
+        client.prewarm()  # warm
+        await client.close()
+
+    asyncio.run(job())
+    assert len(warms) == 1
+
+    asyncio.run(job())
+    assert len(warms) == 2
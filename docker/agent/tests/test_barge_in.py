@@ -0,0 +1,101 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import aimee_agent
+
+class SlowBackend:
+    """Backend stand-in whose reply takes a while to arrive"""
+
+    def __init__(self):
+        self.abandoned = []
+
+    async def reply(self):
+        await asyncio.sleep(0.3)
+        return SimpleNamespace(agent="Historian", text="Built in 1870.")
+
+    async def abandon_turn(self, turn_id):
+        self.abandoned.append(turn_id)
+        return True
+
+class FakeSession:
+    def __init__(self, min_duration=0.1, min_words=0):
+        self.options = SimpleNamespace(interruption={"min_duration": min_duration, "min_words": min_words})
+
+@pytest.fixture
+def backend():
+    return SlowBackend()
+
+def _agent(monkeypatch, backend, session):
+    monkeypatch.setattr(aimee_agent, "get_aimee_instructions", lambda: "Be brief.")
+    monkeypatch.setattr(aimee_agent, "get_prompt_version", lambda: "v1")
+    monkeypatch.setattr(aimee_agent.AImeeAgent, "session", property(lambda self: session))
+    return aimee_agent.AImeeAgent(use_backend_router=True, backend=backend)
+
+def _state(agent, old, new):
+    agent._on_user_state_changed(SimpleNamespace(old_state=old, new_state=new))
+
+def _transcript(agent, text, final):
+    agent._on_user_input_transcribed(SimpleNamespace(transcript=text, is_final=final))
+
+def _fetch_while(agent, backend, user):
+    async def scenario():
+        fetch = asyncio.create_task(agent._fetch_reply("turn-1", backend.reply()))
+        await asyncio.sleep(0)
+        await user()
+        return await fetch
+
+    return asyncio.run(scenario())
+
+def test_short_noise_keeps_the_pending_reply(monkeypatch, backend):
+    agent = _agent(monkeypatch, backend, FakeSession(min_duration=0.1))
+
+    async def cough():
+        _state(agent, "listening", "speaking")
+        await asyncio.sleep(0.05)
+        _state(agent, "speaking", "listening")
+
+    assert _fetch_while(agent, backend, cough).text == "Built in 1870."
+    assert backend.abandoned == []
+
+def test_speech_past_the_interruption_duration_cancels(monkeypatch, backend):
+    agent = _agent(monkeypatch, backend, FakeSession(min_duration=0.1))
+
+    async def interrupt():
+        _state(agent, "listening", "speaking")
+        await asyncio.sleep(0.15)
+
+    assert _fetch_while(agent, backend, interrupt) is None
+    assert backend.abandoned == ["turn-1"]
+
+def test_final_transcript_cancels_short_speech(monkeypatch, backend):
+    agent = _agent(monkeypatch, backend, FakeSession(min_duration=0.1))
+
+    async def new_question():
+        _state(agent, "listening", "speaking")
+        await asyncio.sleep(0.05)
+        _state(agent, "speaking", "listening")
+        _transcript(agent, "Stop", final=True)
+
+    assert _fetch_while(agent, backend, new_question) is None
+    assert agent.cancellations["cancelled_before_playback"] == 1
+
+def test_interim_words_must_reach_the_minimum(monkeypatch, backend):
+    agent = _agent(monkeypatch, backend, FakeSession(min_duration=0.0, min_words=3))
+
+    async def backchannel():
+        _state(agent, "listening", "speaking")
+        _transcript(agent, "uh huh", final=False)
+        await asyncio.sleep(0.05)
+        _state(agent, "speaking", "listening")
+
+    assert _fetch_while(agent, backend, backchannel).text == "Built in 1870."
+
+    agent = _agent(monkeypatch, backend, FakeSession(min_duration=0.0, min_words=3))
+
+    async def question():
+        _state(agent, "listening", "speaking")
+        _transcript(agent, "wait what was", final=False)
+
+    assert _fetch_while(agent, backend, question) is None
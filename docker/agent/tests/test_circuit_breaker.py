@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+import backend_client
+import circuit_breaker
+from backend_client import BackendClient, BackendResponse
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, "time", clock.time)
+    return clock
+
+@pytest.fixture
+def breaker(clock, monkeypatch):
+    monkeypatch.setenv("TEST_CIRCUIT_FAILURE_THRESHOLD", "3")
+    monkeypatch.setenv("TEST_CIRCUIT_MIN_REQUESTS", "5")
+    monkeypatch.setenv("TEST_CIRCUIT_ERROR_RATE", "0.5")
+    monkeypatch.setenv("TEST_CIRCUIT_OPEN_SECONDS", "30")
+    monkeypatch.setenv("TEST_CIRCUIT_HALF_OPEN_PROBES", "1")
+    return CircuitBreaker("test", env_prefix="TEST_CIRCUIT", p95_seconds=1.0)
+
+def _record(breaker, success, latency=0.1):
+    assert breaker.allow_request()
+    breaker.record(success, latency)
+
+def _open_then_cool_down(breaker, clock):
+    for _ in range(3):
+        _record(breaker, False)
+    clock.now += breaker.open_seconds
+
+def test_consecutive_failures_open_the_circuit(breaker):
+    _record(breaker, False)
+    _record(breaker, False)
+    assert breaker.state == CLOSED
+
+    _record(breaker, False)
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    assert breaker.stats["rejected"] == 1
+
+def test_success_resets_the_consecutive_failure_count(breaker):
+    breaker.min_requests = 10
+    for success in (False, False, True, False, False):
+        _record(breaker, success)
+    assert breaker.state == CLOSED
+
+def test_error_rate_opens_the_circuit(breaker):
+    # Never three failures in a row, but 3 of 6 failed
+    for success in (True, False, True, False, True, False):
+        _record(breaker, success)
+    assert breaker.state == OPEN
+
+def test_p95_latency_opens_the_circuit(breaker):
+    for _ in range(4):
+        _record(breaker, True, latency=2.0)
+    assert breaker.state == CLOSED
+
+    _record(breaker, True, latency=2.0)
+    assert breaker.state == OPEN
+    assert breaker.p95_latency() == 2.0
+
+def test_old_requests_leave_the_window(breaker, clock):
+    for _ in range(4):
+        _record(breaker, True, latency=2.0)
+    clock.now += breaker.window_seconds + 1
+
+    _record(breaker, True, latency=2.0)
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["window_requests"] == 1
+
+def test_half_open_allows_a_limited_number_of_probes(breaker, clock):
+    _open_then_cool_down(breaker, clock)
+
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow_request()
+
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+    assert breaker.allow_request()
+
+def test_failed_or_slow_probe_reopens_the_circuit(breaker, clock):
+    _open_then_cool_down(breaker, clock)
+    _record(breaker, True, latency=2.0)
+    assert breaker.state == OPEN
+
+    clock.now += breaker.open_seconds
+    _record(breaker, False)
+    assert breaker.state == OPEN
+
+def test_release_frees_the_probe_without_an_outcome(breaker, clock):
+    _open_then_cool_down(breaker, clock)
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.release()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+
+def test_release_while_closed_records_nothing(breaker):
+    assert breaker.allow_request()
+    breaker.release()
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["window_requests"] == 0
+
+def test_backend_p95_threshold_sits_below_the_turn_budget(monkeypatch):
+    monkeypatch.setenv("BACKEND_TURN_BUDGET_MS", "6000")
+    client = BackendClient()
+    assert client.breaker.p95_threshold < client.turn_budget
+
+def test_slow_arrivals_leave_chat_turns_allowed(monkeypatch):
+    monkeypatch.setenv("USE_BACKEND_ROUTER", "true")
+    monkeypatch.setenv("BACKEND_TURN_BUDGET_MS", "6000")
+    monkeypatch.setenv("BACKEND_TIMEOUT", "10")
+    client = BackendClient()
+
+    # Every arrival takes 7s - well inside its budget, over the chat p95 trip
+    ticks = iter(float(t) for t in range(0, 1000, 7))
+    monkeypatch.setattr(backend_client.time, "perf_counter", lambda: next(ticks))
+
+    async def arrival_request(*args):
+        return BackendResponse(success=True, agent="Historian", response="Built in 1870.", metadata={})
+    monkeypatch.setattr(client, "_arrival_request", arrival_request)
+
+    async def scenario():
+        for _ in range(10):
+            response = await client.arrival("user-1", "marker-1", "Old Mill", {"lat": 0.0, "lng": 0.0})
+            assert response.success
+
+    asyncio.run(scenario())
+    assert client.arrival_breaker.state == CLOSED
+    assert client.breaker.snapshot()["window_requests"] == 0
+    assert client.breaker.allow_request()
+
+def test_arrival_breaker_is_tuned_separately(monkeypatch):
+    monkeypatch.setenv("CIRCUIT_OPEN_SECONDS", "30")
+    monkeypatch.setenv("CIRCUIT_ARRIVAL_OPEN_SECONDS", "90")
+    client = BackendClient()
+
+    assert client.breaker.open_seconds == 30
+    assert client.arrival_breaker.open_seconds == 90
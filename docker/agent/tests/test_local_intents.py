@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from livekit.agents import llm
+
+import aimee_agent
+from backend_client import BackendResponse
+
+class FakeHandle:
+    """Played-out SpeechHandle stand-in"""
+
+    def __init__(self, text=None):
+        self.interrupted = False
+        self.chat_items = [llm.ChatMessage(role="assistant", content=[text])] if text else []
+
+    def __await__(self):
+        yield from asyncio.sleep(0).__await__()
+        return self
+
+class FakeSession:
+    tts = None
+
+    def __init__(self, generated):
+        self.generated = generated
+        self.spoken = []
+
+    def generate_reply(self, **kwargs):
+        text = self.generated.pop(0)
+        self.spoken.append(text)
+        return FakeHandle(text)
+
+    def say(self, text, **kwargs):
+        self.spoken.append(text)
+        return FakeHandle()
+
+class FailingBackend:
+    streaming = False
+    enabled = True
+
+    async def chat(self, **kwargs):
+        return BackendResponse(success=False, agent="error", response="", metadata={}, error="Backend unavailable")
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setattr(aimee_agent, "get_aimee_instructions", lambda: "Be brief.")
+    monkeypatch.setattr(aimee_agent, "get_prompt_version", lambda: "v1")
+    return aimee_agent.AImeeAgent(use_backend_router=True, backend=FailingBackend())
+
+def _turn(agent, text):
+    async def scenario():
+        try:
+            await agent.on_user_turn_completed(llm.ChatContext(), llm.ChatMessage(role="user", content=[text]))
+        except aimee_agent.StopResponse:
+            pass
+
+    asyncio.run(scenario())
+
+def test_repeat_after_fallback_replays_the_fallback_reply(agent, monkeypatch):
+    session = FakeSession(["The mill was built in 1870."])
+    monkeypatch.setattr(aimee_agent.AImeeAgent, "session", property(lambda self: session))
+    agent.last_reply.text = "An older reply."
+
+    _turn(agent, "When was the mill built?")
+    _turn(agent, "Repeat that")
+
+    assert session.spoken == ["The mill was built in 1870.", "The mill was built in 1870."]
+
+def test_silent_fallback_forgets_the_older_reply(agent, monkeypatch):
+    session = FakeSession([None])
+    monkeypatch.setattr(aimee_agent.AImeeAgent, "session", property(lambda self: session))
+    agent.last_reply.text = "An older reply."
+
+    _turn(agent, "When was the mill built?")
+
+    assert agent.last_reply.text is None
@@ -0,0 +1,61 @@
+import asyncio
+
+from backend_client import BackendResponse
+from marker_prefetch import ArrivalPrefetcher, LocationFix, Marker
+
+MARKER = Marker(id="m1", name="Lighthouse", lat=1.0, lng=2.0)
+
+class FakeBackend:
+    """Backend client stand-in answering arrivals after a delay"""
+
+    def __init__(self, delay: float = 0, failures: int = 0):
+        self.delay = delay
+        self.failures = failures
+        self.calls = 0
+
+    async def arrival(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise RuntimeError("connection reset")
+        return BackendResponse(success=True, agent="Historian", response=f"Narrative {self.calls}", metadata={})
+
+def test_prefetched_narrative_is_served():
+    prefetcher = ArrivalPrefetcher(backend=FakeBackend())
+
+    async def scenario():
+        prefetcher._prefetch(MARKER, "drive")
+        return await prefetcher.narrative_for(MARKER)
+
+    assert asyncio.run(scenario()) == "Narrative 1"
+    assert prefetcher.stats["prefetch_hits"] == 1
+
+def test_cancelled_prefetch_falls_back_to_a_live_fetch():
+    backend = FakeBackend(delay=0.05)
+    prefetcher = ArrivalPrefetcher(backend=backend)
+
+    async def scenario():
+        task = prefetcher._prefetch(MARKER, "drive")
+        asyncio.get_running_loop().call_later(0.01, task.cancel)
+        return await prefetcher.narrative_for(MARKER)
+
+    assert asyncio.run(scenario()) == "Narrative 2"
+    assert prefetcher.stats["live_fetches"] == 1
+
+def test_failed_prefetch_falls_back_to_a_live_fetch():
+    prefetcher = ArrivalPrefetcher(backend=FakeBackend(failures=1))
+
+    async def scenario():
+        prefetcher._prefetch(MARKER, "drive")
+        return await prefetcher.narrative_for(MARKER)
+
+    assert asyncio.run(scenario()) == "Narrative 2"
+
+def test_leaving_takes_a_wider_radius_than_arriving():
+    prefetcher = ArrivalPrefetcher(backend=FakeBackend())
+    prefetcher.set_markers([MARKER])
+
+    # ~0.0007 degrees of latitude is ~78m - outside the 50m radius, inside twice it
+    assert not prefetcher.has_left("m1", LocationFix(lat=1.0007, lng=2.0))
+    assert prefetcher.has_left("m1", LocationFix(lat=1.002, lng=2.0))
+    assert prefetcher.has_left("unknown", LocationFix(lat=1.0, lng=2.0))
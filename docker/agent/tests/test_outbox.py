@@ -0,0 +1,183 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import outbox as outbox_module
+from outbox import Outbox, OutboxEvent
+
+class FakeBackend:
+    """Backend client stand-in that records batches and answers with fixed statuses"""
+
+    def __init__(self, statuses=None):
+        self.enabled = True
+        self.batches = []
+        self.statuses = statuses or {}
+
+    async def send_batch(self, events, timeout=None):
+        self.batches.append(events)
+        return [{"id": e["id"], "status": self.statuses.get(e["op"], 200)} for e in events]
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = FakeBackend()
+    monkeypatch.setattr(outbox_module, "backend_client", backend)
+    return backend
+
+@pytest.fixture
+def make_outbox(monkeypatch, tmp_path):
+    monkeypatch.setenv("OUTBOX_DIR", str(tmp_path))
+    # Events wait for an explicit flush()
+    monkeypatch.setenv("OUTBOX_FLUSH_DELAY_MS", "60000")
+    return Outbox
+
+LOCK_HOLDER = """
+import fcntl, sys, time
+f = open(sys.argv[1], "a")
+fcntl.lockf(f, fcntl.LOCK_EX)
+print("locked", flush=True)
+time.sleep(30)
+"""
+
+def test_session_messages_coalesce_per_session(backend, make_outbox):
+    async def scenario():
+        box = make_outbox()
+        box.enqueue("session.messages", {"sessionId": "s1", "messages": [{"role": "user", "content": "a"}]})
+        box.enqueue("session.messages", {"sessionId": "s2", "messages": [{"role": "user", "content": "b"}]})
+        box.enqueue("session.messages", {"sessionId": "s1", "messages": [{"role": "assistant", "content": "c"}]})
+        assert await box.flush(timeout=1)
+        await box.close()
+        return box
+
+    box = asyncio.run(scenario())
+    events = backend.batches[0]
+    assert [e["body"]["sessionId"] for e in events] == ["s1", "s2"]
+    assert [m["content"] for m in events[0]["body"]["messages"]] == ["a", "c"]
+    assert box.stats["coalesced"] == 1
+
+def test_coalesce_key_replaces_queued_event(backend, make_outbox):
+    async def scenario():
+        box = make_outbox()
+        box.enqueue("chat", {"input": "first"}, coalesce_key="clear-trip:user")
+        box.enqueue("session.start", {"sessionId": "s1"})
+        box.enqueue("chat", {"input": "second"}, coalesce_key="clear-trip:user")
+        assert await box.flush(timeout=1)
+        await box.close()
+
+    asyncio.run(scenario())
+    assert [(e["op"], e["body"]) for e in backend.batches[0]] == [
+        ("session.start", {"sessionId": "s1"}),
+        ("chat", {"input": "second"}),
+    ]
+
+def test_server_errors_retry_and_client_errors_drop(backend, make_outbox):
+    backend.statuses = {"chat": 503, "session.end": 400}
+
+    async def scenario():
+        box = make_outbox()
+        box.enqueue("chat", {"input": "x"})
+        box.enqueue("session.end", {"sessionId": "s1"})
+        assert not await box._send_batch()
+        return box
+
+    box = asyncio.run(scenario())
+    assert [e.op for e in box._queued] == ["chat"]
+    assert box._queued[0].attempts == 1
+    assert box.stats["dropped"] == 1
+
+def test_recovers_journal_of_dead_process(backend, make_outbox, tmp_path):
+    dead = tmp_path / "outbox-4000000.jsonl"
+    older = OutboxEvent(id="a", op="session.start", body={"sessionId": "s1"}, created=1.0)
+    newer = OutboxEvent(id="b", op="session.messages", body={"sessionId": "s1", "messages": []}, created=2.0)
+    superseded = {**older.__dict__, "body": {"sessionId": "stale"}}
+    with open(dead, "w", encoding="utf-8") as f:
+        f.write(json.dumps(superseded) + "\n")
+        f.write(json.dumps(newer.__dict__) + "\n")
+        f.write(json.dumps(older.__dict__) + "\n")
+        f.write('{"id": "torn"')  # crashed mid-write
+
+    async def scenario():
+        box = make_outbox()
+        box.max_age = float("inf")
+        box.start()
+        assert await box.flush(timeout=1)
+        assert box.stats["recovered"] == 2
+        await box.close()
+
+    asyncio.run(scenario())
+    assert not dead.exists()
+    assert [(e["id"], e["body"]["sessionId"]) for e in backend.batches[0]] == [("a", "s1"), ("b", "s1")]
+
+def test_recovers_stale_journal_whose_pid_was_reused(backend, make_outbox, tmp_path):
+    # After a container restart the old worker's pid belongs to an unrelated live process
+    stale = tmp_path / f"outbox-{os.getppid()}.jsonl"
+    stale.write_text(json.dumps(OutboxEvent(id="a", op="chat", body={}, created=time.time()).__dict__) + "\n")
+
+    async def scenario():
+        box = make_outbox()
+        box.start()
+        assert await box.flush(timeout=1)
+        await box.close()
+        return box
+
+    box = asyncio.run(scenario())
+    assert not stale.exists()
+    assert box.stats["recovered"] == 1
+    assert [e["id"] for e in backend.batches[0]] == ["a"]
+
+def test_leaves_journal_of_live_process(backend, make_outbox, tmp_path):
+    live = tmp_path / "outbox-4000001.jsonl"
+    live.write_text(json.dumps(OutboxEvent(id="a", op="chat", body={}, created=1.0).__dict__) + "\n")
+    holder = subprocess.Popen([sys.executable, "-c", LOCK_HOLDER, str(live.with_suffix(".lock"))],
+                              stdout=subprocess.PIPE, text=True)
+    try:
+        assert holder.stdout.readline().strip() == "locked"
+
+        async def scenario():
+            box = make_outbox()
+            box.start()
+            await box.close()
+            return box
+
+        box = asyncio.run(scenario())
+    finally:
+        holder.kill()
+        holder.wait()
+    assert live.exists()
+    assert box.stats["recovered"] == 0
+
+def test_unsent_events_survive_restart(backend, make_outbox):
+    async def first_worker():
+        box = make_outbox()
+        box.enqueue("session.start", {"sessionId": "s1"})
+        box.enqueue("session.end", {"sessionId": "s1"})
+        # Process dies without draining the queue
+        box._task.cancel()
+
+    async def second_worker():
+        box = make_outbox()
+        box.start()
+        assert await box.flush(timeout=1)
+        await box.close()
+
+    asyncio.run(first_worker())
+    asyncio.run(second_worker())
+    assert [e["op"] for e in backend.batches[0]] == ["session.start", "session.end"]
+
+def test_disabled_outbox_holds_unbatched_sends_until_done(backend, make_outbox, monkeypatch):
+    monkeypatch.setenv("OUTBOX_ENABLED", "false")
+
+    async def scenario():
+        box = make_outbox()
+        box.enqueue("session.start", {"sessionId": "s1"})
+        assert len(box._unbatched) == 1
+        await asyncio.wait(set(box._unbatched))
+        await asyncio.sleep(0)  # done callbacks run on the next tick
+        assert box._unbatched == set()
+
+    asyncio.run(scenario())
+    assert [e["op"] for e in backend.batches[0]] == ["session.start"]
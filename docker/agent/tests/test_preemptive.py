@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+
+from preemptive import PreemptiveRequester
+
+class FakeStream:
+    def __init__(self, success=True):
+        self.success = success
+        self.complete = False
+        self.closed = False
+
+    async def aclose(self):
+        self.closed = True
+
+class FakeBackend:
+    """Backend client stand-in whose chat stream is ready after a delay"""
+
+    def __init__(self, delay=0.0, success=True):
+        self.delay = delay
+        self.success = success
+        self.requests = []
+        self.cancelled = []
+        self.abandoned = []
+
+    async def chat_stream(self, user_id, user_input, context=None, turn_id=None):
+        self.requests.append((user_input, turn_id))
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(turn_id)
+            raise
+        return FakeStream(self.success)
+
+    async def abandon_turn(self, turn_id):
+        self.abandoned.append(turn_id)
+        return True
+
+@pytest.fixture(autouse=True)
+def fast_stability(monkeypatch):
+    monkeypatch.setenv("PREEMPTIVE_STABLE_MS", "20")
+    monkeypatch.setenv("PREEMPTIVE_MIN_WORDS", "3")
+
+async def _settle():
+    await asyncio.sleep(0.05)
+
+def test_launches_only_on_a_stable_transcript_with_enough_words():
+    backend = FakeBackend()
+
+    async def scenario():
+        requester = PreemptiveRequester(backend=backend)
+        requester.on_interim("what is")
+        await _settle()
+        assert backend.requests == []
+
+        requester.on_interim("what is that")
+        await asyncio.sleep(0.005)
+        requester.on_interim("what is that tower")
+        await _settle()
+        requester.close()
+
+    asyncio.run(scenario())
+    assert [text for text, _ in backend.requests] == ["what is that tower"]
+
+def test_claim_that_misses_cancels_and_abandons_the_request():
+    backend = FakeBackend(delay=5)
+
+    async def scenario():
+        requester = PreemptiveRequester(backend=backend)
+        requester.on_interim("what is that tower")
+        await _settle()
+        assert requester.claim("where is the nearest gas station") is None
+        await _settle()
+        return requester
+
+    requester = asyncio.run(scenario())
+    turn_id = backend.requests[0][1]
+    assert backend.cancelled == [turn_id]
+    assert backend.abandoned == [turn_id]
+    assert requester.stats["misses"] == 1
+    assert requester.hit_rate() == 0.0
+
+def test_failed_speculative_stream_counts_as_a_miss():
+    backend = FakeBackend(success=False)
+
+    async def scenario():
+        requester = PreemptiveRequester(backend=backend)
+        requester.on_interim("what is that tower")
+        await _settle()
+        assert requester.claim("What is that tower?") == backend.requests[0][1]
+        return requester, await requester.take()
+
+    requester, stream = asyncio.run(scenario())
+    assert stream is None
+    assert requester.stats["misses"] == 1
+    assert requester.stats["hits"] == 0
+
+def test_hit_records_the_time_saved():
+    backend = FakeBackend(delay=0.03)
+
+    async def scenario():
+        requester = PreemptiveRequester(backend=backend)
+        requester.on_interim("what is that tower")
+        await asyncio.sleep(0.1)
+        requester.claim("what is that tower")
+        return requester, await requester.take()
+
+    requester, stream = asyncio.run(scenario())
+    assert stream.success
+    assert requester.stats["hits"] == 1
+    assert requester.hit_rate() == 1.0
+    # Saved from launch until the stream was ready, not until the final transcript
+    assert 25 <= requester.stats["ms_saved"] < 100
+
+def test_close_while_claimed_cancels_and_abandons_the_turn():
+    backend = FakeBackend(delay=5)
+
+    async def scenario():
+        requester = PreemptiveRequester(backend=backend)
+        requester.on_interim("what is that tower")
+        await _settle()
+        turn_id = requester.claim("what is that tower")
+        requester.close()
+        await _settle()
+        return turn_id
+
+    turn_id = asyncio.run(scenario())
+    assert backend.cancelled == [turn_id]
+    assert backend.abandoned == [turn_id]
+
+def test_abandon_notice_is_held_until_sent():
+    backend = FakeBackend(delay=5)
+
+    async def scenario():
+        requester = PreemptiveRequester(backend=backend)
+        requester.on_interim("what is that tower")
+        await _settle()
+        requester.claim("where is the nearest gas station")
+        assert len(requester._background) == 1
+        await _settle()
+        assert requester._background == set()
+
+    asyncio.run(scenario())
+    assert len(backend.abandoned) == 1
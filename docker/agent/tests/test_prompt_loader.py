@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from prompt_loader import PromptRegistry
+
+@pytest.fixture
+def prompts(tmp_path):
+    (tmp_path / "aimee_system_prompt.md").write_text("You are AImee.", encoding="utf-8")
+    registry = PromptRegistry(tmp_path)
+    registry.load_all()
+    return tmp_path, registry
+
+def _write(path, content, mtime):
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+def _touch(path, mtime):
+    os.utime(path, (mtime, mtime))
+
+def test_unchanged_mtime_skips_the_file(prompts, monkeypatch):
+    base, registry = prompts
+    monkeypatch.setattr(registry, "_read", lambda filename: pytest.fail(f"re-read {filename}"))
+
+    assert registry.refresh() is False
+
+def test_touched_file_with_identical_content_keeps_the_version(prompts):
+    base, registry = prompts
+    version = registry.version
+    _touch(base / "aimee_system_prompt.md", 2_000_000_000)
+
+    assert registry.refresh() is False
+    assert registry.version == version
+    assert registry._prompts["aimee_system_prompt.md"].mtime == 2_000_000_000
+
+def test_changed_content_is_swapped_in_and_bumps_the_version(prompts):
+    base, registry = prompts
+    version = registry.version
+    _write(base / "aimee_system_prompt.md", "You are AImee, a road trip guide.", 2_000_000_000)
+
+    assert registry.refresh() is True
+    assert registry.get("aimee_system_prompt.md") == "You are AImee, a road trip guide."
+    assert registry.version != version
+
+def test_broken_file_keeps_the_last_good_copy(prompts):
+    base, registry = prompts
+    version = registry.version
+    _write(base / "aimee_system_prompt.md", "   ", 2_000_000_000)
+
+    assert registry.refresh() is False
+    assert registry.get("aimee_system_prompt.md") == "You are AImee."
+    assert registry.version == version
+
+def test_prompt_loaded_during_refresh_is_kept(prompts):
+    base, registry = prompts
+    # Outside the watched glob, so only get() ever loads it
+    (base / "agents").mkdir()
+    (base / "agents" / "historian.md").write_text("You are the Historian.", encoding="utf-8")
+    _write(base / "aimee_system_prompt.md", "You are AImee, a road trip guide.", 2_000_000_000)
+
+    # get() lazily loading another prompt while refresh() is reading files
+    read = registry._read
+    def read_and_get(filename):
+        if filename == "aimee_system_prompt.md":
+            registry.get("agents/historian.md")
+        return read(filename)
+    registry._read = read_and_get
+
+    assert registry.refresh() is True
+    assert "agents/historian.md" in registry._prompts
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from response_cache import ResponseCache, is_shareable
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setenv("RESPONSE_CACHE_PATH", "")
+    return ResponseCache()
+
+def _put(cache, agent="Historian", route_id="r1", marker_id="m1", question="How old is this building?",
+         user="room", metadata=None):
+    asyncio.run(cache.put(question, user, route_id, marker_id, "drive", "About a hundred years.", agent, metadata))
+
+def _get(cache, route_id="r1", marker_id="m1", question="how old is this building", user="room"):
+    return asyncio.run(cache.get(question, user, route_id, marker_id, "drive"))
+
+def test_hit_for_same_question_at_same_marker(cache):
+    _put(cache)
+    assert _get(cache).response == "About a hundred years."
+
+def test_route_is_part_of_the_key(cache):
+    _put(cache, route_id="r1")
+    assert _get(cache, route_id="r2") is None
+
+def test_no_caching_before_first_marker(cache):
+    _put(cache, marker_id=None)
+    assert cache.stats["stores"] == 0
+    assert _get(cache, marker_id=None) is None
+
+@pytest.mark.parametrize("agent", ["Navigator", "Memory"])
+def test_location_and_memory_agents_are_not_cached(cache, agent):
+    _put(cache, agent=agent)
+    assert cache.stats["stores"] == 0
+
+def test_replies_are_kept_per_user_by_default(cache):
+    _put(cache)
+    assert _get(cache, user="other-room") is None
+
+def test_replies_marked_not_personalized_are_shared(cache):
+    _put(cache, metadata={"personalized": False})
+    assert _get(cache, user="other-room").response == "About a hundred years."
+
+def test_personal_questions_are_never_shared(cache):
+    _put(cache, question="How far have we driven?", metadata={"personalized": False})
+    assert _get(cache, question="how far have we driven", user="other-room") is None
+    assert _get(cache, question="how far have we driven") is not None
+
+def test_error_fallbacks_are_not_cached(cache):
+    _put(cache, metadata={"error": "LLM timeout", "personalized": True})
+    assert cache.stats["stores"] == 0
+
+def test_replies_without_the_flag_are_not_shareable():
+    assert not is_shareable({})
+    assert not is_shareable({"agent": "Historian"})
@@ -0,0 +1,53 @@
+import asyncio
+import json
+
+import pytest
+
+import route_pack
+from marker_prefetch import ArrivalPrefetcher
+
+@pytest.fixture
+def pack_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(route_pack, "ROUTE_PACK_DIR", tmp_path)
+    return tmp_path
+
+def _write_pack(path, route_id="coast"):
+    index = json.dumps({
+        "routeId": route_id,
+        "markers": [{
+            "marker": {"id": "m1", "name": "Lighthouse", "lat": 1.0, "lng": 2.0},
+            "narrative": "The lighthouse was built in 1870.",
+            "agent": "Historian",
+        }],
+    }).encode("utf-8")
+    path.write_bytes(route_pack._HEADER.pack(route_pack._MAGIC, len(index)) + index)
+
+def test_loads_pack_by_route_id(pack_dir):
+    _write_pack(pack_dir / "coast.pack")
+    pack = route_pack.RoutePack.for_route("coast")
+    assert pack.get("m1").narrative == "The lighthouse was built in 1870."
+    pack.close()
+
+@pytest.mark.parametrize("route_id", ["../coast", "/tmp/coast", "coast/../../etc", ""])
+def test_rejects_route_ids_that_are_not_file_names(pack_dir, route_id):
+    _write_pack(pack_dir / "coast.pack")
+    assert route_pack.RoutePack.for_route(route_id) is None
+
+def test_prefetcher_loads_route_off_the_event_loop(pack_dir):
+    _write_pack(pack_dir / "coast.pack")
+    prefetcher = ArrivalPrefetcher()
+    assert asyncio.run(prefetcher.load_route("coast")) is True
+    assert prefetcher.packed("m1").marker.name == "Lighthouse"
+    prefetcher.close()
+
+def test_prefetcher_keeps_only_the_latest_route(pack_dir):
+    _write_pack(pack_dir / "coast.pack")
+    _write_pack(pack_dir / "hills.pack", route_id="hills")
+    prefetcher = ArrivalPrefetcher()
+
+    async def announce_twice():
+        return await asyncio.gather(prefetcher.load_route("coast"), prefetcher.load_route("hills"))
+
+    assert asyncio.run(announce_twice()) == [False, True]
+    assert prefetcher.route_pack.route_id == "hills"
+    prefetcher.close()
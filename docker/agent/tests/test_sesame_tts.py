@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from livekit.agents import APIConnectOptions
+from livekit.agents import tts as agents_tts
+
+import sesame_tts
+from circuit_breaker import HALF_OPEN, OPEN
+from sesame_tts import SesamePool, SesameTTS
+from tts_cache import TTSCache
+
+SESAME_PCM = b"\x01\x00" * 480
+FALLBACK_PCM = b"\x02\x00" * 480
+NO_RETRY = APIConnectOptions(max_retry=0, timeout=5)
+
+class StubSesame:
+    """Sesame /inference/stream stand-in: answers with a status, a delay or PCM frames"""
+
+    def __init__(self):
+        self.status = 200
+        self.delay = 0.0
+        self.requests = 0
+
+    async def stream(self, request):
+        self.requests += 1
+        if self.status != 200:
+            return web.Response(status=self.status)
+        await asyncio.sleep(self.delay)
+
+        response = web.StreamResponse()
+        await response.prepare(request)
+        await response.write(sesame_tts._STREAM_HEADER.pack(sesame_tts._MAGIC, 24000, 1, 16))
+        await response.write(sesame_tts._FRAME_HEADER.pack(sesame_tts._AUDIO, len(SESAME_PCM)) + SESAME_PCM)
+        await response.write(sesame_tts._FRAME_HEADER.pack(sesame_tts._END, 0))
+        await response.write_eof()
+        return response
+
+class StubFallbackStream(agents_tts.ChunkedStream):
+    async def _run(self, output_emitter: agents_tts.AudioEmitter):
+        output_emitter.initialize(request_id="fallback", sample_rate=24000, num_channels=1, mime_type="audio/pcm")
+        output_emitter.push(FALLBACK_PCM)
+
+class StubFallback(agents_tts.TTS):
+    def __init__(self):
+        super().__init__(capabilities=agents_tts.TTSCapabilities(streaming=False), sample_rate=24000, num_channels=1)
+        self.utterances = 0
+
+    @property
+    def model(self) -> str:
+        return "tts-1"
+
+    def synthesize(self, text, *, conn_options=NO_RETRY):
+        self.utterances += 1
+        return StubFallbackStream(tts=self, input_text=text, conn_options=NO_RETRY)
+
+@pytest.fixture
+def sesame():
+    return StubSesame()
+
+def _run(sesame, scenario, **env):
+    """Run scenario(tts, pool) against a stub Sesame server on a free port"""
+
+    async def main():
+        app = web.Application()
+        app.router.add_post("/inference/stream", sesame.stream)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        pool = SesamePool()
+        pool.url = f"http://127.0.0.1:{port}"
+        pool.first_audio_deadline = 0.2
+        tts = SesameTTS(pool, StubFallback())
+        try:
+            return await scenario(tts, pool)
+        finally:
+            await pool.aclose()
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+async def _speak(tts, text="Welcome aboard"):
+    async with tts.synthesize(text, conn_options=NO_RETRY) as stream:
+        pcm = b"".join([bytes(event.frame.data) async for event in stream])
+    return pcm, stream
+
+def test_sesame_audio_is_played_when_it_arrives_in_time(sesame):
+    async def scenario(tts, pool):
+        pcm, stream = await _speak(tts)
+        assert pcm == SESAME_PCM
+        assert stream.provider_model == "sesame-0"
+        assert pool.stats["sesame"] == 1
+        assert tts.fallback.utterances == 0
+
+    _run(sesame, scenario)
+
+def test_missed_first_audio_deadline_fails_over(sesame):
+    sesame.delay = 1.0
+
+    async def scenario(tts, pool):
+        pcm, stream = await _speak(tts)
+        assert pcm == FALLBACK_PCM
+        assert stream.provider_model == "tts-1"
+        assert pool.stats["failover_deadline"] == 1
+        assert pool.tracker.snapshot()["window_requests"] == 1
+
+    _run(sesame, scenario)
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_overloaded_sesame_fails_over(sesame, status):
+    sesame.status = status
+
+    async def scenario(tts, pool):
+        pcm, stream = await _speak(tts)
+        assert pcm == FALLBACK_PCM
+        assert stream.provider_model == "tts-1"
+        assert pool.stats["failover_overloaded"] == 1
+
+    _run(sesame, scenario)
+
+def test_open_tracker_skips_sesame(sesame):
+    async def scenario(tts, pool):
+        pool.tracker._transition(OPEN, "test")
+        pcm, stream = await _speak(tts)
+        assert pcm == FALLBACK_PCM
+        assert pool.stats["failover_circuit"] == 1
+        assert sesame.requests == 0
+
+    _run(sesame, scenario)
+
+def test_cancelled_utterance_releases_the_probe(sesame):
+    sesame.delay = 1.0
+
+    async def scenario(tts, pool):
+        pool.tracker._transition(HALF_OPEN, "test")
+        speaking = asyncio.create_task(_speak(tts))
+        while sesame.requests == 0:
+            await asyncio.sleep(0.01)
+        speaking.cancel()
+        await asyncio.gather(speaking, return_exceptions=True)
+
+        assert pool.tracker.state == HALF_OPEN
+        assert pool.tracker.allow_request()
+
+    _run(sesame, scenario)
+
+def test_failed_over_audio_is_not_cached_under_the_sesame_key(sesame, tmp_path, monkeypatch):
+    monkeypatch.setenv("TTS_CACHE_DIR", str(tmp_path))
+    cache = TTSCache()
+    sesame.status = 503
+
+    async def scenario(tts, pool):
+        frames = [frame async for frame in cache.synthesize(tts, "Welcome back", "alloy", tts.model)]
+        assert b"".join(bytes(frame.data) for frame in frames) == FALLBACK_PCM
+        assert await cache.get("Welcome back", "alloy", tts.model) is None
+
+        sesame.status = 200
+        frames = [frame async for frame in cache.synthesize(tts, "Welcome back", "alloy", tts.model)]
+        assert (await cache.get("Welcome back", "alloy", tts.model)).pcm == SESAME_PCM
+
+    _run(sesame, scenario)
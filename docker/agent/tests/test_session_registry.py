@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+import session_registry
+from session_registry import MemorySessionRegistry, SessionRecord, SQLiteSessionRegistry
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_registry.time, "time", clock.time)
+    return clock
+
+@pytest.fixture(params=["memory", "sqlite"])
+def registry(request, tmp_path):
+    if request.param == "memory":
+        registry = MemorySessionRegistry(ttl_seconds=300)
+    else:
+        registry = SQLiteSessionRegistry(str(tmp_path / "sessions.db"), ttl_seconds=300)
+    yield registry
+    asyncio.run(registry.close())
+
+def test_get_returns_none_once_the_record_expired(registry, clock):
+    async def scenario():
+        await registry.put("room-1", SessionRecord(started=clock.now, last_seen=clock.now))
+        clock.now += 299
+        fresh = await registry.get("room-1")
+        clock.now += 2
+        return fresh, await registry.get("room-1")
+
+    fresh, expired = asyncio.run(scenario())
+    assert fresh.started == 1000.0
+    assert expired is None
+
+def test_touch_recreates_an_expired_record(registry, clock):
+    async def scenario():
+        await registry.touch("room-1", participant_connected=True)
+        clock.now += 100
+        await registry.touch("room-1", participant_connected=False)
+        kept = await registry.get("room-1")
+
+        clock.now += 400
+        await registry.touch("room-1", participant_connected=True)
+        return kept, await registry.get("room-1")
+
+    kept, recreated = asyncio.run(scenario())
+    assert (kept.started, kept.last_seen, kept.participant_connected) == (1000.0, 1100.0, False)
+    assert (recreated.started, recreated.last_seen, recreated.participant_connected) == (1500.0, 1500.0, True)
+
+def test_memory_registry_evicts_least_recently_written_rooms(clock):
+    registry = MemorySessionRegistry(ttl_seconds=300, max_entries=2)
+
+    async def scenario():
+        for room_name in ("room-1", "room-2"):
+            await registry.touch(room_name, participant_connected=True)
+        await registry.touch("room-1", participant_connected=True)
+        await registry.touch("room-3", participant_connected=True)
+        return [await registry.get(room_name) for room_name in ("room-1", "room-2", "room-3")]
+
+    room_1, room_2, room_3 = asyncio.run(scenario())
+    assert room_1 is not None
+    assert room_2 is None
+    assert room_3 is not None
+
+def test_sqlite_registries_on_one_file_share_records(tmp_path, clock):
+    path = str(tmp_path / "sessions.db")
+    first = SQLiteSessionRegistry(path, ttl_seconds=300)
+    second = SQLiteSessionRegistry(path, ttl_seconds=300)
+
+    async def scenario():
+        await first.touch("room-1", participant_connected=True)
+        seen_by_second = await second.get("room-1")
+        clock.now += 10
+        await second.touch("room-1", participant_connected=False)
+        seen_by_first = await first.get("room-1")
+        await first.close()
+        await second.close()
+        return seen_by_second, seen_by_first
+
+    seen_by_second, seen_by_first = asyncio.run(scenario())
+    assert seen_by_second.participant_connected is True
+    assert (seen_by_first.started, seen_by_first.last_seen, seen_by_first.participant_connected) == (1000.0, 1010.0, False)
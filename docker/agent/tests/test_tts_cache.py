@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tts_cache import CachedAudio, TTSCache
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("TTS_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("TTS_CACHE_DISK_MB", "1")
+    return TTSCache()
+
+def _disk_total(cache) -> int:
+    return sum(p.stat().st_size for p in cache.cache_dir.glob("*/*.pcm"))
+
+def test_concurrent_disk_writes_keep_usage_accurate(cache):
+    audio = CachedAudio(pcm=b"\0" * 20000, sample_rate=24000, num_channels=1)
+    keys = [cache.make_key(f"utterance {i}", "alloy", "tts-1") for i in range(200)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda key: cache._disk_write(key, audio), keys))
+
+    assert cache._disk_bytes == _disk_total(cache)
+    assert cache._disk_bytes <= cache.max_disk_bytes
+
+def test_rewriting_a_blob_replaces_its_size(cache):
+    key = cache.make_key("Welcome aboard", "alloy", "tts-1")
+    audio = CachedAudio(pcm=b"\0" * 1000, sample_rate=24000, num_channels=1)
+
+    cache._disk_write(key, audio)
+    cache._disk_write(key, audio)
+
+    assert cache._disk_bytes == _disk_total(cache)
+
+def test_processes_writing_the_same_key_use_separate_temp_files(tmp_path, monkeypatch):
+    monkeypatch.setenv("TTS_CACHE_DIR", str(tmp_path))
+    caches = [TTSCache(), TTSCache()]  # separate locks, as in separate job processes
+    key = caches[0].make_key("Welcome aboard", "alloy", "tts-1")
+    audio = CachedAudio(pcm=b"\0" * 20000, sample_rate=24000, num_channels=1)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: caches[i % 2]._disk_write(key, audio), range(100)))
+
+    assert list(tmp_path.glob("*/*.tmp")) == []
+    assert caches[1]._disk_read(key).pcm == audio.pcm
+
+def test_writes_rescan_the_directory_only_every_few_writes(cache, monkeypatch):
+    cache.disk_rescan_writes = 10
+    audio = CachedAudio(pcm=b"\0" * 1000, sample_rate=24000, num_channels=1)
+    scans = []
+    scan = cache._disk_scan
+    monkeypatch.setattr(cache, "_disk_scan", lambda: scans.append(1) or scan())
+
+    for i in range(21):
+        cache._disk_write(cache.make_key(f"utterance {i}", "alloy", "tts-1"), audio)
+
+    assert len(scans) == 3  # first write, then every tenth
+    assert cache._disk_bytes == _disk_total(cache)
+
+def test_byte_cap_counts_other_processes_blobs(cache, tmp_path):
+    cache.disk_rescan_writes = 4
+    other = TTSCache()
+    audio = CachedAudio(pcm=b"\0" * 100000, sample_rate=24000, num_channels=1)
+
+    cache._disk_write(cache.make_key("mine 0", "alloy", "tts-1"), audio)
+    for i in range(8):
+        other._disk_write(other.make_key(f"other {i}", "alloy", "tts-1"), audio)
+    for i in range(1, 8):
+        cache._disk_write(cache.make_key(f"mine {i}", "alloy", "tts-1"), audio)
+
+    assert _disk_total(cache) <= cache.max_disk_bytes
+
+def test_eviction_skips_blobs_another_process_removed(cache):
+    audio = CachedAudio(pcm=b"\0" * 100000, sample_rate=24000, num_channels=1)
+    for i in range(5):
+        cache._disk_write(cache.make_key(f"utterance {i}", "alloy", "tts-1"), audio)
+
+    blobs = cache._disk_scan()
+    blobs[0][0].unlink()  # deleted after our scan, before our eviction
+    cache.max_disk_bytes = 0
+    cache._disk_evict(blobs)
+
+    assert _disk_total(cache) == 0
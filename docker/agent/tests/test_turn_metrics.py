@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import turn_metrics
+
+@pytest.fixture
+def metrics_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    return tmp_path
+
+def _exited_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+def test_sweep_drops_live_gauges_of_exited_processes(metrics_dir):
+    dead = _exited_pid()
+    for filename in (f"gauge_livesum_{dead}.db", f"histogram_{dead}.db", f"gauge_livesum_{os.getpid()}.db"):
+        (metrics_dir / filename).write_bytes(b"")
+
+    assert turn_metrics.sweep_dead_processes() == 1
+    assert sorted(os.listdir(metrics_dir)) == sorted([f"histogram_{dead}.db", f"gauge_livesum_{os.getpid()}.db"])
+
+def test_sweep_leaves_running_processes_alone(metrics_dir):
+    (metrics_dir / f"gauge_livesum_{os.getpid()}.db").write_bytes(b"")
+    assert turn_metrics.sweep_dead_processes() == 0
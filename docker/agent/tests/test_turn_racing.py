@@ -0,0 +1,123 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from livekit.agents import llm
+
+import aimee_agent
+import turn_racing
+from turn_racing import race_first_sentence
+
+class FakeStream:
+    agent = "Historian"
+
+    def __init__(self):
+        self.success = True
+        self.complete = False
+        self.closed = False
+
+    async def aclose(self):
+        self.closed = True
+
+class FakeBackend:
+    """Backend client stand-in whose chat stream starts after a delay"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.cancelled = False
+        self.turn_ids = []
+        self.abandoned = []
+
+    async def chat_stream(self, turn_id=None, **kwargs):
+        self.turn_ids.append(turn_id)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return FakeStream()
+
+    async def abandon_turn(self, turn_id):
+        self.abandoned.append(turn_id)
+        return True
+
+class FakeLLMStream:
+    def __init__(self, text: str):
+        self._chunks = iter([text])
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return SimpleNamespace(delta=SimpleNamespace(content=next(self._chunks)))
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def aclose(self):
+        pass
+
+class FakeLLM:
+    def chat(self, chat_ctx):
+        return FakeLLMStream("Direct answer.")
+
+@pytest.fixture(autouse=True)
+def fast_race(monkeypatch):
+    monkeypatch.setattr(turn_racing, "RACE_HEDGE_DELAY", 0.02)
+    monkeypatch.setattr(turn_racing, "RACE_SLO", 1.0)
+
+def _race(backend, turn_id="turn-1"):
+    return race_first_sentence(FakeLLM(), llm.ChatContext(), "Be brief.", "What is that?", "session-1",
+                               backend=backend, turn_id=turn_id)
+
+def test_fast_backend_wins_with_its_turn_id():
+    backend = FakeBackend(delay=0)
+
+    async def scenario():
+        stream, info = await _race(backend)
+        await asyncio.sleep(0)
+        return stream, info
+
+    stream, info = asyncio.run(scenario())
+    assert info["winner"] == "backend"
+    assert backend.turn_ids == ["turn-1"]
+    assert backend.abandoned == []
+
+def test_losing_backend_request_is_cancelled_and_abandoned():
+    backend = FakeBackend(delay=5)
+
+    async def scenario():
+        stream, info = await _race(backend)
+        await asyncio.sleep(0.01)
+        return stream, info
+
+    stream, info = asyncio.run(scenario())
+    assert info["winner"] == "direct"
+    assert stream.text == "Direct answer."
+    assert backend.cancelled
+    assert backend.abandoned == ["turn-1"]
+
+def test_cancelled_race_cancels_the_backend_request():
+    backend = FakeBackend(delay=5)
+
+    async def scenario():
+        task = asyncio.create_task(_race(backend))
+        await asyncio.sleep(0.005)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert backend.cancelled
+
+def test_race_mode_turns_off_preemptive_requests(monkeypatch):
+    monkeypatch.setattr(aimee_agent, "get_aimee_instructions", lambda: "Be brief.")
+    monkeypatch.setattr(aimee_agent, "get_prompt_version", lambda: "v1")
+    monkeypatch.setattr(aimee_agent, "PREEMPTIVE_MODE", True)
+
+    monkeypatch.setattr(aimee_agent, "RACE_MODE", False)
+    assert aimee_agent.AImeeAgent(use_backend_router=True, backend=FakeBackend(0)).preemptive is not None
+
+    # Race turns open their own backend stream and would leave a speculative one running
+    monkeypatch.setattr(aimee_agent, "RACE_MODE", True)
+    assert aimee_agent.AImeeAgent(use_backend_router=True, backend=FakeBackend(0)).preemptive is None
@@ -0,0 +1,312 @@
+"""
+TTS Audio Cache for AImee LiveKit Agent
+
+Content-addressed cache of synthesized speech, keyed by (text, voice, model).
+Greetings, fallback apologies and arrival narratives for popular markers are
+synthesized over and over; a cache hit plays straight through session.say()
+without calling the TTS provider at all.
+
+Two tiers:
+- A bounded in-memory LRU of decoded PCM, evicted by total size
+- An on-disk store of PCM blobs (with a small header), evicted by total size;
+  the directory is shared by every job process on the node
+
+On a miss, the audio is synthesized once and recorded as it streams to the
+room, so the first playback costs no more than an uncached one.
+"""
+
+import asyncio
+import hashlib
+import os
+import logging
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Dict, AsyncIterator, List, Tuple, Union
+
+from livekit import rtc
+from livekit.agents import tts as agents_tts
+
+# Configure logger
+logger = logging.getLogger("tts-cache")
+
+# On-disk blob header: magic, sample rate, channel count
+_HEADER = struct.Struct("<4sIH")
+_MAGIC = b"AMTC"
+
+# Duration of each frame yielded on playback
+_FRAME_MS = 20
+
+@dataclass
+class CachedAudio:
+    """Synthesized speech stored as 16-bit PCM (bytes, or a view into a mapped route pack)"""
+    pcm: Union[bytes, memoryview]
+    sample_rate: int
+    num_channels: int
+
+    @property
+    def size(self) -> int:
+        return len(self.pcm)
+
+    async def frames(self) -> AsyncIterator[rtc.AudioFrame]:
+        """Yield the audio as fixed-size frames for session.say(audio=...)"""
+        samples_per_frame = self.sample_rate * _FRAME_MS // 1000
+        bytes_per_frame = samples_per_frame * self.num_channels * 2
+
+        for offset in range(0, len(self.pcm), bytes_per_frame):
+            chunk = self.pcm[offset:offset + bytes_per_frame]
+            yield rtc.AudioFrame(
+                data=chunk,
+                sample_rate=self.sample_rate,
+                num_channels=self.num_channels,
+                samples_per_channel=len(chunk) // (2 * self.num_channels),
+            )
+
+class TTSCache:
+    """Two-tier (memory LRU + disk) cache of synthesized utterances"""
+
+    def __init__(self):
+        self.enabled = os.getenv("TTS_CACHE_ENABLED", "true").lower() == "true"
+        self.cache_dir = Path(os.getenv("TTS_CACHE_DIR", "/app/cache/tts"))
+        self.max_memory_bytes = int(float(os.getenv("TTS_CACHE_MEMORY_MB", "64")) * 1024 * 1024)
+        self.max_disk_bytes = int(float(os.getenv("TTS_CACHE_DISK_MB", "512")) * 1024 * 1024)
+
+        self._memory: "OrderedDict[str, CachedAudio]" = OrderedDict()
+        self._memory_bytes = 0
+        # Running usage: our own writes and evictions are counted as they
+        # happen. Other job processes write to the same directory, so the
+        # count is resynced with a full scan every few writes or seconds
+        self.disk_rescan_writes = int(os.getenv("TTS_CACHE_RESCAN_WRITES", "50"))
+        self.disk_rescan_seconds = float(os.getenv("TTS_CACHE_RESCAN_SECONDS", "60"))
+        self._disk_bytes: Optional[int] = None
+        self._disk_writes_since_scan = 0
+        self._disk_scanned_at = 0.0
+        # Disk writes run in worker threads; usage accounting and eviction must not interleave
+        self._disk_lock = threading.Lock()
+
+        self.stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+        }
+
+        logger.info("TTS Cache Configuration:")
+        logger.info(f"  Enabled: {self.enabled}")
+        logger.info(f"  Directory: {self.cache_dir}")
+        logger.info(f"  Memory Limit: {self.max_memory_bytes // (1024 * 1024)}MB")
+        logger.info(f"  Disk Limit: {self.max_disk_bytes // (1024 * 1024)}MB")
+
+    @staticmethod
+    def make_key(text: str, voice: str, model: str) -> str:
+        """Content address for an utterance"""
+        return hashlib.sha256(f"{model}\0{voice}\0{text}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.pcm"
+
+    # Memory tier
+
+    def _memory_put(self, key: str, audio: CachedAudio):
+        if audio.size > self.max_memory_bytes:
+            return
+
+        previous = self._memory.pop(key, None)
+        if previous:
+            self._memory_bytes -= previous.size
+
+        self._memory[key] = audio
+        self._memory_bytes += audio.size
+
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.size
+            self.stats["memory_evictions"] += 1
+
+    # Disk tier (blocking helpers run in a thread)
+
+    def _disk_read(self, key: str) -> Optional[CachedAudio]:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        if len(data) < _HEADER.size:
+            return None
+        magic, sample_rate, num_channels = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            return None
+
+        # Touch so size-based eviction drops least recently used blobs first
+        os.utime(path)
+        return CachedAudio(pcm=data[_HEADER.size:], sample_rate=sample_rate, num_channels=num_channels)
+
+    def _disk_scan(self) -> List[Tuple[Path, os.stat_result]]:
+        """Blobs on disk with their stats, skipping ones another process just removed"""
+        blobs = []
+        for path in self.cache_dir.glob("*/*.pcm"):
+            try:
+                blobs.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        return blobs
+
+    def _disk_write(self, key: str, audio: CachedAudio):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._disk_lock:
+            # Unique temp file - another process may be writing the same key
+            with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{key}.", suffix=".tmp", delete=False) as tmp:
+                tmp.write(_HEADER.pack(_MAGIC, audio.sample_rate, audio.num_channels) + audio.pcm)
+            try:
+                replaced = path.stat().st_size
+            except FileNotFoundError:
+                replaced = 0
+            try:
+                os.replace(tmp.name, path)
+            except BaseException:
+                os.unlink(tmp.name)
+                raise
+
+            self._disk_writes_since_scan += 1
+            if (
+                self._disk_bytes is None
+                or self._disk_writes_since_scan >= self.disk_rescan_writes
+                or time.monotonic() - self._disk_scanned_at >= self.disk_rescan_seconds
+            ):
+                blobs = self._disk_scan()
+                self._disk_bytes = sum(st.st_size for _, st in blobs)
+                self._disk_writes_since_scan = 0
+                self._disk_scanned_at = time.monotonic()
+            else:
+                blobs = None
+                self._disk_bytes += _HEADER.size + audio.size - replaced
+
+            if self._disk_bytes > self.max_disk_bytes:
+                self._disk_evict(blobs if blobs is not None else self._disk_scan())
+
+    def _disk_evict(self, blobs: List[Tuple[Path, os.stat_result]]):
+        # Called with _disk_lock held
+        blobs = sorted(blobs, key=lambda blob: blob[1].st_mtime)
+        total = sum(st.st_size for _, st in blobs)
+
+        # Evict down to 90% so we don't evict on every write
+        target = int(self.max_disk_bytes * 0.9)
+        for path, st in blobs:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= st.st_size
+            self.stats["disk_evictions"] += 1
+
+        # The eviction scan saw every process's blobs - counts as a resync
+        self._disk_bytes = total
+        self._disk_writes_since_scan = 0
+        self._disk_scanned_at = time.monotonic()
+
+    # Public API
+
+    async def get(self, text: str, voice: str, model: str) -> Optional[CachedAudio]:
+        """
+        Look up cached audio for an utterance
+
+        Returns:
+            CachedAudio if cached, None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        key = self.make_key(text, voice, model)
+
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return audio
+
+        try:
+            audio = await asyncio.to_thread(self._disk_read, key)
+        except Exception as e:
+            logger.warning(f"TTS Cache: Disk read failed for {key[:12]}: {e}")
+            audio = None
+
+        if audio is not None:
+            self.stats["disk_hits"] += 1
+            self._memory_put(key, audio)
+            return audio
+
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, text: str, voice: str, model: str, audio: CachedAudio):
+        """Store synthesized audio in both tiers"""
+        if not self.enabled or audio.size == 0:
+            return
+
+        key = self.make_key(text, voice, model)
+        self._memory_put(key, audio)
+
+        try:
+            await asyncio.to_thread(self._disk_write, key, audio)
+        except Exception as e:
+            logger.warning(f"TTS Cache: Disk write failed for {key[:12]}: {e}")
+
+    async def synthesize(self, tts: agents_tts.TTS, text: str, voice: str, model: str) -> AsyncIterator[rtc.AudioFrame]:
+        """
+        Synthesize an utterance, yielding frames as they arrive and caching the result
+
+        Audio is only cached if synthesis runs to completion, so an
+        interrupted utterance never leaves a truncated entry behind. Nor is
+        it cached if a different model produced it (a provider that failed
+        over, see sesame_tts.py), so the key never holds another voice.
+        """
+        chunks: List[bytes] = []
+        sample_rate = tts.sample_rate
+        num_channels = tts.num_channels
+
+        async with tts.synthesize(text) as stream:
+            async for event in stream:
+                frame = event.frame
+                sample_rate = frame.sample_rate
+                num_channels = frame.num_channels
+                chunks.append(bytes(frame.data))
+                yield frame
+
+        provider_model = getattr(stream, "provider_model", model)
+        if provider_model != model:
+            logger.info(f"TTS Cache: Not caching {provider_model} audio under {model} for: {text[:50]}")
+            return
+
+        await self.put(text, voice, model, CachedAudio(b"".join(chunks), sample_rate, num_channels))
+
+    async def audio_for(self, tts: agents_tts.TTS, text: str, voice: str, model: str) -> AsyncIterator[rtc.AudioFrame]:
+        """
+        Get playback frames for an utterance, from cache if possible
+
+        Intended for session.say(text, audio=...): a hit never touches the
+        provider, and a miss synthesizes once and fills the cache.
+        """
+        audio = await self.get(text, voice, model)
+        if audio is not None:
+            logger.info(f"TTS Cache: Hit ({audio.size} bytes) for: {text[:50]}{'...' if len(text) > 50 else ''}")
+            return audio.frames()
+        return self.synthesize(tts, text, voice, model)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters plus current tier sizes"""
+        return {
+            **self.stats,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_bytes": self._disk_bytes or 0,
+        }
+
+# Global TTS cache instance
+tts_cache = TTSCache()
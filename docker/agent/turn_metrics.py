@@ -0,0 +1,188 @@
+"""
+Turn Metrics for AImee LiveKit Agent
+
+Per-turn latency timeline and a Prometheus metrics endpoint.
+
+Each user turn records wall-clock marks for the stages it passes through:
+
+    end_of_speech   VAD detected the user stopped speaking
+    stt_final       final transcript received
+    backend_start   backend request sent (or speculative request claimed)
+    backend_end     backend reply (first sentence, when streaming) received
+    tts_first_byte  first synthesized audio byte from the TTS provider
+    first_audio     first audio frame published to the room
+
+When the turn completes the timeline is logged as one structured line and
+each stage's offset from end_of_speech is observed into histograms, which are
+served with active-session gauges on METRICS_PORT (the agent's mapped 3001).
+
+LiveKit runs each job in its own process, so metrics use prometheus_client's
+multiprocess mode: job processes write to METRICS_DIR and the worker's main
+process aggregates them when scraped. Job processes can exit without
+cleaning up (crashes, idle process shutdown), so the main process
+periodically drops the live gauges of processes that are gone.
+"""
+
+import json
+import os
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_PORT = int(os.getenv("METRICS_PORT", "3001"))
+METRICS_DIR = os.getenv("METRICS_DIR", "/tmp/aimee-metrics")
+METRICS_SWEEP_SECONDS = float(os.getenv("METRICS_SWEEP_SECONDS", "30"))
+
+# Must be set before prometheus_client is imported, in every process
+if METRICS_ENABLED:
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", METRICS_DIR)
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, multiprocess, start_http_server
+
+# Configure logger
+logger = logging.getLogger("turn-metrics")
+
+STAGES = ("stt_final", "backend_start", "backend_end", "tts_first_byte", "first_audio")
+
+# Voice turns live in the 0.1-10s range; finer buckets at the low end
+_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 4.0, 6.0, 8.0, 12.0)
+
+TURN_STAGE_SECONDS = Histogram(
+    "aimee_turn_stage_seconds",
+    "Time from the user's end of speech to each turn stage",
+    ["stage"],
+    buckets=_LATENCY_BUCKETS,
+)
+BACKEND_SECONDS = Histogram(
+    "aimee_backend_request_seconds",
+    "Backend request duration by selected agent",
+    ["agent"],
+    buckets=_LATENCY_BUCKETS,
+)
+TURNS_TOTAL = Counter(
+    "aimee_turns_total",
+    "Completed user turns by outcome",
+    ["outcome"],
+)
+ACTIVE_SESSIONS = Gauge(
+    "aimee_active_sessions",
+    "Agent sessions currently running",
+    multiprocess_mode="livesum",
+)
+
+class TurnTimeline:
+    """Wall-clock marks for one user turn"""
+
+    def __init__(self, end_of_speech: Optional[float] = None):
+        self.marks: Dict[str, float] = {"end_of_speech": end_of_speech or time.time()}
+        self.attrs: Dict[str, Any] = {}
+        self.finished = False
+
+    def mark(self, stage: str, at: Optional[float] = None, **attrs):
+        """Record a stage (first occurrence wins) and any attributes"""
+        self.marks.setdefault(stage, at or time.time())
+        self.attrs.update(attrs)
+
+    def offsets_ms(self) -> Dict[str, float]:
+        """Milliseconds from end_of_speech to each recorded stage"""
+        origin = self.marks["end_of_speech"]
+        return {stage: round((at - origin) * 1000, 1) for stage, at in sorted(self.marks.items(), key=lambda m: m[1])}
+
+    def finish(self, outcome: str = "spoken"):
+        """Log the timeline and observe it into the histograms (once)"""
+        if self.finished:
+            return
+        self.finished = True
+
+        origin = self.marks["end_of_speech"]
+        for stage in STAGES:
+            if stage in self.marks:
+                TURN_STAGE_SECONDS.labels(stage=stage).observe(max(0.0, self.marks[stage] - origin))
+
+        if "backend_start" in self.marks and "backend_end" in self.marks:
+            BACKEND_SECONDS.labels(agent=self.attrs.get("agent", "unknown")).observe(
+                max(0.0, self.marks["backend_end"] - self.marks["backend_start"])
+            )
+
+        TURNS_TOTAL.labels(outcome=outcome).inc()
+        logger.info(f"Turn timeline: {json.dumps({'outcome': outcome, **self.attrs, 'ms': self.offsets_ms()})}")
+
+def session_started():
+    ACTIVE_SESSIONS.inc()
+
+def session_ended():
+    ACTIVE_SESSIONS.dec()
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def sweep_dead_processes() -> int:
+    """
+    Drop the live gauges of job processes that have exited
+
+    Their counters and histograms are kept, so totals don't go backwards.
+
+    Returns:
+        Number of exited processes swept
+    """
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    dead = set()
+    for filename in os.listdir(metrics_dir):
+        if not filename.startswith("gauge_live"):
+            continue
+        pid = filename.rsplit("_", 1)[-1].split(".")[0]
+        if pid.isdigit() and not _pid_alive(int(pid)):
+            dead.add(int(pid))
+
+    for pid in dead:
+        multiprocess.mark_process_dead(pid, metrics_dir)
+    return len(dead)
+
+def _sweep_loop(interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            swept = sweep_dead_processes()
+            if swept:
+                logger.info(f"Dropped live metrics of {swept} exited job process(es)")
+        except Exception as e:
+            logger.warning(f"Metrics sweep failed: {e}")
+
+def start_metrics_server(port: int = METRICS_PORT) -> bool:
+    """
+    Serve aggregated metrics from all job processes (call once, in the main process)
+
+    Returns:
+        True if the endpoint is listening
+    """
+    if not METRICS_ENABLED:
+        return False
+
+    # Files left by processes of a previous run would be aggregated as if still live
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    for filename in os.listdir(metrics_dir):
+        pid = filename.rsplit("_", 1)[-1].split(".")[0]
+        if pid.isdigit() and not _pid_alive(int(pid)):
+            os.remove(os.path.join(metrics_dir, filename))
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    try:
+        start_http_server(port, registry=registry)
+    except OSError as e:
+        logger.warning(f"Metrics endpoint not started on port {port}: {e}")
+        return False
+
+    threading.Thread(target=_sweep_loop, args=(METRICS_SWEEP_SECONDS,), name="metrics-sweep", daemon=True).start()
+
+    logger.info(f"Metrics endpoint listening on :{port}/metrics")
+    return True
@@ -0,0 +1,252 @@
+"""
+Speculative Turn Racing for AImee LiveKit Agent
+
+Optional "race" mode for user turns. The backend router request starts
+first; if it hasn't produced its first sentence after a hedge delay, a direct
+LLM generation starts in parallel. Whichever produces a usable first sentence
+first (ideally within the latency SLO) is spoken and the other is cancelled.
+A backend request that loses is abandoned, so the backend doesn't record a
+reply that was never spoken.
+
+This caps tail latency on slow router turns (e.g. multi-agent hops through
+the historian) while keeping routing on the fast path.
+"""
+
+import asyncio
+import os
+import logging
+import re
+import time
+from typing import Optional, List, Any, AsyncIterator, Tuple, Dict
+
+from livekit.agents import llm
+
+from backend_client import backend_client
+
+# Configure logger
+logger = logging.getLogger("turn-racing")
+
+RACE_MODE = os.getenv("RACE_MODE", "false").lower() == "true"
+RACE_HEDGE_DELAY = float(os.getenv("RACE_HEDGE_DELAY_MS", "1500")) / 1000
+RACE_SLO = float(os.getenv("RACE_SLO_MS", "4000")) / 1000
+
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]*(\s|$)")
+
+class DirectLLMStream:
+    """
+    Text stream from a direct LLM generation, primed to its first full sentence
+
+    Mirrors the BackendChatStream interface (success/text/prime/aclose and
+    async iteration) so either can be handed to session.say().
+    """
+
+    agent = "direct_llm"
+
+    def __init__(self, llm_stream: llm.LLMStream):
+        self._stream = llm_stream
+        self._iterator = llm_stream.__aiter__()
+        self._pending: List[str] = []
+        self._parts: List[str] = []
+        self._done = False
+        self.complete = False
+        self.error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    async def _next_text(self) -> Optional[str]:
+        while not self._done:
+            try:
+                chunk = await self._iterator.__anext__()
+            except StopAsyncIteration:
+                self._done = True
+                self.complete = True
+                break
+            content = chunk.delta.content if chunk.delta else None
+            if content:
+                self._parts.append(content)
+                return content
+        return None
+
+    async def prime(self):
+        """Buffer output until the first complete sentence (or the end of the reply)"""
+        buffered: List[str] = []
+        try:
+            while True:
+                text = await self._next_text()
+                if text is None:
+                    break
+                buffered.append(text)
+                if _SENTENCE_END.search("".join(buffered)):
+                    break
+        except asyncio.CancelledError:
+            await self.aclose()
+            raise
+        except Exception as e:
+            self.error = f"Direct LLM error: {e}"
+            await self.aclose()
+            return
+
+        if buffered:
+            self._pending.append("".join(buffered))
+        elif self.error is None:
+            self.error = "Direct LLM produced no text"
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        try:
+            while self._pending:
+                yield self._pending.pop(0)
+            while not self._done:
+                text = await self._next_text()
+                if text:
+                    yield text
+        finally:
+            await self.aclose()
+
+    async def aclose(self):
+        self._done = True
+        await self._stream.aclose()
+
+    def abort(self):
+        """Stop generating, dropping any text not yet consumed"""
+        self._done = True
+        self._pending.clear()
+        asyncio.create_task(self._stream.aclose())
+
+def _direct_chat_ctx(turn_ctx: llm.ChatContext, instructions: str, user_input: str) -> llm.ChatContext:
+    """Chat context for a direct generation of this turn"""
+    chat_ctx = turn_ctx.copy()
+    has_system = any(getattr(item, "role", None) == "system" for item in chat_ctx.items)
+    if not has_system:
+        chat_ctx.items.insert(0, llm.ChatMessage(role="system", content=[instructions]))
+    chat_ctx.add_message(role="user", content=user_input)
+    return chat_ctx
+
+async def _start_direct(session_llm: llm.LLM, chat_ctx: llm.ChatContext) -> DirectLLMStream:
+    stream = DirectLLMStream(session_llm.chat(chat_ctx=chat_ctx))
+    await stream.prime()
+    return stream
+
+async def race_first_sentence(
+    session_llm: llm.LLM,
+    turn_ctx: llm.ChatContext,
+    instructions: str,
+    user_input: str,
+    session_id: Optional[str],
+    backend=None,
+    turn_id: Optional[str] = None,
+) -> Tuple[Optional[Any], Dict[str, Any]]:
+    """
+    Race the backend router against a hedged direct LLM generation
+
+    Args:
+        backend: Backend client to race (default: the shared backend_client)
+        turn_id: Turn id for the backend request, abandoned if it loses
+
+    Returns:
+        (winning stream or None, timing/decision info for logging)
+    """
+    backend = backend or backend_client
+    start = time.perf_counter()
+    info: Dict[str, Any] = {"hedged": False}
+
+    backend_task = asyncio.create_task(backend.chat_stream(
+        user_id="voice-user",
+        user_input=user_input,
+        context={"mode": "voice", "source": "livekit"},
+        session_id=session_id,
+        turn_id=turn_id
+    ))
+    tasks = {backend_task: "backend"}
+
+    try:
+        winner, winner_task = await _race(tasks, backend_task, session_llm, turn_ctx, instructions, user_input, start, info)
+    except BaseException:
+        # Cancelled (the user barged in) - stop both; the caller abandons the turn
+        for task in tasks:
+            _discard(task)
+        raise
+
+    # Cancel or close the loser
+    for task in tasks:
+        if task is winner_task:
+            continue
+        if task is backend_task and turn_id and _discard(task):
+            asyncio.create_task(backend.abandon_turn(turn_id))
+        else:
+            _discard(task)
+
+    info["first_sentence_ms"] = (time.perf_counter() - start) * 1000
+    info["winner"] = tasks[winner_task] if winner_task else None
+    if info["first_sentence_ms"] > RACE_SLO * 1000:
+        info["slo_missed"] = True
+    return winner, info
+
+def _discard(task: asyncio.Task) -> bool:
+    """
+    Cancel a racing request, or close its stream if it already started
+
+    Returns:
+        True if the request may still produce a reply on the other side
+        (it was cancelled in flight or its stream was cut short)
+    """
+    if not task.done():
+        task.cancel()
+        return True
+    if task.cancelled() or task.exception() is not None or not task.result().success:
+        return False
+    stream = task.result()
+    asyncio.create_task(stream.aclose())
+    return not stream.complete
+
+async def _race(
+    tasks: Dict[asyncio.Task, str],
+    backend_task: asyncio.Task,
+    session_llm: llm.LLM,
+    turn_ctx: llm.ChatContext,
+    instructions: str,
+    user_input: str,
+    start: float,
+    info: Dict[str, Any],
+) -> Tuple[Optional[Any], Optional[asyncio.Task]]:
+    """Wait for the backend, hedging with a direct generation; returns the winner and its task"""
+    done, _ = await asyncio.wait({backend_task}, timeout=RACE_HEDGE_DELAY)
+    if backend_task in done and backend_task.exception() is None and backend_task.result().success:
+        return backend_task.result(), backend_task
+
+    # Backend is slow (or already failed) - hedge with a direct generation
+    info["hedged"] = True
+    info["hedge_ms"] = (time.perf_counter() - start) * 1000
+    direct_task = asyncio.create_task(_start_direct(session_llm, _direct_chat_ctx(turn_ctx, instructions, user_input)))
+    tasks[direct_task] = "direct"
+
+    pending = {task for task in tasks if not task.done()}
+    winner = None
+    winner_task = None
+
+    for task in tasks:
+        if task.done() and task.exception() is None and task.result().success:
+            winner, winner_task = task.result(), task
+
+    while winner is None and pending:
+        # Wait within the SLO first; past it, take whatever usable result comes first
+        remaining = RACE_SLO - (time.perf_counter() - start)
+        done, pending = await asyncio.wait(
+            pending,
+            timeout=remaining if remaining > 0 else None,
+            return_when=asyncio.FIRST_COMPLETED
+        )
+        if not done:
+            info["slo_missed"] = True
+            continue
+        for task in done:
+            if task.exception() is None and task.result().success:
+                winner, winner_task = task.result(), task
+                break
+
+    return winner, winner_task
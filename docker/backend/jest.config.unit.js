@@ -9,6 +9,7 @@ module.exports = {
     '**/agents/__tests__/**/*.test.ts',
     '**/brain/__tests__/**/*.test.ts',
     '**/memory/__tests__/**/*.test.ts',
+    '<rootDir>/src/__tests__/*.test.ts',
     '**/testing/__tests__/criticalPaths.test.ts' // Include static assertions
   ],
   testPathIgnorePatterns: [
@@ -0,0 +1,115 @@
+import http from 'http';
+import { AddressInfo } from 'net';
+import { WebSocket, WebSocketServer } from 'ws';
+import { encode, decode } from '@msgpack/msgpack';
+import { AGENT_CHANNEL_PATH, ChannelHandler, attachAgentChannel } from '../agentChannel';
+import { frameStream } from '../frameStream';
+
+describe('agentChannel', () => {
+  let server: http.Server;
+  let wss: WebSocketServer;
+  let socket: WebSocket;
+  let received: Record<string, any>[];
+
+  const handlers: Record<string, ChannelHandler> = {
+    'slow': async (body) => {
+      await new Promise(resolve => setTimeout(resolve, 30));
+      return { status: 200, body: { success: true, echo: body.value } };
+    },
+    'fast': async (body) => ({ status: 200, body: { success: true, echo: body.value } }),
+    'broken': async () => {
+      throw new Error('Store unavailable');
+    },
+    'stream': async () => ({
+      status: 200,
+      body: { success: true },
+      frames: frameStream(async (emit) => {
+        emit({ type: 'meta', agent: 'Historian' });
+        emit({ type: 'delta', text: 'Hello.' });
+        emit({ type: 'done', success: true });
+      })
+    })
+  };
+
+  function request(id: number, op: string, body?: Record<string, any>): void {
+    socket.send(encode({ id, op, body }));
+  }
+
+  async function waitForFrames(count: number): Promise<Record<string, any>[]> {
+    const deadline = Date.now() + 2000;
+    while (received.length < count) {
+      if (Date.now() > deadline) {
+        throw new Error(`Timed out waiting for ${count} frames (got ${received.length})`);
+      }
+      await new Promise(resolve => setTimeout(resolve, 5));
+    }
+    return received;
+  }
+
+  beforeEach(async () => {
+    jest.spyOn(console, 'log').mockImplementation(() => {});
+    jest.spyOn(console, 'error').mockImplementation(() => {});
+
+    received = [];
+    server = http.createServer();
+    wss = attachAgentChannel(server, handlers);
+    await new Promise<void>(resolve => server.listen(0, '127.0.0.1', resolve));
+
+    const { port } = server.address() as AddressInfo;
+    socket = new WebSocket(`ws://127.0.0.1:${port}${AGENT_CHANNEL_PATH}`);
+    socket.on('message', (data) => received.push(decode(data as Buffer) as Record<string, any>));
+    await new Promise(resolve => socket.once('open', resolve));
+  });
+
+  afterEach(async () => {
+    socket.terminate();
+    wss.close();
+    await new Promise(resolve => server.close(resolve));
+  });
+
+  it('should answer each request under its own id, in completion order', async () => {
+    request(1, 'slow', { value: 'first' });
+    request(2, 'fast', { value: 'second' });
+
+    const frames = await waitForFrames(2);
+
+    expect(frames[0]).toEqual({ id: 2, type: 'result', status: 200, body: { success: true, echo: 'second' } });
+    expect(frames[1]).toEqual({ id: 1, type: 'result', status: 200, body: { success: true, echo: 'first' } });
+  });
+
+  it('should answer an unknown operation with a 404', async () => {
+    request(7, 'session.nope');
+
+    const [frame] = await waitForFrames(1);
+
+    expect(frame.id).toBe(7);
+    expect(frame.status).toBe(404);
+    expect(frame.body.success).toBe(false);
+    expect(frame.body.error).toContain('session.nope');
+  });
+
+  it('should answer a handler that throws with a 500', async () => {
+    request(3, 'broken');
+
+    const [frame] = await waitForFrames(1);
+
+    expect(frame).toEqual({
+      id: 3,
+      type: 'result',
+      status: 500,
+      body: { success: false, error: 'Internal server error', details: 'Store unavailable' }
+    });
+  });
+
+  it('should send stream frames tagged with the request id', async () => {
+    request(4, 'stream');
+
+    const frames = await waitForFrames(3);
+
+    expect(frames).toEqual([
+      { id: 4, type: 'meta', agent: 'Historian' },
+      { id: 4, type: 'delta', text: 'Hello.' },
+      { id: 4, type: 'done', success: true }
+    ]);
+  });
+});
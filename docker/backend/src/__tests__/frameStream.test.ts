@@ -0,0 +1,66 @@
+import { frameStream } from '../frameStream';
+
+async function collect(frames: AsyncIterable<Record<string, any>>): Promise<Record<string, any>[]> {
+  const collected: Record<string, any>[] = [];
+  for await (const frame of frames) {
+    collected.push(frame);
+  }
+  return collected;
+}
+
+describe('frameStream', () => {
+  it('yields frames in order and ends when the producer finishes', async () => {
+    const frames = await collect(frameStream(async (emit) => {
+      emit({ type: 'meta', agent: 'Historian' });
+      await new Promise(resolve => setTimeout(resolve, 5));
+      emit({ type: 'delta', text: 'Hello.' });
+      emit({ type: 'done', success: true });
+    }));
+
+    expect(frames).toEqual([
+      { type: 'meta', agent: 'Historian' },
+      { type: 'delta', text: 'Hello.' },
+      { type: 'done', success: true }
+    ]);
+  });
+
+  it('yields frames before the producer has finished', async () => {
+    let release: () => void = () => {};
+    const stream = frameStream(async (emit) => {
+      emit({ type: 'delta', text: 'First' });
+      await new Promise<void>(resolve => { release = resolve; });
+      emit({ type: 'delta', text: 'Second' });
+    });
+
+    const first = await stream.next();
+    expect(first.value).toEqual({ type: 'delta', text: 'First' });
+
+    release();
+    expect(await collect(stream)).toEqual([{ type: 'delta', text: 'Second' }]);
+  });
+
+  it('ends with an error frame when the producer throws', async () => {
+    jest.spyOn(console, 'error').mockImplementation(() => {});
+
+    const frames = await collect(frameStream(async (emit) => {
+      emit({ type: 'delta', text: 'Partial' });
+      throw new Error('LLM unavailable');
+    }));
+
+    expect(frames).toEqual([
+      { type: 'delta', text: 'Partial' },
+      { type: 'error', error: 'Internal server error', details: 'LLM unavailable' }
+    ]);
+  });
+
+  it('ignores frames emitted after the producer settled', async () => {
+    let late: (frame: Record<string, any>) => void = () => {};
+    const frames = await collect(frameStream(async (emit) => {
+      late = emit;
+      emit({ type: 'done', success: true });
+    }));
+
+    late({ type: 'delta', text: 'Too late' });
+    expect(frames).toEqual([{ type: 'done', success: true }]);
+  });
+});
@@ -0,0 +1,110 @@
+import { createBatchHandler } from '../outboxBatch';
+import { ApiResult } from '../agentChannel';
+
+describe('outboxBatch', () => {
+  let calls: string[];
+  let handleBatch: (body: any) => Promise<ApiResult>;
+
+  beforeEach(() => {
+    calls = [];
+    jest.spyOn(console, 'log').mockImplementation(() => {});
+
+    handleBatch = createBatchHandler({
+      'session.start': async (body) => {
+        calls.push(`start:${body.sessionId}`);
+        return { status: 200, body: { success: true } };
+      },
+      'session.messages': async (body) => {
+        calls.push(`messages:${body.sessionId}`);
+        return { status: 200, body: { success: true } };
+      },
+      'chat': async (body) => {
+        calls.push(`chat:${body.input}`);
+        if (body.input === 'unavailable') {
+          return { status: 503, body: { success: false, error: 'Try again' } };
+        }
+        if (body.input === 'invalid') {
+          return { status: 400, body: { success: false, error: 'Bad input' } };
+        }
+        return { status: 200, body: { success: true } };
+      }
+    });
+  });
+
+  afterEach(() => {
+    jest.restoreAllMocks();
+  });
+
+  it('should reject a body without an events array', async () => {
+    const result = await handleBatch({});
+
+    expect(result.status).toBe(400);
+    expect(calls).toEqual([]);
+  });
+
+  it('should apply events in order and report a status per event', async () => {
+    const result = await handleBatch({
+      events: [
+        { id: 'e1', op: 'session.start', body: { sessionId: 's1' } },
+        { id: 'e2', op: 'chat', body: { input: 'hello' } },
+        { id: 'e3', op: 'session.messages', body: { sessionId: 's1' } }
+      ]
+    });
+
+    expect(result.status).toBe(200);
+    expect(calls).toEqual(['start:s1', 'chat:hello', 'messages:s1']);
+    expect(result.body.results).toEqual([
+      { id: 'e1', status: 200 },
+      { id: 'e2', status: 200 },
+      { id: 'e3', status: 200 }
+    ]);
+  });
+
+  it('should report an unknown operation without stopping the batch', async () => {
+    const result = await handleBatch({
+      events: [
+        { id: 'e1', op: 'session.rename', body: {} },
+        { id: 'e2', op: 'chat', body: { input: 'hello' } }
+      ]
+    });
+
+    expect(result.body.results[0].status).toBe(400);
+    expect(result.body.results[0].error).toContain('session.rename');
+    expect(result.body.results[1]).toEqual({ id: 'e2', status: 200 });
+  });
+
+  it('should not apply an event id twice', async () => {
+    const event = { id: 'dup', op: 'chat', body: { input: 'hello' } };
+
+    await handleBatch({ events: [event] });
+    const result = await handleBatch({ events: [event, event] });
+
+    expect(calls).toEqual(['chat:hello']);
+    expect(result.body.results).toEqual([
+      { id: 'dup', status: 200 },
+      { id: 'dup', status: 200 }
+    ]);
+  });
+
+  it('should apply an event again after a 5xx so the agent can retry it', async () => {
+    const event = { id: 'retry', op: 'chat', body: { input: 'unavailable' } };
+
+    const first = await handleBatch({ events: [event] });
+    const second = await handleBatch({ events: [event] });
+
+    expect(first.body.results[0]).toEqual({ id: 'retry', status: 503, error: 'Try again' });
+    expect(second.body.results[0].status).toBe(503);
+    expect(calls).toEqual(['chat:unavailable', 'chat:unavailable']);
+  });
+
+  it('should treat a 4xx as final and not apply it again', async () => {
+    const event = { id: 'final', op: 'chat', body: { input: 'invalid' } };
+
+    const first = await handleBatch({ events: [event] });
+    const second = await handleBatch({ events: [event] });
+
+    expect(first.body.results[0]).toEqual({ id: 'final', status: 400, error: 'Bad input' });
+    expect(second.body.results[0]).toEqual({ id: 'final', status: 200 });
+    expect(calls).toEqual(['chat:invalid']);
+  });
+});
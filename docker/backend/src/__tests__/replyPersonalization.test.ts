@@ -0,0 +1,31 @@
+import { isPersonalizedReply } from '../replyPersonalization';
+import { addToHistory, createDefaultContext } from '../agents/types';
+
+describe('replyPersonalization', () => {
+  const question = addToHistory(createDefaultContext('user-1'), 'user', 'How old is this building?');
+  const answer = { text: 'About a hundred years.', metadata: {} };
+
+  it('marks Historian and Experience replies to a fresh question as not personalized', () => {
+    expect(isPersonalizedReply('Historian', answer, question)).toBe(false);
+    expect(isPersonalizedReply('Experience', answer, question)).toBe(false);
+  });
+
+  it('treats Memory and Navigator replies as personalized', () => {
+    expect(isPersonalizedReply('Memory', answer, question)).toBe(true);
+    expect(isPersonalizedReply('Navigator', answer, question)).toBe(true);
+  });
+
+  it('treats error fallbacks as personalized', () => {
+    expect(isPersonalizedReply('Historian', { text: 'Sorry...', metadata: { error: 'timeout' } }, question)).toBe(true);
+  });
+
+  it('treats replies to a follow-up question as personalized', () => {
+    const followUp = addToHistory(addToHistory(question, 'assistant', 'About a hundred years.'), 'user', 'Who built it?');
+    expect(isPersonalizedReply('Historian', answer, followUp)).toBe(true);
+  });
+
+  it('treats replies in non-default preferences as personalized', () => {
+    const brief = { ...question, preferences: { verbosity: 'short' as const } };
+    expect(isPersonalizedReply('Historian', answer, brief)).toBe(true);
+  });
+});
@@ -0,0 +1,122 @@
+import { Server } from 'http';
+import { WebSocketServer, WebSocket, RawData } from 'ws';
+import { encode, decode } from '@msgpack/msgpack';
+
+/**
+ * Agent Channel - persistent multiplexed connection for LiveKit agent workers
+ *
+ * Each agent worker process keeps one WebSocket open to /agent-channel and
+ * sends every session's requests over it, instead of one HTTP POST per turn.
+ * Messages are msgpack-encoded and carry a request id:
+ *
+ *   request   { id, op, body }                 body is the HTTP endpoint's request body
+ *   result    { id, type: 'result', status, body }
+ *   stream    { id, type: 'meta' | 'delta' | 'done' | 'error', ... }
+ *
+ * Requests with stream frames (chat with "stream": true) get the same frames
+ * the NDJSON endpoint writes; everything else gets one result frame with the
+ * status and body the HTTP endpoint would have returned.
+ */
+
+export const AGENT_CHANNEL_PATH = '/agent-channel';
+
+/**
+ * Outcome of a request, shared by the HTTP routes and the agent channel
+ */
+export interface ApiResult {
+  status: number;
+  body: Record<string, any>;
+  /** Stream frames to send instead of the body (NDJSON over HTTP), possibly still being produced */
+  frames?: Iterable<Record<string, any>> | AsyncIterable<Record<string, any>>;
+}
+
+export type ChannelHandler = (body: any) => Promise<ApiResult>;
+
+interface ChannelRequest {
+  id: number;
+  op: string;
+  body?: Record<string, any>;
+}
+
+function toBuffer(data: RawData): Buffer {
+  if (Buffer.isBuffer(data)) {
+    return data;
+  }
+  return Array.isArray(data) ? Buffer.concat(data) : Buffer.from(data);
+}
+
+function send(socket: WebSocket, frame: Record<string, any>): void {
+  // The worker may have gone away while the request was being handled
+  if (socket.readyState === WebSocket.OPEN) {
+    socket.send(encode(frame));
+  }
+}
+
+async function handleRequest(socket: WebSocket, handlers: Record<string, ChannelHandler>, request: ChannelRequest): Promise<void> {
+  const { id, op, body } = request;
+  const handler = handlers[op];
+
+  if (!handler) {
+    send(socket, { id, type: 'result', status: 404, body: { success: false, error: `Unknown operation "${op}"` } });
+    return;
+  }
+
+  try {
+    const result = await handler(body || {});
+
+    if (result.frames) {
+      for await (const frame of result.frames) {
+        send(socket, { id, ...frame });
+      }
+    } else {
+      send(socket, { id, type: 'result', status: result.status, body: result.body });
+    }
+  } catch (error) {
+    console.error(`Agent Channel: Error handling "${op}":`, error);
+    send(socket, {
+      id,
+      type: 'result',
+      status: 500,
+      body: {
+        success: false,
+        error: 'Internal server error',
+        details: error instanceof Error ? error.message : 'Unknown error'
+      }
+    });
+  }
+}
+
+/**
+ * Accept agent channel connections on the HTTP server
+ */
+export function attachAgentChannel(server: Server, handlers: Record<string, ChannelHandler>): WebSocketServer {
+  const wss = new WebSocketServer({ server, path: AGENT_CHANNEL_PATH, perMessageDeflate: false });
+
+  wss.on('connection', (socket, req) => {
+    const peer = req.socket.remoteAddress;
+    console.log('Agent Channel: Worker connected from', peer, `(${wss.clients.size} connected)`);
+
+    socket.on('message', (data: RawData) => {
+      let request: ChannelRequest;
+      try {
+        request = decode(toBuffer(data)) as ChannelRequest;
+      } catch (error) {
+        console.warn('Agent Channel: Dropping malformed message from', peer);
+        return;
+      }
+
+      // Requests are handled concurrently; each answer carries the request id
+      void handleRequest(socket, handlers, request);
+    });
+
+    socket.on('close', () => {
+      console.log('Agent Channel: Worker disconnected from', peer, `(${wss.clients.size} connected)`);
+    });
+
+    socket.on('error', (error) => {
+      console.warn('Agent Channel: Socket error from', peer, error.message);
+    });
+  });
+
+  return wss;
+}
@@ -159,6 +159,12 @@ export class MemoryAgent extends BaseAgent {
     try {
       console.log('Memory Agent: Processing personalization/memory request');
 
+      // Reconnection greeting - clear trip memory before the greeting reads it
+      if (context.clearTrip) {
+        await clearTripMemory(context.userId || 'voice-user');
+        console.log('Memory Agent: Cleared trip memory for reconnection');
+      }
+
       // Special handling for session start greeting check
       // Match various session start patterns
       if (input.includes('[SYSTEM: This is the initial session') ||
@@ -236,6 +242,7 @@ export class MemoryAgent extends BaseAgent {
       }
 
       // Generate memory-focused response with memory context
+      // (not streamed - the SAVE_MEMORY line is stripped from the output below)
       const response = await runSmartAgentPrompt(
         this.name,
         this.getSystemPrompt() + '\n\n' + memoryContext + '\n\nUser input: ' + input,
@@ -245,7 +252,7 @@ export class MemoryAgent extends BaseAgent {
 3. JSON may include fields: "name", "storyLengthPreference", "interests", "visitedMarkers"
 4. After that line, provide your natural response to the user
 5. If no memory changes, do NOT output any SAVE_MEMORY line`,
-        context
+        { ...context, onText: undefined }
       );
 
       // Parse SAVE_MEMORY directive using line-based approach
@@ -60,6 +60,15 @@ export interface ConversationContext {
 
   /** Additional metadata for agent processing */
   metadata?: Record<string, any>;
+
+  /** Clear the current trip before responding (reconnection greeting) */
+  clearTrip?: boolean;
+
+  /**
+   * Receives response text as the LLM generates it (streaming clients).
+   * Agents that post-process the LLM output must not pass it on.
+   */
+  onText?: (agentName: string, delta: string) => void;
 }
 
 /**
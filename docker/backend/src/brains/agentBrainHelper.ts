@@ -21,8 +21,13 @@ export async function runPremiumAgentPrompt(
 
     console.log(`Brain Helper: Processing ${agentName} request`);
 
-    // Call the OpenAI Realtime engine (text-based for Phase 3)
-    const result = await testOpenAIRealtime(fullPrompt);
+    // Call the OpenAI Realtime engine (text-based for Phase 3), streaming if the caller wants text early
+    const onText = context.onText;
+    const result = await testOpenAIRealtime(
+      fullPrompt,
+      undefined,
+      onText ? (delta: string) => onText(agentName, delta) : undefined
+    );
 
     if (!result.success) {
       throw new Error(result.error || 'OpenAI request failed');
@@ -46,8 +46,9 @@ export class OpenAIRealtimeEngine {
    * Test OpenAI with text-based interaction using Chat Completions API
    * Note: This uses the standard Chat Completions API as the Realtime WebSocket API
    * implementation differs in the current SDK version
+   * @param onText Streams the completion, receiving each text delta as it is generated
    */
-  async testTextInteraction(request: RealtimeTestRequest): Promise<RealtimeTestResponse> {
+  async testTextInteraction(request: RealtimeTestRequest, onText?: (delta: string) => void): Promise<RealtimeTestResponse> {
     const brain = getBrainForEnvironment();
 
     if (brain.provider !== 'premium') {
@@ -74,23 +75,41 @@ export class OpenAIRealtimeEngine {
       const systemMessage = request.instructions ||
         'You are a helpful AI assistant for the AImee POC. Provide concise and helpful responses. This is a test of the OpenAI integration for Phase 2.';
 
-      const completion = await this.openai.chat.completions.create({
+      const params = {
         model: getDefaultLLMModel(), // Centralized LLM model configuration
         messages: [
           {
-            role: 'system',
+            role: 'system' as const,
             content: systemMessage
           },
           {
-            role: 'user',
+            role: 'user' as const,
             content: request.message
           }
         ],
         max_tokens: 500,
         temperature: 0.7
-      });
+      };
 
-      const response = completion.choices[0]?.message?.content;
+      let response: string | null | undefined;
+      let completionId: string | undefined;
+
+      if (onText) {
+        const stream = await this.openai.chat.completions.create({ ...params, stream: true });
+        response = '';
+        for await (const chunk of stream) {
+          completionId = chunk.id;
+          const delta = chunk.choices[0]?.delta?.content;
+          if (delta) {
+            response += delta;
+            onText(delta);
+          }
+        }
+      } else {
+        const completion = await this.openai.chat.completions.create(params);
+        completionId = completion.id;
+        response = completion.choices[0]?.message?.content;
+      }
 
       if (!response) {
         return {
@@ -104,7 +123,7 @@ export class OpenAIRealtimeEngine {
       return {
         success: true,
         response: response.trim(),
-        sessionId: completion.id // Use completion ID as session identifier
+        sessionId: completionId // Use completion ID as session identifier
       };
 
     } catch (error: any) {
@@ -166,9 +185,13 @@ export class OpenAIRealtimeEngine {
 export const openaiRealtimeEngine = new OpenAIRealtimeEngine();
 
 // Helper function for easy testing
-export async function testOpenAIRealtime(message: string, instructions?: string): Promise<RealtimeTestResponse> {
+export async function testOpenAIRealtime(
+  message: string,
+  instructions?: string,
+  onText?: (delta: string) => void
+): Promise<RealtimeTestResponse> {
   try {
-    return await openaiRealtimeEngine.testTextInteraction({ message, instructions });
+    return await openaiRealtimeEngine.testTextInteraction({ message, instructions }, onText);
   } catch (error) {
     return {
       success: false,
@@ -0,0 +1,58 @@
+/**
+ * Frame Stream - stream frames as a handler produces them
+ *
+ * Streaming handlers return their frames before they are all known (e.g. chat
+ * deltas while the LLM is still generating). The producer emits frames as it
+ * goes; the stream yields them in order and ends when the producer settles.
+ * A producer that throws ends the stream with an error frame.
+ */
+
+export type FrameEmitter = (frame: Record<string, any>) => void;
+
+export async function* frameStream(
+  produce: (emit: FrameEmitter) => Promise<void>
+): AsyncGenerator<Record<string, any>> {
+  const queued: Record<string, any>[] = [];
+  let finished = false;
+  let wake: (() => void) | null = null;
+
+  const notify = () => {
+    if (wake) {
+      const resolve = wake;
+      wake = null;
+      resolve();
+    }
+  };
+
+  const emit: FrameEmitter = (frame) => {
+    if (!finished) {
+      queued.push(frame);
+      notify();
+    }
+  };
+
+  const finish = () => {
+    finished = true;
+    notify();
+  };
+
+  produce(emit).then(finish, (error) => {
+    console.error('Frame Stream: Producer failed:', error);
+    emit({
+      type: 'error',
+      error: 'Internal server error',
+      details: error instanceof Error ? error.message : 'Unknown error'
+    });
+    finish();
+  });
+
+  while (true) {
+    if (queued.length > 0) {
+      yield queued.shift()!;
+    } else if (finished) {
+      return;
+    } else {
+      await new Promise<void>(resolve => { wake = resolve; });
+    }
+  }
+}
@@ -8,77 +8,207 @@ import express from 'express';
 import { testOpenAIRealtime, openaiRealtimeEngine } from './engines/openaiRealtimeEngine';
 import { getBrainForEnvironment } from './brains/config';
 import { routeToAgent } from './agents/agentRouter';
-import { createDefaultContext, addToHistory } from './agents/types';
+import { createDefaultContext, addToHistory, AgentResult, ConversationContext } from './agents/types';
 import { startSession, endSession, addMessage, getSessionTranscripts } from './memory/transcriptStore';
+import { ApiResult, AGENT_CHANNEL_PATH, attachAgentChannel } from './agentChannel';
+import { createBatchHandler } from './outboxBatch';
+import { FrameEmitter, frameStream } from './frameStream';
+import { isPersonalizedReply } from './replyPersonalization';
 
 const app = express();
 const port = 3000;
 
 app.use(express.json());
 
+/**
+ * Split a response into sentence-sized chunks for streaming clients
+ */
+function splitIntoSentences(text: string): string[] {
+  const sentences = text.match(/[^.!?]+[.!?]+["')\]]*\s*|[^.!?]+$/g);
+  return sentences ? sentences.filter(sentence => sentence.length > 0) : [text];
+}
+
+/**
+ * Send a handler result over HTTP - stream frames as NDJSON, anything else as JSON
+ */
+async function sendResult(res: express.Response, result: ApiResult): Promise<void> {
+  if (!result.frames) {
+    res.status(result.status).json(result.body);
+    return;
+  }
+
+  res.status(result.status);
+  res.setHeader('Content-Type', 'application/x-ndjson');
+  res.setHeader('Cache-Control', 'no-cache');
+  for await (const frame of result.frames) {
+    res.write(JSON.stringify(frame) + '\n');
+  }
+  res.end();
+}
+
+/**
+ * Turns the voice agent abandoned because the user barged in (turnId -> time abandoned).
+ * The routed result of an abandoned turn is discarded instead of being recorded.
+ */
+const abandonedTurns = new Map<string, number>();
+const ABANDONED_TURN_TTL_MS = 5 * 60 * 1000;
+
+function pruneAbandonedTurns(): void {
+  const cutoff = Date.now() - ABANDONED_TURN_TTL_MS;
+  for (const [turnId, abandonedAt] of abandonedTurns) {
+    if (abandonedAt < cutoff) {
+      abandonedTurns.delete(turnId);
+    }
+  }
+}
+
 app.get('/health', (req, res) => {
   res.json({ status: 'ok', service: 'aimee-backend' });
 });
 
-// Session management endpoints for transcript storage
-app.post('/api/session/start', async (req, res) => {
+// Session management for transcript storage
+async function handleSessionStart(body: any): Promise<ApiResult> {
   try {
-    const { userId, isReconnection } = req.body;
+    const { userId, isReconnection, sessionId: requestedSessionId } = body;
 
     if (!userId || typeof userId !== 'string') {
-      return res.status(400).json({
-        success: false,
-        error: 'Missing or invalid "userId" field'
-      });
+      return {
+        status: 400,
+        body: {
+          success: false,
+          error: 'Missing or invalid "userId" field'
+        }
+      };
     }
 
-    const sessionId = await startSession(userId, isReconnection || false);
+    if (requestedSessionId !== undefined && typeof requestedSessionId !== 'string') {
+      return {
+        status: 400,
+        body: {
+          success: false,
+          error: 'Invalid "sessionId" field'
+        }
+      };
+    }
 
-    res.json({
-      success: true,
-      sessionId,
-      userId,
-      isReconnection: isReconnection || false,
-      timestamp: new Date().toISOString()
-    });
+    const sessionId = await startSession(userId, isReconnection || false, requestedSessionId);
+
+    return {
+      status: 200,
+      body: {
+        success: true,
+        sessionId,
+        userId,
+        isReconnection: isReconnection || false,
+        timestamp: new Date().toISOString()
+      }
+    };
   } catch (error) {
     console.error('Session start error:', error);
-    res.status(500).json({
-      success: false,
-      error: 'Failed to start session',
-      details: error instanceof Error ? error.message : 'Unknown error'
-    });
+    return {
+      status: 500,
+      body: {
+        success: false,
+        error: 'Failed to start session',
+        details: error instanceof Error ? error.message : 'Unknown error'
+      }
+    };
   }
-});
+}
 
-app.post('/api/session/end', async (req, res) => {
+async function handleSessionEnd(body: any): Promise<ApiResult> {
   try {
-    const { userId, sessionId } = req.body;
+    const { userId, sessionId } = body;
 
     if (!userId || !sessionId) {
-      return res.status(400).json({
-        success: false,
-        error: 'Missing userId or sessionId'
-      });
+      return {
+        status: 400,
+        body: {
+          success: false,
+          error: 'Missing userId or sessionId'
+        }
+      };
     }
 
     await endSession(userId, sessionId);
 
-    res.json({
-      success: true,
-      sessionId,
-      userId,
-      timestamp: new Date().toISOString()
-    });
+    return {
+      status: 200,
+      body: {
+        success: true,
+        sessionId,
+        userId,
+        timestamp: new Date().toISOString()
+      }
+    };
   } catch (error) {
     console.error('Session end error:', error);
-    res.status(500).json({
-      success: false,
-      error: 'Failed to end session',
-      details: error instanceof Error ? error.message : 'Unknown error'
-    });
+    return {
+      status: 500,
+      body: {
+        success: false,
+        error: 'Failed to end session',
+        details: error instanceof Error ? error.message : 'Unknown error'
+      }
+    };
   }
-});
+}
+
+// Append messages to a transcript session without routing (e.g. replies served from the agent's cache)
+async function handleSessionMessages(body: any): Promise<ApiResult> {
+  try {
+    const { userId, sessionId, messages } = body;
+
+    if (!userId || !sessionId || !Array.isArray(messages)) {
+      return {
+        status: 400,
+        body: {
+          success: false,
+          error: 'Missing userId, sessionId or messages'
+        }
+      };
+    }
+
+    for (const message of messages) {
+      if (!['user', 'assistant', 'system'].includes(message?.role) || typeof message?.content !== 'string') {
+        return {
+          status: 400,
+          body: {
+            success: false,
+            error: 'Each message needs a role (user, assistant or system) and string content'
+          }
+        };
+      }
+    }
+
+    for (const message of messages) {
+      await addMessage(userId, sessionId, message.role, message.content);
+    }
+
+    return {
+      status: 200,
+      body: {
+        success: true,
+        sessionId,
+        recorded: messages.length
+      }
+    };
+  } catch (error) {
+    console.error('Session messages error:', error);
+    return {
+      status: 500,
+      body: {
+        success: false,
+        error: 'Failed to record messages',
+        details: error instanceof Error ? error.message : 'Unknown error'
+      }
+    };
+  }
+}
+
+app.post('/api/session/start', async (req, res) => sendResult(res, await handleSessionStart(req.body)));
+app.post('/api/session/end', async (req, res) => sendResult(res, await handleSessionEnd(req.body)));
+app.post('/api/session/messages', async (req, res) => sendResult(res, await handleSessionMessages(req.body)));
 
 app.get('/api/transcripts/:userId', async (req, res) => {
   try {
@@ -180,24 +310,149 @@ app.get('/brain-status', (req, res) => {
   }
 });
 
-// AImee Multi-Agent Chat Endpoint
-app.post('/aimee-chat', async (req, res) => {
+function isTurnAbandoned(turnId?: string): boolean {
+  if (turnId && abandonedTurns.delete(turnId)) {
+    console.log('AImee Chat: Turn', turnId, 'abandoned - discarding response');
+    return true;
+  }
+  return false;
+}
+
+/**
+ * Record a routed reply to the transcript and build the response metadata
+ */
+async function recordChatReply(
+  result: AgentResult,
+  contextWithHistory: ConversationContext,
+  userId: string,
+  sessionId?: string
+): Promise<{ agent: string; metadata: Record<string, any> }> {
+  // Record assistant response to transcript (if sessionId provided)
+  if (sessionId) {
+    await addMessage(userId, sessionId, 'assistant', result.text);
+  }
+
+  // Add assistant response to history for next interactions
+  const finalContext = addToHistory(contextWithHistory, 'assistant', result.text);
+
+  console.log('AImee Chat: Response generated by', result.metadata?.routing?.selectedAgent || 'unknown agent');
+
+  const agent = result.metadata?.routing?.selectedAgent || result.metadata?.agent || 'unknown';
+
+  return {
+    agent,
+    metadata: {
+      ...result.metadata,
+      // Lets the voice agent share cached replies between users
+      personalized: isPersonalizedReply(agent, result, contextWithHistory),
+      userId: userId,
+      sessionId: sessionId || null,
+      timestamp: new Date().toISOString(),
+      conversationLength: finalContext.history.length
+    }
+  };
+}
+
+/**
+ * Route a chat turn, emitting stream frames (meta, delta..., done) as the reply is generated
+ *
+ * The selected agent's LLM tokens are forwarded as deltas while it generates,
+ * so speech can start on the first words rather than after the whole reply.
+ * Replies that aren't generated by a streaming LLM call (fallbacks, canned
+ * replies) are sent as sentence deltas once routing finishes.
+ */
+async function streamChatTurn(
+  emit: FrameEmitter,
+  input: string,
+  contextWithHistory: ConversationContext,
+  userId: string,
+  sessionId?: string,
+  turnId?: string
+): Promise<void> {
+  let streamingAgent: string | null = null;
+  let streamed = '';
+
+  const onText = (agentName: string, delta: string) => {
+    if (streamingAgent === null) {
+      streamingAgent = agentName;
+      emit({ type: 'meta', agent: agentName });
+    } else if (agentName !== streamingAgent) {
+      return;
+    }
+    const text = streamed ? delta : delta.trimStart();
+    if (text) {
+      streamed += text;
+      emit({ type: 'delta', text });
+    }
+  };
+
+  let result: AgentResult;
+  try {
+    result = await routeToAgent(input, { ...contextWithHistory, onText });
+  } catch (error) {
+    console.error('AImee Chat: Error processing request:', error);
+    emit({
+      type: 'error',
+      error: 'Internal server error during multi-agent processing',
+      details: error instanceof Error ? error.message : 'Unknown error'
+    });
+    return;
+  }
+
+  // The user interrupted this turn while it was being routed - nobody will hear the reply
+  if (isTurnAbandoned(turnId)) {
+    emit({ type: 'error', error: 'Turn abandoned' });
+    return;
+  }
+
+  const reply = result.text.trimStart();
+  if (!streamed) {
+    emit({ type: 'meta', agent: result.metadata?.routing?.selectedAgent || result.metadata?.agent || 'unknown' });
+    for (const sentence of splitIntoSentences(reply)) {
+      emit({ type: 'delta', text: sentence });
+    }
+  } else if (reply.startsWith(streamed)) {
+    const rest = reply.slice(streamed.length);
+    if (rest.trim()) {
+      emit({ type: 'delta', text: rest });
+    }
+  } else {
+    // The agent replaced what it had streamed (e.g. a fallback after an error) - it can't be unsaid,
+    // so the streamed text is what the user heard and what gets recorded
+    console.warn('AImee Chat: Reply differs from the streamed text - ending stream');
+    await recordChatReply({ ...result, text: streamed }, contextWithHistory, userId, sessionId);
+    emit({ type: 'error', error: 'Streamed response was replaced' });
+    return;
+  }
+
+  const { agent, metadata } = await recordChatReply(result, contextWithHistory, userId, sessionId);
+  emit({ type: 'done', success: true, agent, metadata });
+}
+
+// AImee Multi-Agent Chat
+async function handleChat(body: any): Promise<ApiResult> {
   try {
-    const { userId, input, context: contextOverrides, sessionId } = req.body;
+    const { userId, input, context: contextOverrides, sessionId, stream, turnId } = body;
 
     // Validate required fields
     if (!userId || typeof userId !== 'string') {
-      return res.status(400).json({
-        success: false,
-        error: 'Missing or invalid "userId" field in request body'
-      });
+      return {
+        status: 400,
+        body: {
+          success: false,
+          error: 'Missing or invalid "userId" field in request body'
+        }
+      };
     }
 
     if (!input || typeof input !== 'string') {
-      return res.status(400).json({
-        success: false,
-        error: 'Missing or invalid "input" field in request body'
-      });
+      return {
+        status: 400,
+        body: {
+          success: false,
+          error: 'Missing or invalid "input" field in request body'
+        }
+      };
     }
 
     console.log('AImee Chat: Processing request for user:', userId);
@@ -217,41 +472,77 @@ app.post('/aimee-chat', async (req, res) => {
     // Add user input to conversation history
     const contextWithHistory = addToHistory(context, 'user', input);
 
+    // Streaming clients get NDJSON frames (or channel frames) as the agent's LLM generates them
+    if (stream === true) {
+      return {
+        status: 200,
+        body: { success: true },
+        frames: frameStream(emit => streamChatTurn(emit, input, contextWithHistory, userId, sessionId, turnId))
+      };
+    }
+
     // Route to appropriate agent
     const result = await routeToAgent(input, contextWithHistory);
 
-    // Record assistant response to transcript (if sessionId provided)
-    if (sessionId) {
-      await addMessage(userId, sessionId, 'assistant', result.text);
+    // The user interrupted this turn while it was being routed - nobody will hear the reply
+    if (isTurnAbandoned(turnId)) {
+      return {
+        status: 409,
+        body: {
+          success: false,
+          error: 'Turn abandoned'
+        }
+      };
     }
 
-    // Add assistant response to history for next interactions
-    const finalContext = addToHistory(contextWithHistory, 'assistant', result.text);
-
-    console.log('AImee Chat: Response generated by', result.metadata?.routing?.selectedAgent || 'unknown agent');
+    const { agent, metadata } = await recordChatReply(result, contextWithHistory, userId, sessionId);
 
-    res.json({
-      success: true,
-      agent: result.metadata?.routing?.selectedAgent || result.metadata?.agent || 'unknown',
-      response: result.text,
-      metadata: {
-        ...result.metadata,
-        userId: userId,
-        sessionId: sessionId || null,
-        timestamp: new Date().toISOString(),
-        conversationLength: finalContext.history.length
+    return {
+      status: 200,
+      body: {
+        success: true,
+        agent,
+        response: result.text,
+        metadata
       }
-    });
+    };
 
   } catch (error) {
     console.error('AImee Chat: Error processing request:', error);
-    res.status(500).json({
-      success: false,
-      error: 'Internal server error during multi-agent processing',
-      details: error instanceof Error ? error.message : 'Unknown error'
-    });
+    return {
+      status: 500,
+      body: {
+        success: false,
+        error: 'Internal server error during multi-agent processing',
+        details: error instanceof Error ? error.message : 'Unknown error'
+      }
+    };
   }
-});
+}
+
+// Abandon an in-flight chat turn (the user barged in)
+async function handleChatAbandon(body: any): Promise<ApiResult> {
+  const { turnId } = body;
+
+  if (!turnId || typeof turnId !== 'string') {
+    return {
+      status: 400,
+      body: {
+        success: false,
+        error: 'Missing or invalid "turnId" field in request body'
+      }
+    };
+  }
+
+  pruneAbandonedTurns();
+  abandonedTurns.set(turnId, Date.now());
+  console.log('AImee Chat: Turn', turnId, 'marked abandoned');
+
+  return { status: 200, body: { success: true, turnId } };
+}
+
+app.post('/aimee-chat', async (req, res) => sendResult(res, await handleChat(req.body)));
+app.post('/aimee-chat/abandon', async (req, res) => sendResult(res, await handleChatAbandon(req.body)));
 
 // Agent testing endpoint (for debugging)
 app.post('/aimee-chat/debug', async (req, res) => {
@@ -290,38 +581,50 @@ app.post('/aimee-chat/debug', async (req, res) => {
   }
 });
 
-// AImee Arrival Endpoint - GPS-triggered location narratives
-app.post('/aimee-arrival', async (req, res) => {
+// AImee Arrival - GPS-triggered location narratives
+async function handleArrival(body: any): Promise<ApiResult> {
   try {
-    const { userId, markerId, markerName, location, mode } = req.body;
+    const { userId, markerId, markerName, location, mode } = body;
 
     // Validate required fields
     if (!userId || typeof userId !== 'string') {
-      return res.status(400).json({
-        success: false,
-        error: 'Missing or invalid "userId" field in request body'
-      });
+      return {
+        status: 400,
+        body: {
+          success: false,
+          error: 'Missing or invalid "userId" field in request body'
+        }
+      };
     }
 
     if (!markerId || typeof markerId !== 'string') {
-      return res.status(400).json({
-        success: false,
-        error: 'Missing or invalid "markerId" field in request body'
-      });
+      return {
+        status: 400,
+        body: {
+          success: false,
+          error: 'Missing or invalid "markerId" field in request body'
+        }
+      };
     }
 
     if (!markerName || typeof markerName !== 'string') {
-      return res.status(400).json({
-        success: false,
-        error: 'Missing or invalid "markerName" field in request body'
-      });
+      return {
+        status: 400,
+        body: {
+          success: false,
+          error: 'Missing or invalid "markerName" field in request body'
+        }
+      };
     }
 
     if (!location || typeof location.lat !== 'number' || typeof location.lng !== 'number') {
-      return res.status(400).json({
-        success: false,
-        error: 'Missing or invalid "location" field with lat/lng coordinates'
-      });
+      return {
+        status: 400,
+        body: {
+          success: false,
+          error: 'Missing or invalid "location" field with lat/lng coordinates'
+        }
+      };
     }
 
     console.log('AImee Arrival: Processing arrival at marker:', markerName);
@@ -352,45 +655,67 @@ app.post('/aimee-arrival', async (req, res) => {
 
     console.log('AImee Arrival: Narrative generated by', result.metadata?.routing?.selectedAgent || 'unknown agent');
 
-    res.json({
-      success: true,
-      markerId,
-      markerName,
-      agent: result.metadata?.routing?.selectedAgent || result.metadata?.agent || 'unknown',
-      response: result.text,
-      metadata: {
-        ...result.metadata,
-        userId,
+    return {
+      status: 200,
+      body: {
+        success: true,
         markerId,
-        location,
-        mode: mode || 'drive',
-        timestamp: new Date().toISOString(),
-        arrivalType: 'gps_triggered'
+        markerName,
+        agent: result.metadata?.routing?.selectedAgent || result.metadata?.agent || 'unknown',
+        response: result.text,
+        metadata: {
+          ...result.metadata,
+          userId,
+          markerId,
+          location,
+          mode: mode || 'drive',
+          timestamp: new Date().toISOString(),
+          arrivalType: 'gps_triggered'
+        }
       }
-    });
+    };
 
   } catch (error) {
     console.error('AImee Arrival: Error processing arrival request:', error);
-    res.status(500).json({
-      success: false,
-      error: 'Internal server error during arrival processing',
-      details: error instanceof Error ? error.message : 'Unknown error'
-    });
+    return {
+      status: 500,
+      body: {
+        success: false,
+        error: 'Internal server error during arrival processing',
+        details: error instanceof Error ? error.message : 'Unknown error'
+      }
+    };
   }
+}
+
+app.post('/aimee-arrival', async (req, res) => sendResult(res, await handleArrival(req.body)));
+
+// Apply a batch of outbox events in order, reporting a status per event (see outboxBatch)
+const handleBatch = createBatchHandler({
+  'session.start': handleSessionStart,
+  'session.end': handleSessionEnd,
+  'session.messages': handleSessionMessages,
+  'chat': handleChat
 });
 
-app.listen(port, () => {
+app.post('/api/batch', async (req, res) => sendResult(res, await handleBatch(req.body)));
+
+const server = app.listen(port, () => {
   console.log(`AImee Backend running on port ${port}`);
   console.log('Available endpoints:');
   console.log('  GET  /health - Health check');
   console.log('  POST /api/session/start - Start transcript session');
   console.log('  POST /api/session/end - End transcript session');
+  console.log('  POST /api/session/messages - Append messages to a transcript session');
+  console.log('  POST /api/batch - Apply a batch of queued agent events (session lifecycle, system messages)');
   console.log('  GET  /api/transcripts/:userId - Get user transcripts');
   console.log('  POST /realtime-test - Test OpenAI Realtime API');
   console.log('  GET  /brain-status - Brain configuration status');
-  console.log('  POST /aimee-chat - Multi-agent conversation endpoint');
+  console.log('  POST /aimee-chat - Multi-agent conversation endpoint (NDJSON with "stream": true)');
+  console.log('  POST /aimee-chat/abandon - Discard an in-flight chat turn');
   console.log('  POST /aimee-chat/debug - Agent routing debug information');
   console.log('  POST /aimee-arrival - GPS-triggered arrival narratives');
+  console.log(`  WS   ${AGENT_CHANNEL_PATH} - Multiplexed msgpack channel for agent workers`);
 
   // Log brain configuration on startup
   try {
@@ -401,4 +726,15 @@ app.listen(port, () => {
   } catch (error) {
     console.warn('Could not determine brain configuration on startup:', error);
   }
-});
\ No newline at end of file
+});
+
+// Persistent channel for agent workers - the same handlers as the HTTP routes above
+attachAgentChannel(server, {
+  'session.start': handleSessionStart,
+  'session.end': handleSessionEnd,
+  'session.messages': handleSessionMessages,
+  'chat': handleChat,
+  'chat.abandon': handleChatAbandon,
+  'arrival': handleArrival,
+  'batch': handleBatch
+});
@@ -112,24 +112,33 @@ describe('transcriptStore', () => {
       expect(() => new Date(session!.messages[0].timestamp)).not.toThrow();
     });
 
-    it('should handle non-existent user gracefully', async () => {
-      // Should not throw
-      await addMessage('nonexistent-user', 'fake-session-id', 'user', 'Hello');
+    it('should create the session for a new user on first message', async () => {
+      await addMessage('early-user', 'client-session-id', 'user', 'Hello');
 
-      // No sessions should be created
-      const sessions = await getSessionTranscripts('nonexistent-user');
-      expect(sessions.length).toBe(0);
+      const session = await getSession('early-user', 'client-session-id');
+      expect(session?.messages.length).toBe(1);
+      expect(session?.messages[0].content).toBe('Hello');
     });
 
-    it('should handle non-existent session gracefully', async () => {
+    it('should create a non-existent session without touching others', async () => {
       await startSession('existing-user');
 
-      // Should not throw
-      await addMessage('existing-user', 'wrong-session-id', 'user', 'Hello');
+      await addMessage('existing-user', 'other-session-id', 'user', 'Hello');
 
-      // Original session should be unaffected
       const sessions = await getSessionTranscripts('existing-user');
+      expect(sessions.length).toBe(2);
       expect(sessions[0].messages.length).toBe(0);
+      expect(sessions[1].messages.length).toBe(1);
+    });
+
+    it('should keep messages that arrived before the session was started', async () => {
+      await addMessage('greeting-user', 'client-session-id', 'assistant', 'Welcome back!');
+      await startSession('greeting-user', true, 'client-session-id');
+
+      const sessions = await getSessionTranscripts('greeting-user');
+      expect(sessions.length).toBe(1);
+      expect(sessions[0].isReconnection).toBe(true);
+      expect(sessions[0].messages[0].content).toBe('Welcome back!');
     });
   });
 
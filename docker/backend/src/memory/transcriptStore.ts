@@ -53,19 +53,32 @@ function saveDB(db: TranscriptDB) {
 
 /**
  * Start a new session for a user
+ * @param sessionId Client-chosen session id; starting an existing session again only updates its flags
  * @returns sessionId
  */
-export async function startSession(userId: string, isReconnection: boolean = false): Promise<string> {
+export async function startSession(userId: string, isReconnection: boolean = false, sessionId?: string): Promise<string> {
   const db = loadDB();
-  const sessionId = new Date().toISOString();
+  const startTime = new Date().toISOString();
+  sessionId = sessionId || startTime;
 
   if (!db.sessions[userId]) {
     db.sessions[userId] = [];
   }
 
+  const existing = db.sessions[userId].find(s => s.sessionId === sessionId);
+  if (existing) {
+    // Started before, or created by a message that arrived first (see addMessage)
+    if (existing.isReconnection !== isReconnection) {
+      existing.isReconnection = isReconnection;
+      saveDB(db);
+    }
+    console.log(`Transcript: Session ${sessionId} already started for user ${userId}`);
+    return sessionId;
+  }
+
   const newSession: Session = {
     sessionId,
-    startTime: sessionId,
+    startTime,
     isReconnection,
     messages: []
   };
@@ -78,7 +91,12 @@ export async function startSession(userId: string, isReconnection: boolean = fal
 }
 
 /**
- * Add a message to an existing session
+ * Add a message to a session
+ *
+ * The voice agent chooses session ids itself and delivers session.start
+ * write-behind, so a message can arrive before its session has been
+ * started. An unknown session is then created here; the later startSession
+ * call fills in its flags.
  */
 export async function addMessage(
   userId: string,
@@ -89,14 +107,19 @@ export async function addMessage(
   const db = loadDB();
 
   if (!db.sessions[userId]) {
-    console.warn(`Transcript: No sessions found for user ${userId}`);
-    return;
+    db.sessions[userId] = [];
   }
 
-  const session = db.sessions[userId].find(s => s.sessionId === sessionId);
+  let session = db.sessions[userId].find(s => s.sessionId === sessionId);
   if (!session) {
-    console.warn(`Transcript: Session ${sessionId} not found for user ${userId}`);
-    return;
+    session = {
+      sessionId,
+      startTime: new Date().toISOString(),
+      isReconnection: false,
+      messages: []
+    };
+    db.sessions[userId].push(session);
+    console.log(`Transcript: Created session ${sessionId} for user ${userId} on first message`);
   }
 
   const message: TranscriptMessage = {
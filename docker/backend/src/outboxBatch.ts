@@ -0,0 +1,86 @@
+import { ApiResult, ChannelHandler } from './agentChannel';
+
+/**
+ * Outbox Batch - write-behind delivery of the voice agent's queued events
+ *
+ * The agent's outbox sends session lifecycle events, transcript messages and
+ * system chats in batches:
+ *
+ *   { events: [{ id, op, body }, ...] }
+ *
+ * Events are applied in order with the same handlers as the HTTP routes, and
+ * each gets its own status. An event that failed with a 5xx is retried by
+ * the agent; anything else (including a 4xx) is final. Event ids already
+ * applied are remembered, so a batch resent after an agent restart isn't
+ * applied twice.
+ */
+
+const APPLIED_EVENT_TTL_MS = 24 * 60 * 60 * 1000;
+
+export interface BatchEventResult {
+  id: string;
+  status: number;
+  error?: string;
+}
+
+/**
+ * Create the batch handler for a set of operations
+ */
+export function createBatchHandler(handlers: Record<string, ChannelHandler>): ChannelHandler {
+  // eventId -> time applied
+  const appliedEvents = new Map<string, number>();
+
+  function pruneAppliedEvents(): void {
+    const cutoff = Date.now() - APPLIED_EVENT_TTL_MS;
+    for (const [eventId, appliedAt] of appliedEvents) {
+      if (appliedAt < cutoff) {
+        appliedEvents.delete(eventId);
+      } else {
+        break; // insertion order - the rest are newer
+      }
+    }
+  }
+
+  return async function handleBatch(body: any): Promise<ApiResult> {
+    const { events } = body || {};
+
+    if (!Array.isArray(events)) {
+      return {
+        status: 400,
+        body: {
+          success: false,
+          error: 'Missing or invalid "events" field in request body'
+        }
+      };
+    }
+
+    pruneAppliedEvents();
+    const results: BatchEventResult[] = [];
+
+    for (const event of events) {
+      const { id, op, body: eventBody } = event || {};
+
+      if (id && appliedEvents.has(id)) {
+        results.push({ id, status: 200 });
+        continue;
+      }
+
+      const handler = handlers[op];
+      if (!handler) {
+        results.push({ id, status: 400, error: `Unknown operation "${op}"` });
+        continue;
+      }
+
+      const result = await handler(eventBody || {});
+      results.push({ id, status: result.status, error: result.body.error });
+
+      if (id && result.status < 500) {
+        appliedEvents.set(id, Date.now());
+      }
+    }
+
+    console.log('Batch: Applied', results.filter(r => r.status < 300).length, 'of', events.length, 'events');
+
+    return { status: 200, body: { success: true, results } };
+  };
+}
@@ -0,0 +1,42 @@
+import { AgentResult, ConversationContext, createDefaultContext } from './agents/types';
+
+/**
+ * Reply Personalization - whether a chat reply depends on who asked
+ *
+ * The voice agent caches replies to common questions ("what is this place")
+ * and shares them between tourists at the same marker only when the backend
+ * marks them as not personalized ("personalized": false in the metadata).
+ *
+ * A reply is not personalized when it came from an agent that doesn't read
+ * stored user memory (Historian, Experience), without an error fallback, and
+ * the request carried nothing user-specific: no earlier conversation and the
+ * default response preferences. Everything else (the Memory Agent, the
+ * Navigator's location-dependent directions, error apologies) is personalized.
+ */
+
+// Agents whose replies come from the question and the marker, not the user
+const MEMORYLESS_AGENTS = new Set(['Historian', 'Experience']);
+
+const DEFAULT_PREFERENCES = createDefaultContext('').preferences || {};
+
+/**
+ * Whether a routed reply may depend on the user who asked
+ *
+ * @param agent - Name of the agent that produced the reply
+ * @param result - The agent's result
+ * @param context - Context the reply was generated with (including the user's input)
+ */
+export function isPersonalizedReply(agent: string, result: AgentResult, context: ConversationContext): boolean {
+  if (!MEMORYLESS_AGENTS.has(agent) || result.metadata?.error) {
+    return true;
+  }
+
+  // Only the question itself - no earlier turns the reply could refer back to
+  if (context.history.filter(message => message.role !== 'system').length > 1) {
+    return true;
+  }
+
+  const preferences = context.preferences || {};
+  return (preferences.verbosity || DEFAULT_PREFERENCES.verbosity) !== DEFAULT_PREFERENCES.verbosity ||
+    (preferences.tone || DEFAULT_PREFERENCES.tone) !== DEFAULT_PREFERENCES.tone;
+}
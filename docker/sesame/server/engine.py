@@ -0,0 +1,360 @@
+"""
+Inference engine for the Sesame AI Service
+
+Requests from every caller go into one asyncio queue. A scheduler task
+batches them at the level of decode steps (continuous batching): between
+every two steps of the running batch it admits queued requests, up to
+SESAME_MAX_BATCH_SIZE running at once, prefills them and decodes them
+together with the rest. Finished and abandoned requests leave the batch at
+the next step. Each step's audio is handed back to the request that asked
+for it as soon as it is produced, so streaming callers can start playback
+before their utterance is finished.
+
+A short request arriving behind a long narration therefore waits one decode
+step, not the whole narration. When the engine is idle, the first request
+waits up to SESAME_MAX_BATCH_WAIT_MS for others to prefill with it. Model
+calls run in a worker thread, one at a time, as on a single GPU.
+
+Admission control keeps overload from turning into unbounded latency:
+
+- SESAME_MAX_CONCURRENCY admitted, unfinished requests -> Saturated (429)
+- SESAME_MAX_QUEUE requests waiting for a batch       -> Saturated (503)
+- A request whose deadline passes before it is admitted to the batch is
+  dropped without reaching the model (DeadlineExceeded)
+
+Saturated carries a Retry-After estimate from the current queue and recent
+request times.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Any, AsyncIterator, Union
+
+import metrics
+from models import SpeechModel, SynthesisRequest
+
+# Configure logger
+logger = logging.getLogger("sesame-engine")
+
+class Saturated(Exception):
+    """Request refused at admission"""
+
+    def __init__(self, status: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+class DeadlineExceeded(Exception):
+    """The request's deadline passed before the model could start on it"""
+
+@dataclass
+class SynthesisResult:
+    """Audio for one request, with how it was produced"""
+    audio: bytes
+    sample_rate: int
+    batch_size: int
+    queue_ms: float
+    inference_ms: float
+
+@dataclass
+class _Pending:
+    request: SynthesisRequest
+    # PCM chunks, then None when done (or the exception that ended it)
+    chunks: "asyncio.Queue[Union[bytes, Exception, None]]" = field(default_factory=asyncio.Queue)
+    enqueued: float = field(default_factory=time.monotonic)
+    deadline: Optional[float] = None
+    started: float = 0.0
+    first_chunk: float = 0.0
+    finished: float = 0.0
+    batch_size: int = 0
+    # Model decoder state while running
+    state: Any = None
+    done: bool = False
+    abandoned: bool = False
+
+class InferenceEngine:
+    """Dynamic micro-batching scheduler in front of a SpeechModel"""
+
+    def __init__(self, model: SpeechModel):
+        self.model = model
+        self.max_batch_size = int(os.getenv("SESAME_MAX_BATCH_SIZE", "8"))
+        self.max_wait = float(os.getenv("SESAME_MAX_BATCH_WAIT_MS", "10")) / 1000
+        self.max_concurrency = int(os.getenv("SESAME_MAX_CONCURRENCY", "64"))
+        self.max_queue = int(os.getenv("SESAME_MAX_QUEUE", "32"))
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._scheduler: Optional[asyncio.Task] = None
+        self._running: List[_Pending] = []
+        self._in_flight = 0
+
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "prefills": 0,
+            "decode_steps": 0,
+            "cancelled": 0,
+            "errors": 0,
+            "rejected_concurrency": 0,
+            "rejected_queue": 0,
+            "expired": 0,
+        }
+        self.queue_ms = metrics.RollingPercentiles()
+        self.inference_ms = metrics.RollingPercentiles()
+        self.first_audio_ms = metrics.RollingPercentiles()
+        self.batch_sizes = metrics.RollingPercentiles()
+
+        logger.info("Inference Engine Configuration:")
+        logger.info(f"  Model: {model.name} ({model.sample_rate} Hz)")
+        logger.info(f"  Batch: up to {self.max_batch_size} running requests, {self.max_wait * 1000:.0f}ms max wait when idle")
+        logger.info(f"  Admission: {self.max_concurrency} in flight, {self.max_queue} queued")
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        """Start the scheduler (on the server's event loop) once the model is loaded"""
+        self._queue = asyncio.Queue()
+        self._scheduler = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._scheduler is not None:
+            self._scheduler.cancel()
+            await asyncio.gather(self._scheduler, return_exceptions=True)
+            self._scheduler = None
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue has likely drained"""
+        request_ms = self.inference_ms.percentiles().get("p50", 1000.0)
+        rounds = self.queue_depth / self.max_batch_size + 1
+        return max(1, math.ceil(rounds * request_ms / 1000))
+
+    def _reject(self, status: int, reason: str):
+        self.stats[f"rejected_{reason}"] += 1
+        metrics.REQUESTS_TOTAL.labels(outcome=f"rejected_{reason}").inc()
+        raise Saturated(status, reason, self.retry_after())
+
+    def check_admission(self, deadline: Optional[float] = None):
+        """
+        Check that a request would be admitted now
+
+        Args:
+            deadline: time.monotonic() after which the caller no longer wants the audio
+
+        Raises:
+            Saturated: Too many requests in flight or queued
+            DeadlineExceeded: The deadline has already passed
+        """
+        if self._queue is None:
+            raise RuntimeError("Inference engine not started")
+        if self._in_flight >= self.max_concurrency:
+            self._reject(429, "concurrency")
+        if self.queue_depth >= self.max_queue:
+            self._reject(503, "queue")
+        if deadline is not None and time.monotonic() >= deadline:
+            self.stats["expired"] += 1
+            metrics.REQUESTS_TOTAL.labels(outcome="expired").inc()
+            raise DeadlineExceeded("Deadline passed before admission")
+
+    def _submit(self, request: SynthesisRequest, deadline: Optional[float]) -> _Pending:
+        self.check_admission(deadline)
+        pending = _Pending(request=request, deadline=deadline)
+        self.stats["requests"] += 1
+        self._in_flight += 1
+        metrics.IN_FLIGHT.inc()
+        self._queue.put_nowait(pending)
+        metrics.QUEUE_DEPTH.inc()
+        return pending
+
+    async def _consume(self, pending: _Pending) -> AsyncIterator[bytes]:
+        outcome = "cancelled"
+        try:
+            while True:
+                chunk = await pending.chunks.get()
+                if chunk is None:
+                    outcome = "ok"
+                    return
+                if isinstance(chunk, Exception):
+                    outcome = "expired" if isinstance(chunk, DeadlineExceeded) else "error"
+                    raise chunk
+                if not pending.first_chunk:
+                    pending.first_chunk = time.monotonic()
+                    self.first_audio_ms.observe((pending.first_chunk - pending.enqueued) * 1000)
+                    metrics.FIRST_AUDIO_SECONDS.observe(pending.first_chunk - pending.enqueued)
+                yield chunk
+        finally:
+            # Caller finished or went away - stop decoding for it
+            pending.abandoned = True
+            self._in_flight -= 1
+            metrics.IN_FLIGHT.dec()
+            if outcome != "expired":  # counted where it expired
+                metrics.REQUESTS_TOTAL.labels(outcome=outcome).inc()
+
+    async def synthesize(self, request: SynthesisRequest, deadline: Optional[float] = None) -> SynthesisResult:
+        """
+        Queue a request and wait for all of its audio
+
+        Raises:
+            Saturated, DeadlineExceeded: see check_admission (a deadline may also pass while queued)
+        """
+        pending = self._submit(request, deadline)
+        audio = b"".join([chunk async for chunk in self._consume(pending)])
+        return SynthesisResult(
+            audio=audio,
+            sample_rate=self.model.sample_rate,
+            batch_size=pending.batch_size,
+            queue_ms=(pending.started - pending.enqueued) * 1000,
+            inference_ms=(pending.finished - pending.started) * 1000
+        )
+
+    async def stream(self, request: SynthesisRequest, deadline: Optional[float] = None) -> AsyncIterator[bytes]:
+        """
+        Queue a request and yield its audio as it is decoded
+
+        The request is admitted on the first iteration, so an unstarted
+        stream never holds a slot; check_admission() first to refuse early.
+        """
+        chunks = self._consume(self._submit(request, deadline))
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    def _take(self, pending: _Pending) -> _Pending:
+        metrics.QUEUE_DEPTH.dec()
+        return pending
+
+    async def _next_batch(self) -> List[_Pending]:
+        """Wait for a request while idle, then briefly for others to prefill with it"""
+        batch = [self._take(await self._queue.get())]
+        deadline = batch[0].enqueued + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # Take whatever else is already waiting, but don't wait for more
+                while len(batch) < self.max_batch_size and not self._queue.empty():
+                    batch.append(self._take(self._queue.get_nowait()))
+                break
+            try:
+                batch.append(self._take(await asyncio.wait_for(self._queue.get(), timeout=remaining)))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _admissible(self) -> List[_Pending]:
+        """Queued requests that fit into the running batch now"""
+        batch: List[_Pending] = []
+        while len(self._running) + len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._take(self._queue.get_nowait()))
+        return batch
+
+    def _finish(self, pending: _Pending, outcome: Union[Exception, None] = None):
+        if pending.done:
+            return
+        pending.done = True
+        pending.finished = time.monotonic()
+        pending.chunks.put_nowait(outcome)
+        if pending.started:
+            self.inference_ms.observe((pending.finished - pending.started) * 1000)
+            metrics.INFERENCE_SECONDS.observe(pending.finished - pending.started)
+
+    async def _admit(self, batch: List[_Pending]):
+        """Prefill newly admitted requests and add them to the running batch"""
+        # Callers that went away (client disconnected) don't need their audio
+        live = [p for p in batch if not p.abandoned]
+        self.stats["cancelled"] += len(batch) - len(live)
+
+        # Neither do callers whose deadline has passed - drop them before the model
+        now = time.monotonic()
+        expired = [p for p in live if p.deadline is not None and now >= p.deadline]
+        for p in expired:
+            self._finish(p, DeadlineExceeded("Deadline passed while queued"))
+        if expired:
+            self.stats["expired"] += len(expired)
+            metrics.REQUESTS_TOTAL.labels(outcome="expired").inc(len(expired))
+            live = [p for p in live if not p.done]
+        if not live:
+            return
+
+        started = time.monotonic()
+        try:
+            states = await asyncio.to_thread(self.model.prefill, [p.request for p in live])
+            if len(states) != len(live):
+                raise RuntimeError(f"Model returned {len(states)} states for {len(live)} requests")
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Inference Engine: Prefill of {len(live)} requests failed: {e}")
+            for p in live:
+                self._finish(p, e)
+            return
+
+        self.stats["prefills"] += 1
+        for p, state in zip(live, states):
+            p.state = state
+            p.started = started
+            p.batch_size = len(self._running) + len(live)
+            self.queue_ms.observe((started - p.enqueued) * 1000)
+            metrics.QUEUE_WAIT_SECONDS.observe(started - p.enqueued)
+        self._running.extend(live)
+
+    async def _step(self):
+        """Run one decode step for the running batch, handing out each request's audio"""
+        running = self._running
+        self.batch_sizes.observe(len(running))
+        metrics.BATCH_SIZE.observe(len(running))
+        try:
+            step = await asyncio.to_thread(self.model.decode, [p.state for p in running])
+            if len(step) != len(running):
+                raise RuntimeError(f"Model returned {len(step)} chunks for {len(running)} requests")
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Inference Engine: Decode step of {len(running)} requests failed: {e}")
+            for p in running:
+                self._finish(p, e)
+            self._running = []
+            return
+
+        self.stats["decode_steps"] += 1
+        for p, chunk in zip(running, step):
+            if p.abandoned:
+                continue
+            if chunk is None:
+                self._finish(p)
+            elif chunk:
+                p.chunks.put_nowait(chunk)
+
+        # Finished requests and callers that went away leave the batch
+        self._running = [p for p in running if not p.done and not p.abandoned]
+
+    async def _run(self):
+        while True:
+            if self._running:
+                # Join the running batch between two decode steps
+                batch = self._admissible()
+            else:
+                batch = await self._next_batch()
+            if batch:
+                await self._admit(batch)
+            if self._running:
+                await self._step()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "running": len(self._running),
+            "batch_size": self.batch_sizes.percentiles(),
+            "queue_ms": self.queue_ms.percentiles(),
+            "inference_ms": self.inference_ms.percentiles(),
+            "first_audio_ms": self.first_audio_ms.percentiles()
+        }
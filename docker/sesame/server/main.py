@@ -1,19 +1,145 @@
 #!/usr/bin/env python3
 
+import base64
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Header
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+
+import metrics
+import pcm_stream
+from engine import DeadlineExceeded, InferenceEngine, Saturated
+from model_manager import ModelManager
+from models import SynthesisRequest, load_model
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger("sesame")
+
+model = load_model(os.getenv("SESAME_MODEL", "standin"))
+engine = InferenceEngine(model)
+manager = ModelManager(model, engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Serve /health while the model loads and warms up in the background
+    manager.start()
+    yield
+    await manager.stop()
+    metrics.worker_exited()
+
+app = FastAPI(title="Sesame AI Service", lifespan=lifespan)
+
+class InferenceRequest(BaseModel):
+    text: str
+    speaker: int = 0
+
+def not_ready() -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"error": "Model not ready", "state": manager.state},
+        headers={"Retry-After": "5"}
+    )
+
+def saturated(e: Saturated) -> JSONResponse:
+    return JSONResponse(
+        status_code=e.status,
+        content={"error": "Sesame is saturated", "reason": e.reason},
+        headers={"Retry-After": str(e.retry_after)}
+    )
 
-app = FastAPI(title="Sesame AI Service")
+def deadline_exceeded() -> JSONResponse:
+    return JSONResponse(status_code=504, content={"error": "Deadline exceeded"})
+
+def parse_deadline(deadline_ms: Optional[str]) -> Optional[float]:
+    """X-Deadline-Ms: how many more milliseconds the caller will wait for audio"""
+    try:
+        return time.monotonic() + float(deadline_ms) / 1000 if deadline_ms else None
+    except ValueError:
+        return None
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok", "service": "sesame-ai"}
+    # Liveness: the process is up, whether or not the model is ready yet
+    return {"status": "ok", "service": "sesame-ai", "state": manager.state, "ready": manager.ready}
+
+@app.get("/ready")
+def readiness_check():
+    # Readiness: the model is loaded and warmed up
+    if not manager.ready:
+        return not_ready()
+    return {"status": "ready", "cold_start_ms": round(manager.cold_start_seconds * 1000)}
 
 @app.post("/inference")
-def inference(data: dict):
-    # Placeholder for Sesame AI inference logic
-    # Will be implemented in Phase 5
-    return {"response": "Sesame AI placeholder response"}
+async def inference(data: InferenceRequest, x_deadline_ms: Optional[str] = Header(None)):
+    if not manager.ready:
+        return not_ready()
+    # Batched with concurrent requests by the engine; audio is 16-bit mono PCM
+    try:
+        result = await engine.synthesize(
+            SynthesisRequest(text=data.text, speaker=data.speaker),
+            deadline=parse_deadline(x_deadline_ms)
+        )
+    except Saturated as e:
+        return saturated(e)
+    except DeadlineExceeded:
+        return deadline_exceeded()
+    return {
+        "audio": base64.b64encode(result.audio).decode("ascii"),
+        "format": "pcm_s16le",
+        "sample_rate": result.sample_rate,
+        "duration_ms": round(len(result.audio) / 2 / result.sample_rate * 1000),
+        "batch_size": result.batch_size,
+        "queue_ms": round(result.queue_ms, 1),
+        "inference_ms": round(result.inference_ms, 1)
+    }
+
+@app.post("/inference/stream")
+async def inference_stream(data: InferenceRequest, x_deadline_ms: Optional[str] = Header(None)):
+    if not manager.ready:
+        return not_ready()
+    deadline = parse_deadline(x_deadline_ms)
+    try:
+        engine.check_admission(deadline)
+    except Saturated as e:
+        return saturated(e)
+    except DeadlineExceeded:
+        return deadline_exceeded()
+
+    # Audio frames as they are decoded, with a small binary header (see pcm_stream)
+    async def body():
+        yield pcm_stream.stream_header(engine.model.sample_rate)
+        chunks = engine.stream(SynthesisRequest(text=data.text, speaker=data.speaker), deadline=deadline)
+        try:
+            async for chunk in chunks:
+                yield pcm_stream.frame(pcm_stream.AUDIO, chunk)
+        except Exception as e:
+            logger.error(f"Stream failed: {e}")
+            yield pcm_stream.frame(pcm_stream.ERROR, str(e).encode("utf-8"))
+            return
+        finally:
+            await chunks.aclose()
+        yield pcm_stream.frame(pcm_stream.END)
+
+    return StreamingResponse(body(), media_type=pcm_stream.MEDIA_TYPE)
+
+@app.get("/stats")
+def stats():
+    # This worker only; /metrics aggregates every worker
+    return {**engine.get_stats(), "model": manager.get_stats()}
+
+@app.get("/metrics")
+def prometheus_metrics():
+    content, content_type = metrics.render()
+    return Response(content=content, media_type=content_type)
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    metrics.clean_stale_files()
+    # Workers each run their own engine; weights are shared through the mapped files
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=int(os.getenv("SESAME_WORKERS", "1")))
+
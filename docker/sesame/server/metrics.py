@@ -0,0 +1,112 @@
+"""
+Metrics for the Sesame AI Service
+
+Prometheus metrics served on GET /metrics: queue depth, in-flight requests,
+running batch size, queue wait, inference time and first-audio time
+histograms, and request outcomes (including admission rejections and
+expired deadlines).
+
+uvicorn workers are separate processes, so metrics use prometheus_client's
+multiprocess mode: every worker writes to SESAME_METRICS_DIR and whichever
+worker is scraped aggregates all of them.
+
+Each worker also keeps rolling percentiles of its own recent requests for
+the JSON /stats endpoint.
+"""
+
+import os
+import logging
+from collections import deque
+from typing import Deque, Dict, Tuple
+
+METRICS_DIR = os.getenv("SESAME_METRICS_DIR", "/tmp/sesame-metrics")
+
+# Must be set before prometheus_client is imported, in every worker
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", METRICS_DIR)
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+
+# Configure logger
+logger = logging.getLogger("sesame-metrics")
+
+_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0, 8.0)
+
+REQUESTS_TOTAL = Counter(
+    "sesame_requests_total",
+    "Synthesis requests by outcome",
+    ["outcome"],
+)
+QUEUE_DEPTH = Gauge(
+    "sesame_queue_depth",
+    "Requests waiting for a batch",
+    multiprocess_mode="livesum",
+)
+IN_FLIGHT = Gauge(
+    "sesame_in_flight_requests",
+    "Admitted requests not yet finished",
+    multiprocess_mode="livesum",
+)
+BATCH_SIZE = Histogram(
+    "sesame_batch_size",
+    "Running requests per decode step",
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16, 24, 32),
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "sesame_queue_wait_seconds",
+    "Time from admission to the request's prefill",
+    buckets=_LATENCY_BUCKETS,
+)
+INFERENCE_SECONDS = Histogram(
+    "sesame_inference_seconds",
+    "Time from a request's prefill to its last audio",
+    buckets=_LATENCY_BUCKETS,
+)
+FIRST_AUDIO_SECONDS = Histogram(
+    "sesame_first_audio_seconds",
+    "Time from admission to the request's first audio chunk",
+    buckets=_LATENCY_BUCKETS,
+)
+
+class RollingPercentiles:
+    """Percentiles over the most recent observations"""
+
+    def __init__(self, size: int = 1000):
+        self._values: Deque[float] = deque(maxlen=size)
+
+    def observe(self, value: float):
+        self._values.append(value)
+
+    def percentiles(self) -> Dict[str, float]:
+        if not self._values:
+            return {}
+        values = sorted(self._values)
+        pick = lambda q: round(values[min(len(values) - 1, int(len(values) * q))], 1)
+        return {"p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99), "count": len(values)}
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def clean_stale_files():
+    """Remove metric files of workers from a previous run (call once, before starting workers)"""
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    for filename in os.listdir(metrics_dir):
+        pid = filename.rsplit("_", 1)[-1].split(".")[0]
+        if pid.isdigit() and not _pid_alive(int(pid)):
+            os.remove(os.path.join(metrics_dir, filename))
+
+def worker_exited():
+    """Drop this worker's live gauges from the aggregate"""
+    multiprocess.mark_process_dead(os.getpid())
+
+def render() -> Tuple[bytes, str]:
+    """Aggregated metrics of all workers, in the Prometheus text format"""
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
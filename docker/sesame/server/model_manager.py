@@ -0,0 +1,156 @@
+"""
+Model lifecycle for the Sesame AI Service
+
+Loads the model in the background once the server is up, so /health answers
+straight away (liveness) while /ready reports whether requests can be served
+(readiness):
+
+    loading  -> weights are mapped and the model is built
+    warming  -> one warmup inference runs through the engine
+    ready    -> requests are served
+    failed   -> loading or warmup raised; see "error"
+
+Weights are memory-mapped read-only from SESAME_MODEL_DIR (the /app/models
+volume). With several uvicorn workers (SESAME_WORKERS) every process maps
+the same files, so the weights sit once in the page cache instead of once
+per worker; each worker's RSS counts them as shared file pages (RssFile)
+rather than private memory (RssAnon).
+
+Cold start (process start to ready) and resident memory are reported by
+get_stats() and logged when the model becomes ready.
+"""
+
+import asyncio
+import logging
+import mmap
+import os
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+from engine import InferenceEngine
+from models import SpeechModel, SynthesisRequest
+
+# Configure logger
+logger = logging.getLogger("sesame-model-manager")
+
+# Module import is as close to process start as the server gets
+_PROCESS_STARTED = time.monotonic()
+
+LOADING = "loading"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+def memory_usage() -> Dict[str, int]:
+    """Resident memory of this process in bytes (Linux /proc), by kind"""
+    fields = {"VmRSS": "rss", "RssAnon": "anon", "RssFile": "file", "RssShmem": "shmem"}
+    usage: Dict[str, int] = {}
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in fields:
+                    usage[fields[name]] = int(value.split()[0]) * 1024
+    except OSError:
+        pass
+    return usage
+
+class ModelManager:
+    """Loads, warms up and reports on the model behind an inference engine"""
+
+    def __init__(self, model: SpeechModel, engine: InferenceEngine):
+        self.model = model
+        self.engine = engine
+        self.model_dir = Path(os.getenv("SESAME_MODEL_DIR", "/app/models"))
+        self.warmup_text = os.getenv("SESAME_WARMUP_TEXT", "Welcome aboard, let's get started.")
+
+        self.state = LOADING
+        self.error: Optional[str] = None
+        self.load_seconds = 0.0
+        self.warmup_seconds = 0.0
+        self.cold_start_seconds = 0.0
+        self.mapped_bytes = 0
+
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        logger.info("Model Manager Configuration:")
+        logger.info(f"  Model Directory: {self.model_dir}")
+        logger.info(f"  Worker PID: {os.getpid()}")
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def start(self):
+        """Load and warm up in the background (on the server's event loop)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._load_and_warm())
+
+    def _map_weights(self) -> Dict[str, mmap.mmap]:
+        """Map every file in the model directory read-only (shared with other workers)"""
+        maps: Dict[str, mmap.mmap] = {}
+        if not self.model_dir.is_dir():
+            logger.warning(f"Model Manager: {self.model_dir} not found - loading without weight files")
+            return maps
+
+        for path in sorted(p for p in self.model_dir.rglob("*") if p.is_file()):
+            if path.stat().st_size == 0:
+                continue  # empty files can't be mapped
+            with open(path, "rb") as f:
+                maps[str(path.relative_to(self.model_dir))] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return maps
+
+    async def _load_and_warm(self):
+        try:
+            started = time.monotonic()
+            self._maps = await asyncio.to_thread(self._map_weights)
+            self.mapped_bytes = sum(len(m) for m in self._maps.values())
+            await asyncio.to_thread(self.model.load, self._maps)
+            self.load_seconds = time.monotonic() - started
+            logger.info(
+                f"Model Manager: Loaded {self.model.name} in {self.load_seconds:.2f}s "
+                f"({len(self._maps)} files, {self.mapped_bytes / 1024 / 1024:.1f} MB mapped)"
+            )
+
+            self.state = WARMING
+            await self.engine.start()
+            started = time.monotonic()
+            await self.engine.synthesize(SynthesisRequest(text=self.warmup_text))
+            self.warmup_seconds = time.monotonic() - started
+
+            self.cold_start_seconds = time.monotonic() - _PROCESS_STARTED
+            self.state = READY
+            rss = memory_usage()
+            logger.info(
+                f"Model Manager: Ready - cold start {self.cold_start_seconds:.2f}s "
+                f"(load {self.load_seconds:.2f}s, warmup {self.warmup_seconds:.2f}s), "
+                f"RSS {rss.get('rss', 0) / 1024 / 1024:.0f} MB "
+                f"({rss.get('anon', 0) / 1024 / 1024:.0f} MB private, {rss.get('file', 0) / 1024 / 1024:.0f} MB shared file)"
+            )
+        except Exception as e:
+            self.state = FAILED
+            self.error = str(e)
+            logger.error(f"Model Manager: Failed to start model: {e}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.engine.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "error": self.error,
+            "model": self.model.name,
+            "pid": os.getpid(),
+            "cold_start_ms": round(self.cold_start_seconds * 1000),
+            "load_ms": round(self.load_seconds * 1000),
+            "warmup_ms": round(self.warmup_seconds * 1000),
+            "weight_files": len(self._maps),
+            "mapped_bytes": self.mapped_bytes,
+            "memory": memory_usage()
+        }
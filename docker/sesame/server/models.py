@@ -0,0 +1,182 @@
+"""
+Speech models for the Sesame AI Service
+
+The inference engine drives a SpeechModel one decode step at a time:
+newly admitted requests are prefilled, then every running request gets one
+step of audio per decode() call. Requests join and leave the running batch
+between steps. Models are selected with SESAME_MODEL:
+
+    standin               CPU stand-in (tone audio with simulated batch cost)
+    package.module:Class  any SpeechModel implementation on the Python path
+
+Audio is 16-bit little-endian mono PCM at the model's sample rate.
+Weights are memory-mapped by the model manager and handed to load().
+"""
+
+import abc
+import importlib
+import logging
+import math
+import os
+import mmap
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# Configure logger
+logger = logging.getLogger("sesame-models")
+
+@dataclass
+class SynthesisRequest:
+    """One utterance to synthesize"""
+    text: str
+    speaker: int = 0
+
+class SpeechModel(abc.ABC):
+    """Interface for models behind the inference engine"""
+
+    name = "base"
+    sample_rate = 24000
+
+    def load(self, weights: Dict[str, mmap.mmap]):
+        """
+        Load the model (called once, before warmup)
+
+        Args:
+            weights: Read-only memory maps of the files in the model directory,
+                by relative path. Build tensors on top of these buffers rather
+                than copying them, so worker processes share the pages.
+        """
+
+    @abc.abstractmethod
+    def generate(self, batch: List[SynthesisRequest]) -> List[bytes]:
+        """
+        Synthesize a batch of utterances in one forward pass
+
+        Runs on the engine's worker thread, one batch at a time.
+
+        Returns:
+            One PCM clip per request, in request order
+        """
+
+    def prefill(self, batch: List[SynthesisRequest]) -> List[Any]:
+        """
+        Start decoding newly admitted requests
+
+        Runs on the engine's worker thread between decode steps, so new
+        requests join the running batch instead of waiting for it to finish.
+        Models that can't decode incrementally synthesize the whole clips
+        here and hand each out in a single decode step.
+
+        Returns:
+            One decoder state per request, in request order, for decode()
+        """
+        return [_WholeClip(audio) for audio in self.generate(batch)]
+
+    def decode(self, states: List[Any]) -> List[Optional[bytes]]:
+        """
+        Run one decode step for the running requests
+
+        Args:
+            states: Decoder states (from prefill) of the requests still running;
+                the set changes between steps as requests join and finish
+
+        Returns:
+            One entry per state, in order: the PCM produced for it in this
+            step, or None once it has finished
+        """
+        step = []
+        for state in states:
+            step.append(state.audio)
+            state.audio = None
+        return step
+
+@dataclass
+class _WholeClip:
+    """Decoder state of a model without incremental decoding"""
+    audio: Optional[bytes]
+
+@dataclass
+class _StandInState:
+    clip: bytes
+    offset: int = 0
+
+class StandInModel(SpeechModel):
+    """
+    CPU stand-in for the Sesame model
+
+    Each forward pass (a prefill, or one decode step for the running batch)
+    costs a fixed time plus a smaller per-utterance time, like on a GPU, so
+    batching behaves as it would with the real model.
+    """
+
+    name = "standin"
+
+    def __init__(self):
+        self.batch_ms = float(os.getenv("STANDIN_BATCH_MS", "40"))
+        self.item_ms = float(os.getenv("STANDIN_ITEM_MS", "5"))
+        self.audio_ms_per_char = float(os.getenv("STANDIN_AUDIO_MS_PER_CHAR", "60"))
+        self.step_ms = float(os.getenv("STANDIN_STEP_MS", "20"))
+        self.chunk_ms = float(os.getenv("STANDIN_CHUNK_MS", "240"))
+
+        logger.info("Stand-in Model Configuration:")
+        logger.info(f"  Cost: {self.batch_ms}ms per batch + {self.item_ms}ms per utterance")
+        logger.info(f"  Audio: {self.audio_ms_per_char}ms per character")
+        logger.info(f"  Streaming: {self.chunk_ms}ms chunks, {self.step_ms}ms per decode step")
+
+    def load(self, weights: Dict[str, mmap.mmap]):
+        # Fault in every page, as building tensors over the maps would
+        touched = 0
+        for mapped in weights.values():
+            for offset in range(0, len(mapped), mmap.PAGESIZE):
+                touched += mapped[offset]
+        logger.info(f"Stand-in model loaded {len(weights)} weight files")
+
+    def _tone(self, speaker: int, samples: int) -> bytes:
+        # One period of a quiet tone (pitch per speaker), repeated to length
+        period = 120 + 10 * (speaker % 8)
+        cycle = array("h", (int(3000 * math.sin(2 * math.pi * i / period)) for i in range(period)))
+        repeats = samples // period + 1
+        return (cycle * repeats)[:samples].tobytes()
+
+    def _clip(self, request: SynthesisRequest) -> bytes:
+        duration_ms = max(200.0, len(request.text) * self.audio_ms_per_char)
+        return self._tone(request.speaker, int(self.sample_rate * duration_ms / 1000))
+
+    def generate(self, batch: List[SynthesisRequest]) -> List[bytes]:
+        time.sleep((self.batch_ms + self.item_ms * len(batch)) / 1000)
+        return [self._clip(request) for request in batch]
+
+    def prefill(self, batch: List[SynthesisRequest]) -> List[Any]:
+        time.sleep((self.batch_ms + self.item_ms * len(batch)) / 1000)
+        return [_StandInState(clip=self._clip(request)) for request in batch]
+
+    def decode(self, states: List[Any]) -> List[Optional[bytes]]:
+        # One chunk of audio per running request
+        time.sleep((self.step_ms + self.item_ms * len(states)) / 1000)
+        chunk_bytes = int(self.sample_rate * self.chunk_ms / 1000) * 2
+        step: List[Optional[bytes]] = []
+        for state in states:
+            if state.offset >= len(state.clip):
+                step.append(None)
+                continue
+            step.append(state.clip[state.offset:state.offset + chunk_bytes])
+            state.offset += chunk_bytes
+        return step
+
+def load_model(spec: str) -> SpeechModel:
+    """
+    Create the model named by SESAME_MODEL
+
+    Args:
+        spec: "standin" or "package.module:ClassName"
+    """
+    if spec == "standin":
+        return StandInModel()
+
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"SESAME_MODEL must be 'standin' or 'module:Class', got '{spec}'")
+    model_class = getattr(importlib.import_module(module_name), class_name)
+    return model_class()
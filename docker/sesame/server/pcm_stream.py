@@ -0,0 +1,33 @@
+"""
+Raw PCM stream format for the Sesame AI Service
+
+POST /inference/stream answers with a chunked application/octet-stream body:
+a stream header, then frames as the engine decodes them. All integers are
+little-endian.
+
+    stream header (12 bytes)   b"SPCM" | uint32 sample_rate | uint16 channels | uint16 bits_per_sample
+    frame header (5 bytes)     uint8 kind | uint32 payload_length
+    frame payload              kind 1 (AUDIO): PCM samples
+                               kind 2 (END):   empty - the utterance is complete
+                               kind 3 (ERROR): UTF-8 error message
+
+A stream that ends without an END or ERROR frame was cut off.
+"""
+
+import struct
+
+MAGIC = b"SPCM"
+STREAM_HEADER = struct.Struct("<4sIHH")
+FRAME_HEADER = struct.Struct("<BI")
+
+AUDIO = 1
+END = 2
+ERROR = 3
+
+MEDIA_TYPE = "application/octet-stream"
+
+def stream_header(sample_rate: int, channels: int = 1, bits_per_sample: int = 16) -> bytes:
+    return STREAM_HEADER.pack(MAGIC, sample_rate, channels, bits_per_sample)
+
+def frame(kind: int, payload: bytes = b"") -> bytes:
+    return FRAME_HEADER.pack(kind, len(payload)) + payload
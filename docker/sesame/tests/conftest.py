@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Server modules are imported flat, as the service runs them (python server/main.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server"))
+
+# Keep multiprocess metric files out of the service's directory
+os.environ.setdefault("SESAME_METRICS_DIR", tempfile.mkdtemp(prefix="sesame-metrics-"))
@@ -0,0 +1,168 @@
+import asyncio
+import time
+
+import pytest
+
+from engine import DeadlineExceeded, InferenceEngine, Saturated
+from models import SpeechModel, StandInModel, SynthesisRequest
+
+LONG_TEXT = "x" * 510
+
+@pytest.fixture
+def make_engine(monkeypatch):
+    def make(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+        return InferenceEngine(StandInModel())
+    return make
+
+async def _started(engine: InferenceEngine) -> InferenceEngine:
+    await engine.start()
+    return engine
+
+async def _first_chunk(stream) -> float:
+    started = time.monotonic()
+    await stream.__anext__()
+    return time.monotonic() - started
+
+def test_concurrent_requests_prefill_together(make_engine):
+    async def scenario():
+        engine = await _started(make_engine(SESAME_MAX_BATCH_WAIT_MS=50))
+        results = await asyncio.gather(*(engine.synthesize(SynthesisRequest(text="hello there")) for _ in range(4)))
+        await engine.stop()
+        return engine, results
+
+    engine, results = asyncio.run(scenario())
+    assert [r.batch_size for r in results] == [4, 4, 4, 4]
+    assert engine.stats["prefills"] == 1
+    assert all(r.audio for r in results)
+
+def test_short_request_joins_running_long_stream(make_engine):
+    async def scenario():
+        engine = await _started(make_engine())
+        long_stream = engine.stream(SynthesisRequest(text=LONG_TEXT))
+        await long_stream.__anext__()
+        await asyncio.sleep(0.2)  # well into the narration
+
+        short_stream = engine.stream(SynthesisRequest(text="Turn left."))
+        first_audio = await _first_chunk(short_stream)
+        rest = [chunk async for chunk in short_stream]
+        still_running = engine.get_stats()["running"]
+
+        await long_stream.aclose()
+        await engine.stop()
+        return first_audio, rest, still_running
+
+    first_audio, rest, still_running = asyncio.run(scenario())
+    assert first_audio < 0.4
+    assert rest  # "Turn left." is more than one chunk of audio
+    assert still_running == 1  # the narration kept going alongside it
+
+def test_deadline_passing_in_queue_expires_request(make_engine):
+    async def scenario():
+        engine = await _started(make_engine(SESAME_MAX_BATCH_SIZE=1))
+        busy = asyncio.create_task(engine.synthesize(SynthesisRequest(text="x" * 20)))
+        await asyncio.sleep(0.01)
+        with pytest.raises(DeadlineExceeded):
+            await engine.synthesize(SynthesisRequest(text="late"), deadline=time.monotonic() + 0.03)
+        await busy
+        await engine.stop()
+        return engine
+
+    engine = asyncio.run(scenario())
+    assert engine.stats["expired"] == 1
+    assert engine.in_flight == 0
+
+def test_abandoned_stream_leaves_batch_and_frees_slot(make_engine):
+    async def scenario():
+        engine = await _started(make_engine())
+        stream = engine.stream(SynthesisRequest(text=LONG_TEXT))
+        await stream.__anext__()
+        await stream.aclose()
+        in_flight = engine.in_flight
+        await asyncio.sleep(0.1)  # a decode step or two
+        running = engine.get_stats()["running"]
+        await engine.stop()
+        return in_flight, running
+
+    in_flight, running = asyncio.run(scenario())
+    assert in_flight == 0
+    assert running == 0
+
+def test_request_abandoned_while_queued_never_runs(make_engine):
+    async def scenario():
+        engine = await _started(make_engine(SESAME_MAX_BATCH_SIZE=1))
+        busy = asyncio.create_task(engine.synthesize(SynthesisRequest(text="x" * 20)))
+        await asyncio.sleep(0.01)
+        queued = asyncio.create_task(engine.synthesize(SynthesisRequest(text="never mind")))
+        await asyncio.sleep(0.01)
+        queued.cancel()
+        await busy
+        await asyncio.sleep(0.05)
+        await engine.stop()
+        return engine
+
+    engine = asyncio.run(scenario())
+    assert engine.stats["cancelled"] == 1
+    assert engine.stats["prefills"] == 1
+
+def test_admission_rejects_over_concurrency(make_engine):
+    async def scenario():
+        engine = await _started(make_engine(SESAME_MAX_CONCURRENCY=1))
+        busy = asyncio.create_task(engine.synthesize(SynthesisRequest(text="hello")))
+        await asyncio.sleep(0)
+        with pytest.raises(Saturated) as rejected:
+            engine.check_admission()
+        await busy
+        await engine.stop()
+        return rejected.value
+
+    rejected = asyncio.run(scenario())
+    assert (rejected.status, rejected.reason) == (429, "concurrency")
+    assert rejected.retry_after >= 1
+
+def test_admission_rejects_full_queue(make_engine):
+    async def scenario():
+        engine = await _started(make_engine(SESAME_MAX_QUEUE=1, SESAME_MAX_BATCH_SIZE=1))
+        busy = asyncio.create_task(engine.synthesize(SynthesisRequest(text="x" * 20)))
+        await asyncio.sleep(0.01)
+        queued = asyncio.create_task(engine.synthesize(SynthesisRequest(text="hello")))
+        await asyncio.sleep(0)
+        with pytest.raises(Saturated) as rejected:
+            engine.check_admission()
+        await asyncio.gather(busy, queued)
+        await engine.stop()
+        return rejected.value
+
+    rejected = asyncio.run(scenario())
+    assert (rejected.status, rejected.reason) == (503, "queue")
+
+def test_admission_rejects_past_deadline(make_engine):
+    async def scenario():
+        engine = await _started(make_engine())
+        with pytest.raises(DeadlineExceeded):
+            engine.check_admission(time.monotonic() - 1)
+        await engine.stop()
+
+    asyncio.run(scenario())
+
+class _WholeClipModel(SpeechModel):
+    """A model that only implements generate()"""
+
+    name = "whole-clip"
+
+    def generate(self, batch):
+        return [request.text.encode("utf-8") for request in batch]
+
+def test_speech_model_requires_generate():
+    with pytest.raises(TypeError):
+        SpeechModel()
+
+def test_model_without_incremental_decoding_streams_whole_clips():
+    async def scenario():
+        engine = await _started(InferenceEngine(_WholeClipModel()))
+        chunks = [chunk async for chunk in engine.stream(SynthesisRequest(text="abcd"))]
+        await engine.stop()
+        return chunks
+
+    assert asyncio.run(scenario()) == [b"abcd"]
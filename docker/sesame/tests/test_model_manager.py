@@ -0,0 +1,124 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+from engine import InferenceEngine
+from model_manager import FAILED, LOADING, READY, WARMING, ModelManager
+from models import StandInModel
+
+class RecordingModel(StandInModel):
+    """Stand-in that records the weights it was given and the manager state it ran in"""
+
+    def __init__(self, fail: bool = False):
+        super().__init__()
+        self.batch_ms = self.step_ms = 1
+        self.item_ms = 0
+        self.fail = fail
+        self.manager = None
+        self.weights = {}
+        self.states = []
+
+    def load(self, weights):
+        self.states.append(("load", self.manager.state))
+        if self.fail:
+            raise RuntimeError("weights are corrupt")
+        self.weights = {name: bytes(mapped) for name, mapped in weights.items()}
+
+    def prefill(self, batch):
+        self.states.append(("warmup", self.manager.state))
+        return super().prefill(batch)
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("SESAME_MODEL_DIR", str(tmp_path))
+    return tmp_path
+
+def _start(model) -> ModelManager:
+    manager = ModelManager(model, InferenceEngine(model))
+    model.manager = manager
+
+    async def scenario():
+        assert manager.state == LOADING
+        manager.start()
+        await manager._task
+        await manager.stop()
+
+    asyncio.run(scenario())
+    return manager
+
+def test_loads_then_warms_up_then_is_ready(model_dir):
+    model = RecordingModel()
+    manager = _start(model)
+
+    assert model.states == [("load", LOADING), ("warmup", WARMING)]
+    assert manager.state == READY
+    assert manager.ready
+
+    stats = manager.get_stats()
+    assert stats["state"] == READY
+    assert stats["error"] is None
+    assert stats["model"] == "standin"
+    assert stats["cold_start_ms"] >= stats["load_ms"] + stats["warmup_ms"] - 1
+    assert set(stats) >= {"pid", "weight_files", "mapped_bytes", "memory"}
+
+def test_maps_weight_files_skipping_empty_ones(model_dir):
+    (model_dir / "model.safetensors").write_bytes(b"w" * 300)
+    (model_dir / "tokenizer").mkdir()
+    (model_dir / "tokenizer" / "vocab.bin").write_bytes(b"v" * 40)
+    (model_dir / "EMPTY").write_bytes(b"")
+
+    model = RecordingModel()
+    manager = _start(model)
+
+    assert model.weights == {"model.safetensors": b"w" * 300, "tokenizer/vocab.bin": b"v" * 40}
+    stats = manager.get_stats()
+    assert stats["weight_files"] == 2
+    assert stats["mapped_bytes"] == 340
+
+def test_missing_model_dir_loads_without_weights(tmp_path, monkeypatch):
+    monkeypatch.setenv("SESAME_MODEL_DIR", str(tmp_path / "missing"))
+    manager = _start(RecordingModel())
+
+    assert manager.state == READY
+    assert manager.get_stats()["weight_files"] == 0
+
+def test_failed_load_is_reported(model_dir):
+    model = RecordingModel(fail=True)
+    manager = _start(model)
+
+    assert model.states == [("load", LOADING)]
+    assert manager.state == FAILED
+    assert not manager.ready
+    stats = manager.get_stats()
+    assert stats["state"] == FAILED
+    assert stats["error"] == "weights are corrupt"
+    assert stats["cold_start_ms"] == 0
+
+@pytest.mark.parametrize("state", [LOADING, WARMING, FAILED])
+def test_health_is_live_but_not_ready_until_the_model_is(monkeypatch, state):
+    monkeypatch.setattr(main.manager, "state", state)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://sesame") as client:
+            return await client.get("/health"), await client.get("/ready")
+
+    health, ready = asyncio.run(scenario())
+    assert health.status_code == 200
+    assert health.json() == {"status": "ok", "service": "sesame-ai", "state": state, "ready": False}
+    assert ready.status_code == 503
+    assert ready.headers["Retry-After"] == "5"
+    assert ready.json()["state"] == state
+
+def test_ready_reports_the_cold_start(monkeypatch):
+    monkeypatch.setattr(main.manager, "state", READY)
+    monkeypatch.setattr(main.manager, "cold_start_seconds", 1.25)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://sesame") as client:
+            return await client.get("/ready")
+
+    ready = asyncio.run(scenario())
+    assert ready.status_code == 200
+    assert ready.json() == {"status": "ready", "cold_start_ms": 1250}
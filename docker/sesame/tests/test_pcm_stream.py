@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import main
+import pcm_stream
+
+class Client:
+    """Requests against the app in-process, with its lifespan (model load and warmup) running"""
+
+    def __init__(self):
+        # Keep the stand-in model fast
+        main.model.batch_ms = main.model.step_ms = 1
+        main.model.item_ms = 0
+
+        self.loop = asyncio.new_event_loop()
+        self._lifespan = main.lifespan(main.app)
+        self._http = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://sesame")
+        self.loop.run_until_complete(self._lifespan.__aenter__())
+
+    def get(self, path: str, **kwargs) -> httpx.Response:
+        return self.loop.run_until_complete(self._http.get(path, **kwargs))
+
+    def post(self, path: str, **kwargs) -> httpx.Response:
+        return self.loop.run_until_complete(self._http.post(path, **kwargs))
+
+    def close(self):
+        self.loop.run_until_complete(self._http.aclose())
+        self.loop.run_until_complete(self._lifespan.__aexit__(None, None, None))
+        self.loop.close()
+
+@pytest.fixture(scope="module")
+def client():
+    client = Client()
+    deadline = time.monotonic() + 10
+    while client.get("/ready").status_code != 200:
+        assert time.monotonic() < deadline, "model never became ready"
+        client.loop.run_until_complete(asyncio.sleep(0.02))
+    yield client
+    client.close()
+
+def _parse(body: bytes):
+    """Split a /inference/stream body into its header and (kind, payload) frames"""
+    header = pcm_stream.STREAM_HEADER.unpack_from(body)
+    frames = []
+    offset = pcm_stream.STREAM_HEADER.size
+    while offset < len(body):
+        kind, length = pcm_stream.FRAME_HEADER.unpack_from(body, offset)
+        offset += pcm_stream.FRAME_HEADER.size
+        frames.append((kind, body[offset:offset + length]))
+        offset += length
+    return header, frames
+
+def test_stream_sends_header_then_audio_frames_then_end(client):
+    response = client.post("/inference/stream", json={"text": "Turn left at the lighthouse.", "speaker": 1})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == pcm_stream.MEDIA_TYPE
+    header, frames = _parse(response.content)
+    assert header == (pcm_stream.MAGIC, main.engine.model.sample_rate, 1, 16)
+    kinds = [kind for kind, _ in frames]
+    assert kinds[-1] == pcm_stream.END
+    assert len(kinds) > 2 and set(kinds[:-1]) == {pcm_stream.AUDIO}
+    assert all(len(payload) % 2 == 0 for _, payload in frames[:-1])
+
+def test_engine_failure_ends_the_stream_with_an_error_frame(client, monkeypatch):
+    async def failing_stream(request, deadline=None):
+        yield b"\0\0" * 100
+        raise RuntimeError("CUDA out of memory")
+
+    monkeypatch.setattr(main.engine, "stream", failing_stream)
+    response = client.post("/inference/stream", json={"text": "Hello"})
+
+    assert response.status_code == 200
+    _, frames = _parse(response.content)
+    assert frames == [(pcm_stream.AUDIO, b"\0\0" * 100), (pcm_stream.ERROR, b"CUDA out of memory")]
+
+@pytest.mark.parametrize("limit, status", [("max_concurrency", 429), ("max_queue", 503)])
+def test_saturated_engine_refuses_before_the_stream_starts(client, monkeypatch, limit, status):
+    monkeypatch.setattr(main.engine, limit, 0)
+    response = client.post("/inference/stream", json={"text": "Hello"})
+
+    assert response.status_code == status
+    assert "Retry-After" in response.headers
+    assert response.json()["error"] == "Sesame is saturated"
+
+def test_expired_deadline_is_refused_before_the_stream_starts(client):
+    response = client.post("/inference/stream", json={"text": "Hello"}, headers={"X-Deadline-Ms": "0"})
+
+    assert response.status_code == 504
+    assert response.json() == {"error": "Deadline exceeded"}